@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.agent
+
+This module provides the optional agent, a long lived process listening on a Unix socket that runs the commands of the
+azkaban executable with warm Azkaban sessions, and the forwarding of commands to it.
+
+The client side only uses the standard library, so forwarded commands do not pay for importing requests and click.
+"""
+
+import io
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+
+from azkaban_cli.exceptions import AgentError
+
+SOCKET_NAME = u"agent.sock"
+
+# Commands that run until interrupted, they would block the agent
+LOCAL_COMMANDS = frozenset([u"agent", u"watch_execution", u"watch_executions"])
+
+# Options that make a command run until interrupted
+LOCAL_OPTIONS = frozenset([u"-f", u"--follow"])
+
+# Environment variables forwarded with the command lines, such as AZKABAN_CLI_PROFILE and the session options
+ENV_PREFIX = u"AZKABAN_CLI_"
+
+# Environment variables read once when the agent starts, commands setting them to other values run in the client
+STARTUP_ENV = frozenset([u"AZKABAN_CLI_PATH", u"AZKABAN_CLI_DEBUG_BODY_LIMIT"])
+
+CONNECT_TIMEOUT = 0.5
+
+BUFFER_SIZE = 64 * 1024
+
+
+def socket_path():
+    """Path of the agent socket, in the directory of the session files"""
+
+    directory = os.getenv("AZKABAN_CLI_PATH", "") or os.path.join(os.path.expanduser("~"), ".azkaban_cli")
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def forwardable(args):
+    """
+    Returns True if the command line can run in the agent: it does not run until interrupted nor prompts for a password
+
+    :param list args: Command line arguments, without the program name
+    :rtype: bool
+    """
+
+    if LOCAL_COMMANDS.intersection(args) or LOCAL_OPTIONS.intersection(args):
+        return False
+
+    # The password of login is prompted for when not passed
+    if u"login" in args and not any(arg == u"--password" or arg.startswith(u"--password=") for arg in args):
+        return False
+
+    return True
+
+
+def forwarded_env(environ=None):
+    """
+    Returns the environment variables forwarded to the agent with a command line
+
+    :param dict environ: Environment, optional. Defaults to os.environ.
+    :rtype: dict
+    """
+
+    environ = os.environ if environ is None else environ
+    return {name: value for name, value in environ.items() if name.startswith(ENV_PREFIX)}
+
+
+def _recv_all(connection):
+    """ PRIVATE
+    Reads from the connection until the peer shuts down its side.
+    """
+    chunks = []
+    while True:
+        chunk = connection.recv(BUFFER_SIZE)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+def forward(args, path=None):
+    """
+    Runs a command line in the agent
+
+    :param list args: Command line arguments, without the program name
+    :param str path: Path of the agent socket, optional. See socket_path.
+    :return: A dictionary containing exit_code, stdout and stderr as keys, or fallback set to True when the command
+     must run locally, such as when it needs to login. None when the agent is not running.
+    :rtype: dict
+    :raises AgentError: when the agent fails after receiving the command
+    """
+
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.settimeout(CONNECT_TIMEOUT)
+        try:
+            client.connect(path or socket_path())
+        except (IOError, OSError):
+            return None
+
+        # Commands like upload can take a long time, only connecting has a timeout
+        client.settimeout(None)
+
+        try:
+            request = {u"args": list(args), u"cwd": os.getcwd(), u"env": forwarded_env()}
+            client.sendall(json.dumps(request).encode(u"utf-8"))
+            client.shutdown(socket.SHUT_WR)
+            return json.loads(_recv_all(client).decode(u"utf-8"))
+        except (IOError, OSError, ValueError) as e:
+            raise AgentError(u"Agent failed to run the command: %s" % (e))
+    finally:
+        client.close()
+
+
+def main():
+    """
+    Entry point of the azkaban executable. The command line is forwarded to the agent when it is running, and run in
+    this process otherwise.
+    """
+
+    args = sys.argv[1:]
+
+    if forwardable(args):
+        try:
+            response = forward(args)
+        except AgentError as e:
+            sys.stderr.write(u"%s\n" % (e))
+            sys.exit(1)
+
+        if response is not None and not response.get(u"fallback"):
+            sys.stdout.write(response[u"stdout"])
+            sys.stderr.write(response[u"stderr"])
+            sys.exit(response[u"exit_code"])
+
+    from azkaban_cli.azkaban_cli import cli
+    cli()
+
+
+class Agent(object):
+    def __init__(self, path=None, idle_timeout=None):
+        """
+        Server running the forwarded command lines one at a time, with the Azkaban instance of each profile kept
+        between commands, so their connection pools stay warm.
+
+        Commands run with the AZKABAN_CLI_* environment variables of the client instead of the ones of the agent. The
+        instance of a profile is created again when a command has other session options.
+
+        click reads its options from os.environ and writes to sys.stdout, and the commands log to the root logger and
+        resolve paths from the working directory, so each command swaps them for the ones of its client, process
+        wide. Commands can therefore never run concurrently: serve handles one connection at a time, and run raises
+        AgentError when called while another command is running.
+
+        :param str path: Path of the agent socket, optional. See socket_path.
+        :param float idle_timeout: Seconds without commands before the agent stops, optional. None runs forever.
+        """
+
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.clients = {}
+
+        self.__running = threading.Lock()
+
+    def run(self, request):
+        """
+        Runs a command line received from a client, capturing its output and logs
+
+        :param dict request: Dictionary containing args, cwd and env (the AZKABAN_CLI_* environment variables of the
+         client) as keys
+        :return: A dictionary containing exit_code, stdout and stderr as keys, or fallback set to True when the
+         command must run in the client, such as when it needs to login before sending any request
+        :rtype: dict
+        :raises AgentError: when another command is running
+        """
+
+        if not self.__running.acquire(False):
+            raise AgentError(u"The agent runs one command at a time, another command is running")
+        try:
+            return self.__run(request)
+        finally:
+            self.__running.release()
+
+    def __run(self, request):
+        """ PRIVATE
+        Runs a command line with the environment, working directory, streams and logging of the client, see run.
+        """
+
+        env = request.get(u"env") or {}
+        agent_env = forwarded_env()
+        if any(env.get(name) != agent_env.get(name) for name in STARTUP_ENV):
+            return {u"fallback": True}
+
+        import click
+
+        from azkaban_cli.azkaban_cli import LOG_FORMAT, cli
+        from azkaban_cli.exceptions import NotLoggedOnError, SessionError
+
+        # Requests sent by the command, counted by a hook of the Azkaban instance of the profile
+        sent = []
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        handler = logging.StreamHandler(stderr)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        # The command does not configure logging, the root logger has a handler already
+        root = logging.getLogger()
+        handlers, level = root.handlers, root.level
+        streams = sys.stdin, sys.stdout, sys.stderr
+        cwd = os.getcwd()
+
+        root.handlers = [handler]
+        root.setLevel(logging.INFO)
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO(u""), stdout, stderr
+        # Commands run one at a time, see Agent, the options read from the environment by click and the sessions see
+        # the ones of the client
+        for name in agent_env:
+            del os.environ[name]
+        os.environ.update(env)
+        try:
+            os.chdir(request[u"cwd"])
+            exit_code = cli.main(
+                args=request[u"args"],
+                prog_name=u"azkaban",
+                obj={u"clients": self.clients, u"request_hook": sent.append},
+                standalone_mode=False,
+            )
+            exit_code = exit_code if isinstance(exit_code, int) else 0
+        except (NotLoggedOnError, SessionError, click.exceptions.Abort):
+            # Logging in needs the terminal of the client. The request answered with the session error was not run by
+            # Azkaban, but the ones sent before it were, such as the first projects of a bulk upload, and running the
+            # command again in the client would repeat them
+            if len(sent) <= 1:
+                return {u"fallback": True}
+            logging.error(u"Login needed after sending %d requests, login and run again what was not done" % (len(sent)))
+            exit_code = 1
+        except click.exceptions.ClickException as e:
+            e.show(file=stderr)
+            exit_code = e.exit_code
+        except Exception as e:
+            logging.error(e)
+            exit_code = 1
+        finally:
+            for name in env:
+                os.environ.pop(name, None)
+            os.environ.update(agent_env)
+            os.chdir(cwd)
+            sys.stdin, sys.stdout, sys.stderr = streams
+            root.handlers = handlers
+            root.setLevel(level)
+
+        return {u"exit_code": exit_code, u"stdout": stdout.getvalue(), u"stderr": stderr.getvalue()}
+
+    def __handle(self, connection):
+        """ PRIVATE
+        Reads a request from the connection, runs it and writes the response.
+        """
+        try:
+            request = json.loads(_recv_all(connection).decode(u"utf-8"))
+        except ValueError as e:
+            response = {u"exit_code": 1, u"stdout": u"", u"stderr": u"Invalid request: %s\n" % (e)}
+        else:
+            try:
+                response = self.run(request)
+            except AgentError as e:
+                response = {u"exit_code": 1, u"stdout": u"", u"stderr": u"%s\n" % (e)}
+
+        connection.sendall(json.dumps(response).encode(u"utf-8"))
+
+    def serve(self):
+        """
+        Listens on the socket until the idle timeout expires or the process is interrupted. Only the user running the
+        agent can connect to the socket.
+
+        Connections are handled one at a time, in the thread calling serve. This must stay single threaded, commands
+        swap the environment, working directory and streams of the whole process, see Agent.
+
+        :raises AgentError: when another agent is already listening on the socket
+        """
+
+        if forward([u"--version"], self.path) is not None:
+            raise AgentError(u"An agent is already running on %s" % (self.path))
+
+        directory = os.path.dirname(self.path)
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            server.bind(self.path)
+        finally:
+            os.umask(umask)
+
+        server.listen(16)
+        server.settimeout(self.idle_timeout)
+        logging.info("Agent listening on %s" % (self.path))
+
+        try:
+            while True:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    logging.info("Agent idle for %s seconds, stopping" % (self.idle_timeout))
+                    return
+
+                try:
+                    connection.settimeout(None)
+                    self.__handle(connection)
+                except (IOError, OSError) as e:
+                    logging.error("Could not answer client: %s" % (e))
+                finally:
+                    connection.close()
+        finally:
+            server.close()
+            if os.path.exists(self.path):
+                os.remove(self.path)
@@ -6,9 +6,278 @@ azkaban_cli.api
 This module provides a set of requests for the Azkaban API
 """
 
+import functools
 import logging
 import os
+import time
+import uuid
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from azkaban_cli.retry import RetryPolicy
+from azkaban_cli.session import CONNECTION_TIMINGS
+from azkaban_cli.throttle import Throttle
+from azkaban_cli.tracing import SPAN_KIND_CLIENT, Tracer
+
+# Request parameters recorded as attributes of the request spans, by attribute name
+SPAN_PARAMETERS = (
+    (u'azkaban.project', (u'project', u'projectName')),
+    (u'azkaban.project_id', (u'projectId',)),
+    (u'azkaban.flow', (u'flow', u'flowId')),
+    (u'azkaban.exec_id', (u'execid',)),
+    (u'azkaban.job_id', (u'jobId',)),
+    (u'azkaban.schedule_id', (u'scheduleId',)),
+    (u'azkaban.ajax_action', (u'ajax', u'action')),
+)
+
+DEFAULT_DEBUG_BODY_LIMIT = 4096
+
+def __read_debug_body_limit():
+    """ PRIVATE
+    Reads AZKABAN_CLI_DEBUG_BODY_LIMIT, falling back to DEFAULT_DEBUG_BODY_LIMIT when it is not a number
+    """
+
+    value = os.getenv("AZKABAN_CLI_DEBUG_BODY_LIMIT", "")
+    if not value:
+        return DEFAULT_DEBUG_BODY_LIMIT
+    try:
+        return int(value)
+    except ValueError:
+        logging.warning(
+            u'Invalid AZKABAN_CLI_DEBUG_BODY_LIMIT %r, using %d' % (value, DEFAULT_DEBUG_BODY_LIMIT)
+        )
+        return DEFAULT_DEBUG_BODY_LIMIT
+
+# Maximum number of bytes of a response body written to the debug log, 0 logs the whole body
+DEBUG_BODY_LIMIT = __read_debug_body_limit()
+
+def set_debug_body_limit(limit):
+    """Sets the maximum number of bytes of a response body written to the debug log
+
+    :param int limit: Maximum number of bytes, 0 logs the whole body
+    """
+
+    global DEBUG_BODY_LIMIT
+    DEBUG_BODY_LIMIT = limit
+
+def __traced(function):
+    """
+    This decorator records a call of a request function as a span named after it, when the session has a tracer
+    attribute. See azkaban_cli.tracing.Tracer.
+    """
+
+    @functools.wraps(function)
+    def wrapper(session, *args, **kwargs):
+        tracer = getattr(session, 'tracer', None)
+        if not isinstance(tracer, Tracer):
+            return function(session, *args, **kwargs)
+
+        with tracer.span(function.__name__, kind=SPAN_KIND_CLIENT):
+            return function(session, *args, **kwargs)
+
+    return wrapper
+
+def __request(session, method, url, idempotent=False, replayable=True, **kwargs):
+    r"""
+    This function is the single point where requests to Azkaban are made, every request function calls it.
+
+    If the session has a retry_policy attribute, see azkaban_cli.session.create_session, failed requests are retried
+    according to it. Read only requests are flagged as idempotent, the others are only retried if the policy allows it.
+    If it has a throttle attribute, every attempt waits for the rate limit of the endpoint and fails fast while the
+    circuit of the host is open.
+
+    If it has a tracer, the method, url, status, retries and the project, flow, execution id and ajax action parameters
+    of the request are set as attributes of the span of the request function, see __traced.
 
+    If it has request_hooks, each hook is called with the metrics of the request once it is done, see
+    azkaban_cli.metrics.
+
+    The response body is only decoded for the debug log when debug logging is enabled, and never for streamed
+    responses, whose body has not been downloaded yet.
+
+    :param session: A session for creating the request
+    :type session: requests.Session
+    :param str method: HTTP method
+    :param str url: Url where the request should go
+    :param bool idempotent: If the request can be repeated without changing the outcome
+    :param bool replayable: If the request body can be sent again, False for streamed bodies
+    :param \*\*kwargs: Optional arguments of requests.Session.request
+    :return: The response from the request made
+    :rtype: requests.Response
+    :raises requests.exceptions.ConnectionError: if cannot connect to host
+    :raises azkaban_cli.exceptions.CircuitOpenError: if the host failed too many times in a row
+    """
+
+    hooks = getattr(session, 'request_hooks', None)
+    if not isinstance(hooks, list):
+        hooks = None
+    attempts = []
+
+    def request():
+        # Files are read again from the beginning when the request is retried
+        for file_tuple in (kwargs.get('files') or {}).values():
+            if hasattr(file_tuple[1], 'seek'):
+                file_tuple[1].seek(0)
+
+        attempts.append(True)
+        if hooks:
+            CONNECTION_TIMINGS.last = None
+
+        return session.request(method, url, **kwargs)
+
+    throttle = getattr(session, 'throttle', None)
+    if isinstance(throttle, Throttle):
+        def send():
+            return throttle.call(url, request)
+    else:
+        send = request
+
+    tracer = getattr(session, 'tracer', None)
+    span = tracer.current_span() if isinstance(tracer, Tracer) else None
+    if span is not None:
+        span.set_attributes(__span_attributes(method, url, kwargs))
+
+    start = time.perf_counter()
+    response = None
+    error = None
+    try:
+        retry_policy = getattr(session, 'retry_policy', None)
+        if isinstance(retry_policy, RetryPolicy):
+            response = retry_policy.call(send, idempotent, replayable)
+        else:
+            response = send()
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if span is not None:
+            span.set_attributes({
+                u'http.response.status_code': response.status_code if response is not None else None,
+                u'azkaban.retries': max(0, len(attempts) - 1),
+            })
+            if response is not None and response.status_code >= 400:
+                span.set_error(u'HTTP %d' % (response.status_code))
+        if hooks:
+            __call_hooks(hooks, method, url, kwargs, response, error, len(attempts), time.perf_counter() - start)
+
+    if not kwargs.get('stream') and logging.getLogger().isEnabledFor(logging.DEBUG):
+        __log_response(response)
+
+    return response
+
+def __span_attributes(method, url, kwargs):
+    """
+    This function is a utility to get the span attributes of a request, from its url and parameters. The session id and
+    password are never recorded.
+
+    :param str method: HTTP method
+    :param str url: Url of the request
+    :param dict kwargs: Arguments of requests.Session.request
+    :rtype: dict
+    """
+
+    parameters = {}
+    for name in ('params', 'data'):
+        if isinstance(kwargs.get(name), dict):
+            parameters.update(kwargs[name])
+
+    attributes = {u'http.request.method': method, u'url.full': url}
+    for attribute, names in SPAN_PARAMETERS:
+        for name in names:
+            if parameters.get(name) is not None:
+                attributes[attribute] = u'%s' % (parameters[name])
+                break
+
+    return attributes
+
+def __call_hooks(hooks, method, url, kwargs, response, error, attempts, total):
+    """
+    This function is a utility to call the request hooks with the metrics of a request. A failing hook is logged and
+    does not fail the request.
+
+    :param list hooks: Functions receiving the metrics dictionary
+    :param str method: HTTP method
+    :param str url: Url of the request
+    :param dict kwargs: Arguments of requests.Session.request
+    :param response: The response of the last attempt, None when the request raised
+    :type response: requests.Response
+    :param error: The exception raised by the request, None when it returned
+    :param int attempts: Number of times the request was sent
+    :param float total: Seconds spent in the request, including retries
+    """
+
+    action = None
+    for name in ('params', 'data'):
+        values = kwargs.get(name)
+        if isinstance(values, dict):
+            action = action or values.get(u'ajax') or values.get(u'action')
+
+    timings = getattr(CONNECTION_TIMINGS, 'last', None) or {}
+    parts = urlsplit(url)
+
+    metrics = {
+        u'method': method,
+        u'host': u'%s://%s' % (parts.scheme, parts.netloc),
+        u'endpoint': parts.path or u'/',
+        u'action': action,
+        u'status': response.status_code if response is not None else None,
+        u'error': error.__class__.__name__ if error is not None else None,
+        u'bytes_out': None,
+        u'bytes_in': None,
+        u'retries': max(0, attempts - 1),
+        u'dns': timings.get(u'dns'),
+        u'connect': timings.get(u'connect'),
+        u'tls': timings.get(u'tls'),
+        u'ttfb': None,
+        u'total': total,
+    }
+
+    if response is not None:
+        body = response.request.body if response.request is not None else None
+        if body is None:
+            metrics[u'bytes_out'] = 0
+        elif isinstance(body, (bytes, str)):
+            metrics[u'bytes_out'] = len(body)
+
+        if not kwargs.get('stream'):
+            metrics[u'bytes_in'] = len(response.content)
+        elif response.headers.get(u'Content-Length', u'').isdigit():
+            metrics[u'bytes_in'] = int(response.headers[u'Content-Length'])
+
+        # Time from sending the request until its response headers are parsed, including the connection
+        metrics[u'ttfb'] = response.elapsed.total_seconds()
+
+    for hook in list(hooks):
+        try:
+            hook(metrics)
+        except Exception as e:
+            logging.warning(u'Request hook %r failed: %s' % (hook, e))
+
+def __log_response(response):
+    """
+    This function is a utility to write a response body to the debug log, truncated to DEBUG_BODY_LIMIT bytes.
+
+    :param response: The response to be logged
+    :type response: requests.Response
+    """
+
+    content = response.content
+    body = content[:DEBUG_BODY_LIMIT] if DEBUG_BODY_LIMIT else content
+
+    try:
+        text = body.decode(response.encoding or 'utf-8', errors='replace')
+    except LookupError:
+        text = body.decode('utf-8', errors='replace')
+
+    if len(body) < len(content):
+        logging.debug("Response (first %d of %d bytes): \n%s", len(body), len(content), text)
+    else:
+        logging.debug("Response: \n%s", text)
+
+@__traced
 def upload_request(session, host, session_id, project, zip_path):
     """Upload request for the Azkaban API
 
@@ -23,25 +292,94 @@ def upload_request(session, host, session_id, project, zip_path):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    zip_file = open(zip_path, 'rb')
     zip_name = os.path.basename(zip_path)
 
-    response = session.post(
+    with open(zip_path, 'rb') as zip_file:
+        response = __request(
+            session,
+            'POST',
+            host + '/manager',
+            data={
+                u'session.id': session_id,
+                u'ajax': u'upload',
+                u'project': project
+            },
+            files={
+                u'file': (zip_name, zip_file, 'application/zip'),
+            }
+        )
+
+    return response
+
+@__traced
+def upload_stream_request(session, host, session_id, project, zip_name, zip_chunks):
+    """Upload request for the Azkaban API that streams the zip instead of reading it from a file
+
+    The multipart body is sent with chunked transfer encoding, so only one chunk of the zip is kept in memory at a time.
+
+    :param session: A session for creating the request
+    :type session: requests.Session
+    :param str host: Hostname where the request should go
+    :param str session_id: An id that the user should have when is logged in
+    :param str project: Project name on Azkaban
+    :param str zip_name: File name of the zip sent to Azkaban
+    :param zip_chunks: Iterable of byte chunks of the zip, see azkaban_cli.archive.iter_zip
+    :return: The response from the request made
+    :rtype: requests.Response
+    :raises requests.exceptions.ConnectionError: if cannot connect to host
+    """
+
+    boundary = uuid.uuid4().hex
+
+    fields = [
+        (u'session.id', session_id),
+        (u'ajax', u'upload'),
+        (u'project', project)
+    ]
+
+    response = __request(
+        session,
+        'POST',
         host + '/manager',
-        data={
-            u'session.id': session_id,
-            u'ajax': u'upload',
-            u'project': project
-        },
-        files={
-            u'file': (zip_name, zip_file, 'application/zip'),
+        replayable=False,
+        data=__iter_multipart_body(boundary, fields, u'file', zip_name, 'application/zip', zip_chunks),
+        headers={
+            'Content-Type': 'multipart/form-data; boundary=%s' % (boundary)
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+def __iter_multipart_body(boundary, fields, file_field, file_name, content_type, file_chunks):
+    """
+    This function is a utility to generate a multipart/form-data body without loading the file in memory.
+
+    :param str boundary: The multipart boundary, it must be the same sent in the Content-Type header
+    :param list fields: List of (name, value) form fields sent before the file
+    :param str file_field: Form field name of the file
+    :param str file_name: File name sent to the server
+    :param str content_type: Content type of the file
+    :param file_chunks: Iterable of byte chunks of the file
+    :return: A generator of body chunks
+    :rtype: generator
+    """
+
+    for name, value in fields:
+        yield (
+            u'--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n%s\r\n' % (boundary, name, value)
+        ).encode('utf-8')
+
+    yield (
+        u'--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\nContent-Type: %s\r\n\r\n' %
+        (boundary, file_field, file_name, content_type)
+    ).encode('utf-8')
+
+    for chunk in file_chunks:
+        yield chunk
+
+    yield (u'\r\n--%s--\r\n' % (boundary)).encode('utf-8')
+
+@__traced
 def login_request(session, host, user, password):
     """Login request for the Azkaban API
 
@@ -55,7 +393,9 @@ def login_request(session, host, user, password):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.post(
+    response = __request(
+        session,
+        'POST',
         host,
         data={
             u'action': u'login',
@@ -64,10 +404,9 @@ def login_request(session, host, user, password):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def schedule_request(session, host, session_id, project, flow, cron, **execution_options):
     r"""Schedule request for the Azkaban API
 
@@ -95,15 +434,16 @@ def schedule_request(session, host, session_id, project, flow, cron, **execution
 
     logging.debug("Request data: \n%s", data)
 
-    response = session.post(
+    response = __request(
+        session,
+        'POST',
         host + '/schedule',
         data=data
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def fetch_flows_request(session, host, session_id, project):
     """Fetch flows of a project request for the Azkaban API
 
@@ -117,8 +457,11 @@ def fetch_flows_request(session, host, session_id, project):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/manager',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'fetchprojectflows',
@@ -126,15 +469,15 @@ def fetch_flows_request(session, host, session_id, project):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
-def fetch_executions_of_a_flow_request(session, session_id, project, flow, start, length):
+@__traced
+def fetch_executions_of_a_flow_request(session, host, session_id, project, flow, start, length):
     """fetch executions of a flow on a given project
 
     :param session: A session for creating the request
     :type session: requests.Session
+    :param str host: Hostname where the request should go
     :param str session_id: An id that the user should have when is logged in
     :param str project: Project name whose flows will be fetched on Azkaban
     :param str flow: Flow name whose schedule will be fetched on Azkaban
@@ -145,8 +488,11 @@ def fetch_executions_of_a_flow_request(session, session_id, project, flow, start
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/manager',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax':'fetchFlowExecutions',
@@ -157,10 +503,9 @@ def fetch_executions_of_a_flow_request(session, session_id, project, flow, start
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def fetch_jobs_from_flow_request(session, host, session_id, project, flow):
     """Fetch jobs of a flow of a project request for the Azkaban API
 
@@ -175,8 +520,11 @@ def fetch_jobs_from_flow_request(session, host, session_id, project, flow):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/manager',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'fetchflowgraph',
@@ -185,10 +533,9 @@ def fetch_jobs_from_flow_request(session, host, session_id, project, flow):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def fetch_schedule_request(session, host, session_id, project_id, flow):
     """Fetch flow of a project request for the Azkaban API
 
@@ -203,8 +550,11 @@ def fetch_schedule_request(session, host, session_id, project_id, flow):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/schedule',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'fetchSchedule',
@@ -213,10 +563,9 @@ def fetch_schedule_request(session, host, session_id, project_id, flow):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def unschedule_request(session, host, session_id, schedule_id):
     """Unschedule request for the Azkaban API
 
@@ -238,15 +587,16 @@ def unschedule_request(session, host, session_id, schedule_id):
 
     logging.debug("Request data: \n%s", data)
 
-    response = session.post(
+    response = __request(
+        session,
+        'POST',
         host + '/schedule',
         data=data
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def execute_request(session, host, session_id, project, flow, **execution_options):
     """Execute request for the Azkaban API
 
@@ -271,15 +621,16 @@ def execute_request(session, host, session_id, project, flow, **execution_option
 
     params.update(execution_options)
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
         params=params
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def cancel_request(session, host, session_id, exec_id):
     """Cancel an running flow for the Azkaban API
 
@@ -293,7 +644,9 @@ def cancel_request(session, host, session_id, exec_id):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
         params={
             u'session.id': session_id,
@@ -302,11 +655,10 @@ def cancel_request(session, host, session_id, exec_id):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
 
+@__traced
 def create_request(session, host, session_id, project, description):
     """Create a Project request for the Azkaban API
 
@@ -320,7 +672,9 @@ def create_request(session, host, session_id, project, description):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.post(
+    response = __request(
+        session,
+        'POST',
         host + '/manager',
         data={
             u'session.id': session_id,
@@ -330,10 +684,9 @@ def create_request(session, host, session_id, project, description):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def delete_request(session, host, session_id, project):
     """Delete a Project request for the Azkaban API
 
@@ -345,7 +698,9 @@ def delete_request(session, host, session_id, project):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/manager',
         params={
             u'session.id': session_id,
@@ -354,33 +709,36 @@ def delete_request(session, host, session_id, project):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
-def fetch_projects_request(session, host, session_id):
+@__traced
+def fetch_projects_request(session, host, session_id, stream=False):
     """Fetch all projects request for the Azkaban API
 
     :param session: A session for creating the request
     :type session: requests.Session
     :param str host: Hostname where the request should go
     :param str session_id: An id that the user should have when is logged in
+    :param bool stream: Do not download the body before returning, it must be read with response.iter_content
     :return: The response from the request made
     :rtype: requests.Response
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/index?all',
+        idempotent=True,
         params={
             u'session.id': session_id
-        }
+        },
+        stream=stream
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def add_permission_request(session, host, session_id, project, group, permission_options):
     """Add permission request for the Azkaban API
 
@@ -398,10 +756,9 @@ def add_permission_request(session, host, session_id, project, group, permission
 
     response = __call_permission_api(session, host, session_id, 'addPermission', project, group, permission_options)
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def remove_permission_request(session, host, session_id, project, group):
     """Remove permission request for the Azkaban API
 
@@ -421,10 +778,9 @@ def remove_permission_request(session, host, session_id, project, group):
 
     response = __call_permission_api(session, host, session_id, 'changePermission', project, group, permission_options)
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def change_permission_request(session, host, session_id, project, group, permission_options):
     """Change permission request for the Azkaban API
 
@@ -442,11 +798,38 @@ def change_permission_request(session, host, session_id, project, group, permiss
 
     response = __call_permission_api(session, host, session_id, 'changePermission', project, group, permission_options)
 
-    logging.debug("Response: \n%s", response.text)
+    return response
+
+@__traced
+def fetch_group_permissions_request(session, host, session_id, project):
+    """Fetch group permissions request for the Azkaban API
+
+    :param session: A session for creating the request
+    :type session: requests.Session
+    :param str host: Hostname where the request should go
+    :param str session_id: An id that the user should have when is logged in
+    :param str project: Project name on Azkaban
+    :return: The response from the request made
+    :rtype: requests.Response
+    :raises requests.exceptions.ConnectionError: if cannot connect to host
+    """
+
+    response = __request(
+        session,
+        'GET',
+        host + '/manager',
+        idempotent=True,
+        params={
+            u'session.id': session_id,
+            u'ajax': 'getGroupPermissions',
+            u'project': project
+        }
+    )
 
     return response
 
 
+@__traced
 def fetch_sla_request(session, host, session_id, schedule_id):
     """Fetch flow of a SLA request for the Azkaban API
 
@@ -460,8 +843,11 @@ def fetch_sla_request(session, host, session_id, schedule_id):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/schedule',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'slaInfo',
@@ -469,8 +855,6 @@ def fetch_sla_request(session, host, session_id, schedule_id):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
 def __call_permission_api(session, host, session_id, operation, project, group, permission_options ):
@@ -493,7 +877,9 @@ def __call_permission_api(session, host, session_id, operation, project, group,
     #https://azkaban.qa.globoi.com/manager?project=teste-permission-api-20190806&name=time-dmp&ajax=addPermission&permissions%5Badmin%5D=false&permissions%5Bread%5D=true&permissions%5Bwrite%5D=false&permissions%5Bexecute%5D=true&permissions%5Bschedule%5D=false&group=true
     """
 
-    return session.get(
+    return __request(
+        session,
+        'GET',
         host + '/manager',
         params = {
             u'session.id': session_id,
@@ -509,6 +895,7 @@ def __call_permission_api(session, host, session_id, operation, project, group,
         }
     )
 
+@__traced
 def fetch_flow_execution_request(session, host, session_id, exec_id):
     """Fetch a flow execution request for the Azkaban API
 
@@ -522,8 +909,11 @@ def fetch_flow_execution_request(session, host, session_id, exec_id):
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'fetchexecflow',
@@ -531,10 +921,9 @@ def fetch_flow_execution_request(session, host, session_id, exec_id):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def fetch_flow_execution_updates_request(session, host, session_id, exec_id, last_update_time):
     """Fetch a flow execution updates request for the Azkaban API
 
@@ -552,8 +941,11 @@ def fetch_flow_execution_updates_request(session, host, session_id, exec_id, las
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'fetchexecflowupdate',
@@ -562,10 +954,9 @@ def fetch_flow_execution_updates_request(session, host, session_id, exec_id, las
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def fetch_execution_job_log_request(session, host, session_id, exec_id, jobid, offset, length):
     """Fetches the correponding job logs.
 
@@ -587,8 +978,11 @@ def fetch_execution_job_log_request(session, host, session_id, exec_id, jobid, o
     :raises FetchExecutionJobsLogError: when Azkaban api returns error in response
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'fetchExecJobLogs',
@@ -599,10 +993,9 @@ def fetch_execution_job_log_request(session, host, session_id, exec_id, jobid, o
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def resume_flow_execution(session, host, session_id, exec_id):
     """Resume a flow execution request for the Azkaban API
 
@@ -618,7 +1011,9 @@ def resume_flow_execution(session, host, session_id, exec_id):
     :rtype: requests.Response
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
         params={
             u'session.id': session_id,
@@ -627,10 +1022,9 @@ def resume_flow_execution(session, host, session_id, exec_id):
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
 
+@__traced
 def fetch_running_executions_of_a_flow_request(session, host, session_id, project, flow):
 
     """Fetch running executions of a flow
@@ -643,8 +1037,11 @@ def fetch_running_executions_of_a_flow_request(session, host, session_id, projec
     :raises requests.exceptions.ConnectionError: if cannot connect to host
     """
 
-    response = session.get(
+    response = __request(
+        session,
+        'GET',
         host + '/executor',
+        idempotent=True,
         params={
             u'session.id': session_id,
             u'ajax': 'getRunning',
@@ -653,6 +1050,4 @@ def fetch_running_executions_of_a_flow_request(session, host, session_id, projec
         }
     )
 
-    logging.debug("Response: \n%s", response.text)
-
     return response
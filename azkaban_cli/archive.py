@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.archive
+
+This module provides zip archive builders that stream the archive in chunks instead of writing it to disk, or write it
+without changing the working directory
+"""
+
+import os
+import zipfile
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class _ChunkBuffer(object):
+    """ PRIVATE
+    Write-only and unseekable file object that keeps the bytes written by zipfile until they are drained.
+    """
+
+    def __init__(self):
+        self.__chunks = []
+
+    def write(self, data):
+        self.__chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.__chunks)
+        self.__chunks = []
+        return data
+
+
+def _tree_entries(path):
+    """ PRIVATE
+    Generates the directories and files under path, sorted, as (path, is_directory, archive name) tuples, with the
+    archive names used by shutil.make_archive.
+    """
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        relative_root = os.path.relpath(root, path)
+
+        if relative_root != os.curdir:
+            yield root, True, relative_root
+
+        for name in sorted(files):
+            yield os.path.join(root, name), False, os.path.normpath(os.path.join(relative_root, name))
+
+
+def make_archive(base_name, archive_format, root_dir):
+    """Creates a zip archive of a directory, the same way shutil.make_archive(base_name, 'zip', root_dir) does
+
+    Unlike shutil.make_archive before Python 3.10.6, it does not change the working directory of the process, so it is
+    safe to create many archives in threads at the same time.
+
+    :param str base_name: Path of the archive, without the .zip extension
+    :param str archive_format: Archive format, only 'zip' is supported
+    :param str root_dir: Directory to be zipped
+    :return: Path of the archive
+    :rtype: str
+    :raises FileNotFoundError: if root_dir is not a directory
+    """
+
+    if archive_format != 'zip':
+        raise ValueError("Unsupported archive format '%s'" % (archive_format))
+
+    if not os.path.isdir(root_dir):
+        raise FileNotFoundError("No such directory: '%s'" % (root_dir))
+
+    zip_path = base_name + '.zip'
+
+    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for entry_path, is_directory, name in _tree_entries(root_dir):
+            zip_file.write(entry_path, name)
+
+    return zip_path
+
+
+def iter_zip(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Generates a zip archive of a directory as a sequence of byte chunks
+
+    The archive has the same layout as the one created by shutil.make_archive(name, 'zip', path), but it is never
+    written to disk and only one chunk of each file is kept in memory at a time.
+
+    :param str path: Directory to be zipped
+    :param int chunk_size: Amount of bytes read from each file at a time
+    :return: A generator of zip archive chunks
+    :rtype: generator
+    :raises FileNotFoundError: if path is not a directory
+    """
+
+    if not os.path.isdir(path):
+        raise FileNotFoundError("No such directory: '%s'" % (path))
+
+    buffer = _ChunkBuffer()
+
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for entry_path, is_directory, name in _tree_entries(path):
+            if is_directory:
+                zip_file.write(entry_path, name)
+                continue
+
+            zip_info = zipfile.ZipInfo.from_file(entry_path, name)
+            zip_info.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(entry_path, 'rb') as source, zip_file.open(zip_info, 'w') as destination:
+                for data in iter(lambda: source.read(chunk_size), b''):
+                    destination.write(data)
+
+                    chunk = buffer.drain()
+                    if chunk:
+                        yield chunk
+
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+
+    chunk = buffer.drain()
+    if chunk:
+        yield chunk
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.async_azkaban
+
+This module provides an asyncio client with coroutine equivalents of the Azkaban class methods, and async iterators
+for the ones returning generators
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from azkaban_cli.azkaban import Azkaban
+
+
+# Returned by next when the blocking iterator is exhausted, StopIteration cannot be set on a future
+_END = object()
+
+
+class _ThreadIterator(object):
+    """ PRIVATE
+    Async iterator running each step of a blocking iterator in the thread pool of an AsyncAzkaban. It is not an async
+    generator, so the module still runs on Python 3.5.
+    """
+
+    def __init__(self, run, iterator):
+        self.__run = run
+        self.__iterator = iterator
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        item = await self.__run(next, self.__iterator, _END)
+        if item is _END:
+            raise StopAsyncIteration
+        return item
+
+
+class AsyncAzkaban(object):
+    def __init__(self, azkaban=None, max_workers=None, loop=None):
+        """
+        Asyncio client for Azkaban.
+
+        Every coroutine runs the matching Azkaban method in a thread pool, so requests share the same
+        requests.Session (and its connection pool) and raise exactly the same exceptions as the blocking client.
+
+        This is not native asyncio I/O: many coroutines can be awaited at the same time, but at most max_workers
+        methods run at once, the others wait for a free thread. Each thread blocks on its request, so the session
+        keeps at most pool_maxsize connections per host open between requests (see azkaban_cli.session). Raise
+        max_workers and the pool_maxsize session option together to have more requests in flight.
+
+        :param azkaban: Azkaban instance to wrap, optional. A new one is created if not passed.
+        :type azkaban: azkaban_cli.azkaban.Azkaban
+        :param int max_workers: Maximum number of methods running at the same time, optional. Defaults to the
+         pool_maxsize session option of the Azkaban instance, so every running request can reuse a pooled connection.
+        :param loop: Event loop used to run the requests, optional. Defaults to the running loop.
+        """
+
+        self.__azkaban = azkaban if azkaban is not None else Azkaban()
+        if max_workers is None:
+            max_workers = self.__azkaban.get_session_config()[u'pool_maxsize']
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.max_workers = max_workers
+        self.__loop = loop
+
+    def __run(self, method, *args, **kwargs):
+        """ PRIVATE
+        Schedules the blocking method in the thread pool and returns an awaitable for its result.
+        """
+        loop = self.__loop or asyncio.get_event_loop()
+        return loop.run_in_executor(self.__executor, functools.partial(method, *args, **kwargs))
+
+    @property
+    def azkaban(self):
+        """The wrapped blocking Azkaban instance"""
+
+        return self.__azkaban
+
+    def close(self):
+        """Shuts down the thread pool, waiting for the requests in flight"""
+
+        self.__executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_logged_session(self):
+        """Same as :meth:`Azkaban.get_logged_session`, it does not make any request"""
+
+        return self.__azkaban.get_logged_session()
+
+    def set_logged_session(self, host, user, session_id):
+        """Same as :meth:`Azkaban.set_logged_session`, it does not make any request"""
+
+        self.__azkaban.set_logged_session(host, user, session_id)
+
+    def get_session_config(self):
+        """Same as :meth:`Azkaban.get_session_config`, it does not make any request"""
+
+        return self.__azkaban.get_session_config()
+
+    def get_retry_stats(self):
+        """Same as :meth:`Azkaban.get_retry_stats`, it does not make any request"""
+
+        return self.__azkaban.get_retry_stats()
+
+    def add_request_hook(self, hook):
+        """Same as :meth:`Azkaban.add_request_hook`, hooks are called from the threads of the pool"""
+
+        self.__azkaban.add_request_hook(hook)
+
+    def remove_request_hook(self, hook):
+        """Same as :meth:`Azkaban.remove_request_hook`"""
+
+        self.__azkaban.remove_request_hook(hook)
+
+    def set_tracer(self, tracer):
+        """Same as :meth:`Azkaban.set_tracer`, requests are children of the last root span opened"""
+
+        self.__azkaban.set_tracer(tracer)
+
+    def logout(self):
+        """Same as :meth:`Azkaban.logout`, it does not make any request"""
+
+        self.__azkaban.logout()
+
+    async def login(self, host, user, password):
+        """Coroutine version of :meth:`Azkaban.login`"""
+
+        return await self.__run(self.__azkaban.login, host, user, password)
+
+    async def upload(self, path, project=None, zip_name=None, stream=False, cache=None, force=False):
+        """Coroutine version of :meth:`Azkaban.upload`"""
+
+        return await self.__run(self.__azkaban.upload, path, project, zip_name, stream=stream, cache=cache, force=force)
+
+    async def upload_many(self, paths, max_workers=8, processes=None, stream=False, cache=None, force=False):
+        """Coroutine version of :meth:`Azkaban.upload_many`"""
+
+        return await self.__run(
+            self.__azkaban.upload_many, paths, max_workers=max_workers, processes=processes, stream=stream, cache=cache,
+            force=force
+        )
+
+    async def schedule(self, project, flow, cron, cache=None, **execution_options):
+        """Coroutine version of :meth:`Azkaban.schedule`"""
+
+        return await self.__run(self.__azkaban.schedule, project, flow, cron, cache=cache, **execution_options)
+
+    async def fetch_flows(self, project, cache=None):
+        """Coroutine version of :meth:`Azkaban.fetch_flows`"""
+
+        return await self.__run(self.__azkaban.fetch_flows, project, cache)
+
+    async def fetch_project_id(self, project, cache=None):
+        """Coroutine version of :meth:`Azkaban.fetch_project_id`"""
+
+        return await self.__run(self.__azkaban.fetch_project_id, project, cache)
+
+    async def fetch_jobs_from_flow(self, project, flow):
+        """Coroutine version of :meth:`Azkaban.fetch_jobs_from_flow`"""
+
+        return await self.__run(self.__azkaban.fetch_jobs_from_flow, project, flow)
+
+    async def fetch_schedule(self, project_id, flow, cache=None):
+        """Coroutine version of :meth:`Azkaban.fetch_schedule`"""
+
+        return await self.__run(self.__azkaban.fetch_schedule, project_id, flow, cache)
+
+    async def fetch_schedule_id(self, project_id, flow, cache=None):
+        """Coroutine version of :meth:`Azkaban.fetch_schedule_id`"""
+
+        return await self.__run(self.__azkaban.fetch_schedule_id, project_id, flow, cache)
+
+    async def unschedule(self, schedule_id):
+        """Coroutine version of :meth:`Azkaban.unschedule`"""
+
+        return await self.__run(self.__azkaban.unschedule, schedule_id)
+
+    async def unschedule_flow(self, project, flow, project_id=None, cache=None):
+        """Coroutine version of :meth:`Azkaban.unschedule_flow`"""
+
+        return await self.__run(self.__azkaban.unschedule_flow, project, flow, project_id=project_id, cache=cache)
+
+    async def unschedule_flows(self, project, flows, project_id=None, max_workers=8, cache=None, dry_run=False):
+        """Coroutine version of :meth:`Azkaban.unschedule_flows`"""
+
+        return await self.__run(
+            self.__azkaban.unschedule_flows, project, flows, project_id=project_id, max_workers=max_workers,
+            cache=cache, dry_run=dry_run
+        )
+
+    async def execute(self, project, flow, **execution_options):
+        """Coroutine version of :meth:`Azkaban.execute`"""
+
+        return await self.__run(self.__azkaban.execute, project, flow, **execution_options)
+
+    async def cancel(self, execution_id):
+        """Coroutine version of :meth:`Azkaban.cancel`"""
+
+        return await self.__run(self.__azkaban.cancel, execution_id)
+
+    async def create(self, project, description):
+        """Coroutine version of :meth:`Azkaban.create`"""
+
+        return await self.__run(self.__azkaban.create, project, description)
+
+    async def delete(self, project, cache=None):
+        """Coroutine version of :meth:`Azkaban.delete`"""
+
+        return await self.__run(self.__azkaban.delete, project, cache)
+
+    async def fetch_projects(self):
+        """Coroutine version of :meth:`Azkaban.fetch_projects`"""
+
+        return await self.__run(self.__azkaban.fetch_projects)
+
+    def iter_projects(self):
+        """Async iterator version of :meth:`Azkaban.iter_projects`, use it with async for"""
+
+        return _ThreadIterator(self.__run, self.__azkaban.iter_projects())
+
+    async def add_permission(self, project, group, permission_options):
+        """Coroutine version of :meth:`Azkaban.add_permission`"""
+
+        return await self.__run(self.__azkaban.add_permission, project, group, permission_options)
+
+    async def remove_permission(self, project, group):
+        """Coroutine version of :meth:`Azkaban.remove_permission`"""
+
+        return await self.__run(self.__azkaban.remove_permission, project, group)
+
+    async def change_permission(self, project, group, permission_options):
+        """Coroutine version of :meth:`Azkaban.change_permission`"""
+
+        return await self.__run(self.__azkaban.change_permission, project, group, permission_options)
+
+    async def fetch_group_permissions(self, project):
+        """Coroutine version of :meth:`Azkaban.fetch_group_permissions`"""
+
+        return await self.__run(self.__azkaban.fetch_group_permissions, project)
+
+    async def sync_permissions(self, permissions, max_workers=8, dry_run=False):
+        """Coroutine version of :meth:`Azkaban.sync_permissions`"""
+
+        return await self.__run(self.__azkaban.sync_permissions, permissions, max_workers=max_workers, dry_run=dry_run)
+
+    async def fetch_sla(self, schedule_id):
+        """Coroutine version of :meth:`Azkaban.fetch_sla`"""
+
+        return await self.__run(self.__azkaban.fetch_sla, schedule_id)
+
+    async def fetch_flow_execution(self, execution_id):
+        """Coroutine version of :meth:`Azkaban.fetch_flow_execution`"""
+
+        return await self.__run(self.__azkaban.fetch_flow_execution, execution_id)
+
+    async def fetch_flow_execution_updates(self, execution_id, last_update_time):
+        """Coroutine version of :meth:`Azkaban.fetch_flow_execution_updates`"""
+
+        return await self.__run(self.__azkaban.fetch_flow_execution_updates, execution_id, last_update_time)
+
+    def watch_execution(self, execution_id, interval=5.0):
+        """Async iterator version of :meth:`Azkaban.watch_execution`, the waits take a thread"""
+
+        return _ThreadIterator(self.__run, self.__azkaban.watch_execution(execution_id, interval=interval))
+
+    def watch_executions(self, execution_ids, min_interval=1.0, max_interval=30.0, max_workers=8):
+        """Async iterator version of :meth:`Azkaban.watch_executions`, the waits take a thread"""
+
+        return _ThreadIterator(self.__run, self.__azkaban.watch_executions(
+            execution_ids, min_interval=min_interval, max_interval=max_interval, max_workers=max_workers
+        ))
+
+    async def fetch_executions_of_a_flow(self, project, flow, start, length):
+        """Coroutine version of :meth:`Azkaban.fetch_executions_of_a_flow`"""
+
+        return await self.__run(self.__azkaban.fetch_executions_of_a_flow, project, flow, start, length)
+
+    async def fetch_execution_job_log(self, execution_id, jobid, offset, length):
+        """Coroutine version of :meth:`Azkaban.fetch_execution_job_log`"""
+
+        return await self.__run(self.__azkaban.fetch_execution_job_log, execution_id, jobid, offset, length)
+
+    def follow_execution_job_log(self, execution_id, jobid, offset=0, length=50000, min_interval=1.0,
+                                 max_interval=30.0):
+        """Async iterator version of :meth:`Azkaban.follow_execution_job_log`, the waits take a thread"""
+
+        return _ThreadIterator(self.__run, self.__azkaban.follow_execution_job_log(
+            execution_id, jobid, offset=offset, length=length, min_interval=min_interval, max_interval=max_interval
+        ))
+
+    async def download_execution_logs(self, execution_id, directory, chunk_size=50000, max_workers=8, compress=False):
+        """Coroutine version of :meth:`Azkaban.download_execution_logs`"""
+
+        return await self.__run(
+            self.__azkaban.download_execution_logs, execution_id, directory, chunk_size=chunk_size,
+            max_workers=max_workers, compress=compress
+        )
+
+    async def resume_flow_execution(self, execution_id):
+        """Coroutine version of :meth:`Azkaban.resume_flow_execution`"""
+
+        return await self.__run(self.__azkaban.resume_flow_execution, execution_id)
+
+    async def fetch_running_executions_of_a_flow(self, project, flow):
+        """Coroutine version of :meth:`Azkaban.fetch_running_executions_of_a_flow`"""
+
+        return await self.__run(self.__azkaban.fetch_running_executions_of_a_flow, project, flow)
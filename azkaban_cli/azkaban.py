@@ -2,15 +2,30 @@
 
 from __future__ import absolute_import
 
+import codecs
+import glob
+import gzip
+import heapq
 import logging
 import os
-from shutil import make_archive
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
-import requests
 import urllib3
+try:
+    import orjson
+except ImportError:
+    orjson = None
 from urllib3.exceptions import InsecureRequestWarning
 
 import azkaban_cli.api as api
+from azkaban_cli.archive import iter_zip, make_archive
+from azkaban_cli.projects import ProjectInfoParser
+from azkaban_cli.retry import RETRY_EXCEPTIONS
+from azkaban_cli.session import create_session, instrument_connections, load_session_config
+from azkaban_cli.watcher import ExecutionState, FINISHED_STATUSES
 from azkaban_cli.exceptions import (
     NotLoggedOnError,
     SessionError,
@@ -18,6 +33,7 @@ from azkaban_cli.exceptions import (
     UploadError,
     ScheduleError,
     FetchFlowsError,
+    FetchProjectsError,
     FetchJobsFromFlowError,
     FetchScheduleError,
     FetchSLAError,
@@ -33,17 +49,58 @@ from azkaban_cli.exceptions import (
     FetchExecutionsOfAFlowError,
     FetchExecutionJobsLogError,
     ResumeFlowExecutionError,
-    FetchRunningExecutionsOfAFlowError
+    FetchRunningExecutionsOfAFlowError,
+    FetchGroupPermissionsError,
+    CircuitOpenError
 )
 
+PROJECTS_CHUNK_SIZE = 64 * 1024
+
+EMPTY_RESPONSE_MESSAGE = u"Empty response"
+
+PERMISSION_OPTIONS = (u"admin", u"read", u"write", u"execute", u"schedule")
+
+LOGIN_ERROR_TEXT = u"Login error. Need username and password"
+LOGIN_ERROR_TEXT_LENGTH = len(LOGIN_ERROR_TEXT) + 8
+LOGIN_ERROR_BODY = LOGIN_ERROR_TEXT.encode("utf-8")
+
+# The login page references its script in the head, there is no need to look further than this
+LOGIN_PAGE_SCRIPT = b'<script type="text/javascript" src="/js/azkaban/view/login.js"></script>'
+LOGIN_PAGE_SCAN_LENGTH = 8 * 1024
+
+
+def is_empty_response(exception):
+    """
+    Returns True if the exception was raised because Azkaban answered an empty json, such as the answer of
+    fetchSchedule for a flow without a schedule
+
+    :param Exception exception: Exception raised by an Azkaban method
+    :rtype: bool
+    """
+
+    return getattr(exception, u'empty_response', False)
+
 
 class Azkaban(object):
-    def __init__(self):
+    def __init__(self, config_path=None, **session_options):
+        """
+        Client for the Azkaban ajax api.
+
+        The connection pool sizes, timeouts and TCP keep-alive of the underlying session can be passed as keyword
+        arguments, set with AZKABAN_CLI_* environment variables or in the "session" section of a json config file.
+        See azkaban_cli.session.SESSION_OPTIONS.
+
+        :param str config_path: Path of the json config file, optional
+        :param session_options: Session options, such as pool_maxsize or read_timeout, optional
+        :raises SessionConfigError: when a session option is unknown or invalid
+        """
+
         # Session ignoring SSL verify requests
-        session = requests.Session()
-        session.verify = False
+        session_config = load_session_config(config_path, **session_options)
+        session = create_session(session_config)
         urllib3.disable_warnings(InsecureRequestWarning)
 
+        self.__session_config = session_config
         self.__session = session
         self.__host = None
         self.__user = None
@@ -73,11 +130,11 @@ class Azkaban(object):
 
     def __catch_login_html(self, response):
         """ PRIVATE
-        Checks the content in the verification is in at least one line of the response.
-        :raise: SessionError when content not in response lines.
+        Looks for the login page script in the beginning of the response, only when the response is html.
+        :raise: SessionError when the response is the login page.
         """
-        if "  <script type=\"text/javascript\" src=\"/js/azkaban/view/login.js\"></script>" in \
-                response.text.splitlines():
+        head = response.content[:LOGIN_PAGE_SCAN_LENGTH]
+        if head.lstrip()[:1] == b"<" and LOGIN_PAGE_SCRIPT in head:
             raise SessionError(response.text)
 
     def __catch_response_status_error(self, exception, response_json):
@@ -104,18 +161,20 @@ class Azkaban(object):
     def __catch_empty_response(self, exception, response_json):
         """ PRIVATE
         Does not allow an empty response.
-        :raise: exception
+        :raise: exception, with the empty_response attribute set, see is_empty_response
         """
         if response_json == {}:
-            raise exception('Empty response')
+            error = exception(EMPTY_RESPONSE_MESSAGE)
+            error.empty_response = True
+            raise error
 
     def __catch_login_text(self, response):
         """ PRIVATE
         Do not allow an empty login attempt.
         :raise: SessionError("Login error. Need username and password")
         """
-        if response.text == "Login error. Need username and password":
-            raise SessionError(response.text)
+        if response.content == LOGIN_ERROR_BODY:
+            raise SessionError(LOGIN_ERROR_TEXT)
 
     def __catch_login(self, response):
         """ PRIVATE
@@ -124,17 +183,28 @@ class Azkaban(object):
         self.__catch_login_text(response)
         self.__catch_login_html(response)
 
+    def __decode_json(self, response):
+        """ PRIVATE
+        Parses the response body, with orjson when it is installed.
+        """
+        if orjson is not None and isinstance(response.content, bytes):
+            return orjson.loads(response.content)
+
+        return response.json()
+
     def __catch_response_error(self, response, exception, ignore_empty_responses=False):
         """ PRIVATE
         Try to get the answer json. If an error occurs, define response_json as an empty json, send it
         together with the input to the error functions.
+        :return: The parsed response json, so callers don't need to parse the body again
+        :rtype: dict
         """
         self.__catch_login(response)
 
-        # Some ajax api operations don`t have return body making response.json() raise a ValueError exception
+        # Some ajax api operations don`t have return body making the json decoding raise a ValueError exception
         # The try block enable the __catch_empty_response raise the correct exception
         try:
-            response_json = response.json()
+            response_json = self.__decode_json(response)
         except Exception:
             response_json = {}
 
@@ -145,6 +215,24 @@ class Azkaban(object):
         if not ignore_empty_responses:
             self.__catch_empty_response(exception, response_json)
 
+        return response_json
+
+    def __catch_cached_response_error(self, response, exception, cache, invalidate):
+        """ PRIVATE
+        Same as __catch_response_error, also dropping the metadata cache entries that may be stale: every entry of the
+        host on SessionError, or the ones removed by the invalidate callable on exception.
+        """
+        try:
+            return self.__catch_response_error(response, exception)
+        except SessionError:
+            if cache is not None:
+                cache.invalidate_host(self.__host)
+            raise
+        except exception:
+            if cache is not None:
+                invalidate()
+            raise
+
     def get_logged_session(self):
         """
         Method for return the host and session id of the logged session saved on the class
@@ -179,6 +267,61 @@ class Azkaban(object):
 
         self.set_logged_session(None, None, None)
 
+    def get_session_config(self):
+        """
+        Method for return the session options the instance was created with
+
+        :return: A dictionary with a value for every session option, see azkaban_cli.session.SESSION_OPTIONS
+        :rtype: dict
+        """
+
+        return dict(self.__session_config)
+
+    def get_retry_stats(self):
+        """
+        Method for return the retry counters of the session, to be exported as metrics
+
+        :return: A dictionary containing requests, retries, gave_up and budget_exhausted as keys
+        :rtype: dict
+        """
+
+        return self.__session.retry_policy.stats
+
+    def add_request_hook(self, hook):
+        """
+        Method for adding a function called with the metrics of every request made, such as the endpoint, ajax action,
+        status, bytes sent and received, retries and timings. See azkaban_cli.metrics for the metrics and for
+        RequestMetrics, a hook aggregating them.
+
+        New connections are timed from the first hook on, the ones already open are closed.
+
+        :param hook: Function receiving a dictionary with the metrics of a request
+        """
+
+        instrument_connections(self.__session)
+        self.__session.request_hooks.append(hook)
+
+    def remove_request_hook(self, hook):
+        """
+        Method for removing a function added with add_request_hook
+
+        :param hook: Function passed to add_request_hook
+        """
+
+        if hook in self.__session.request_hooks:
+            self.__session.request_hooks.remove(hook)
+
+    def set_tracer(self, tracer):
+        """
+        Method for setting the tracer recording a span for every request made, child of the span open when the request
+        is made. See azkaban_cli.tracing.
+
+        :param tracer: Tracer, None stops tracing
+        :type tracer: azkaban_cli.tracing.Tracer
+        """
+
+        self.__session.tracer = tracer
+
     def login(self, host, user, password):
         """
         Login command, intended to make the request to Azkaban and treat the response properly
@@ -198,14 +341,12 @@ class Azkaban(object):
 
         response = api.login_request(self.__session, valid_host, user, password)
 
-        self.__catch_response_error(response, LoginError)
-
-        response_json = response.json()
+        response_json = self.__catch_response_error(response, LoginError)
         self.set_logged_session(valid_host, user, response_json['session.id'])
 
         logging.info('Logged as %s' % (user))
 
-    def upload(self, path, project=None, zip_name=None):
+    def upload(self, path, project=None, zip_name=None, stream=False, cache=None, force=False):
         """
         Upload command, intended to make the request to Azkaban and treat the response properly
 
@@ -213,14 +354,27 @@ class Azkaban(object):
         zip this path (as Azkaban expects it zipped), make the upload request to Azkaban, deletes the zip that was
         created and evaluate the response.
 
+        If stream is True, the zip is built on the fly while it is sent to Azkaban, so nothing is written to disk and
+        memory use does not depend on the project size.
+
         If project name is not passed as argument, it will be assumed that the project name is the basename of the path
         passed. If zip name is not passed as argument, the project name will be used for the zip.
 
         If project or path is wrong or if there is no session_id, it returns false. If everything is fine, returns True.
 
+        If an upload cache is passed, the content hash of the path is compared with the one saved by the last upload of
+        the project to the same host. When it did not change and the project still has the same id on Azkaban, the
+        upload is skipped and no new project version is created, unless force is True.
+
         :param str path: path to be zipped and uploaded
         :param str project: Project name on Azkaban, optional.
         :param str zip_name: Zip name that will be created and uploaded, optional.
+        :param bool stream: Stream the zip instead of creating it on disk, optional.
+        :param cache: Cache of the trees already uploaded, optional.
+        :type cache: azkaban_cli.cache.UploadCache
+        :param bool force: Upload even if the tree did not change since the last upload, optional.
+        :return: A dictionary containing projectId and version as keys
+        :rtype: dict
         :raises UploadError: when Azkaban api returns error in response
         """
 
@@ -234,22 +388,144 @@ class Azkaban(object):
             # define zip name as project name
             zip_name = project
 
+        return self.__upload(path, project, zip_name, stream, cache, force)
+
+    def upload_many(self, paths, max_workers=8, processes=None, stream=False, cache=None, force=False):
+        """
+        Upload many command, intended to upload many projects at the same time.
+
+        This method receives a list of paths or glob patterns of directories, each one uploaded to the project named as
+        its basename, the same way the upload method does. The zips are created in a process pool and uploaded over a
+        bounded pool of concurrent requests, so the compression of a project overlaps with the upload of the others.
+
+        A failure in one project does not stop the others, it is reported in its result instead.
+
+        :param list paths: Paths or glob patterns of directories to be zipped and uploaded
+        :param int max_workers: Maximum number of concurrent upload requests, optional.
+        :param int processes: Number of processes creating zips, optional. Defaults to the number of CPUs, 0 creates
+         the zips in the upload threads.
+        :param bool stream: Stream the zips instead of creating them on disk, optional. No process pool is used.
+        :param cache: Cache of the trees already uploaded, optional.
+        :type cache: azkaban_cli.cache.UploadCache
+        :param bool force: Upload even if the tree did not change since the last upload, optional.
+        :return: A list of dictionaries containing project, path, version, skipped and error as keys, in the order of
+         the paths
+        :rtype: list
+        :raises NotLoggedOnError: when there is no logged session
+        """
+
+        self.__check_if_logged()
+
+        expanded_paths = []
+        for path in paths:
+            if glob.has_magic(path):
+                expanded_paths.extend(sorted(p for p in glob.glob(path) if os.path.isdir(p)))
+            else:
+                expanded_paths.append(path)
+
+        temp_dir = tempfile.mkdtemp()
+        archive_pool = None if stream or processes == 0 else ProcessPoolExecutor(max_workers=processes)
+
+        def upload_one(path):
+            project = os.path.basename(os.path.abspath(path))
+            result = {u'project': project, u'path': path, u'version': None, u'skipped': False, u'error': None}
+            # Paths with the same basename are uploaded to the same project, each zip gets its own directory
+            zip_name = project if stream else os.path.join(tempfile.mkdtemp(dir=temp_dir), project)
+
+            try:
+                response_json = self.__upload(path, project, zip_name, stream, cache, force, archive_pool)
+                result[u'version'] = response_json[u'version']
+                result[u'skipped'] = response_json.get(u'skipped', False)
+            except SessionError:
+                raise
+            except Exception as e:
+                result[u'error'] = str(e) or e.__class__.__name__
+
+            return result
+
         try:
-            zip_path = make_archive(zip_name, 'zip', path)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(upload_one, expanded_paths))
+        finally:
+            if archive_pool is not None:
+                archive_pool.shutdown()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def __upload(self, path, project, zip_name, stream, cache, force, archive_pool=None):
+        """ PRIVATE
+        Checks the upload cache, uploads the project and evaluates the response.
+        """
+        if cache is not None:
+            if not os.path.isdir(path):
+                raise UploadError("No such directory: '%s'" % (path))
+
+            digest, files = cache.hash_tree(self.__host, project, path)
+            cached = cache.get(self.__host, project)
+
+            if not force and cached and cached[u'digest'] == digest and self.__same_project_id(project, cached):
+                logging.info('Project %s is unchanged since version %s, upload skipped' % (project, cached[u'version']))
+                return {u'projectId': cached[u'projectId'], u'version': cached[u'version'], u'skipped': True}
+
+        if stream:
+            response = self.__upload_stream(path, project, zip_name)
+        else:
+            response = self.__upload_archive(path, project, zip_name, archive_pool)
+
+        response_json = self.__catch_response_error(response, UploadError)
+        logging.info('Project %s updated to version %s' % (project, response_json[u'version']))
+
+        if cache is not None:
+            cache.set(self.__host, project, digest, files, response_json.get(u'projectId'), response_json[u'version'])
+
+        return response_json
+
+    def __same_project_id(self, project, cached):
+        """ PRIVATE
+        Checks if the project still has the id saved in the upload cache, it changes when the project is recreated.
+        """
+        response = api.fetch_flows_request(self.__session, self.__host, self.__session_id, project)
+
+        try:
+            response_json = self.__catch_response_error(response, FetchFlowsError)
+        except FetchFlowsError:
+            return False
+
+        return str(response_json.get(u'projectId')) == str(cached[u'projectId'])
+
+    def __upload_archive(self, path, project, zip_name, archive_pool=None):
+        """ PRIVATE
+        Creates the zip on disk, in the process pool if one is passed, uploads it and deletes it.
+        """
+        try:
+            if archive_pool is not None:
+                zip_path = archive_pool.submit(make_archive, zip_name, 'zip', path).result()
+            else:
+                zip_path = make_archive(zip_name, 'zip', path)
         except FileNotFoundError as e:
             raise UploadError(str(e))
 
         try:
-            response = api.upload_request(self.__session, self.__host, self.__session_id, project, zip_path)
+            return api.upload_request(self.__session, self.__host, self.__session_id, project, zip_path)
         finally:
             os.remove(zip_path)
 
-        self.__catch_response_error(response, UploadError)
+    def __upload_stream(self, path, project, zip_name):
+        """ PRIVATE
+        Uploads the zip while it is being built, without writing it on disk.
+        """
+        if not os.path.isdir(path):
+            raise UploadError("No such directory: '%s'" % (path))
 
-        response_json = response.json()
-        logging.info('Project %s updated to version %s' % (project, response_json[u'version']))
+        return api.upload_stream_request(
+            self.__session,
+            self.__host,
+            self.__session_id,
+            project,
+            zip_name + '.zip',
+            iter_zip(path)
+        )
 
-    def schedule(self, project, flow, cron, **execution_options):
+    def schedule(self, project, flow, cron, cache=None, **execution_options):
         """
         Schedule command, intended to make the request to Azkaban and treat the response properly.
 
@@ -259,9 +535,13 @@ class Azkaban(object):
         If project, flow or cron is wrong or if there is no session_id, it returns false. If everything is fine, returns
         True.
 
+        If a metadata cache is passed, the schedule id it has for the flow, replaced by the new one, is removed from it.
+
         :param str project: Project name on Azkaban
         :param str flow: Flow name on Azkaban
         :param str cron: Cron expression, in quartz format [Eg.: '0*/10*?**' -> Every 10 minutes]
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
         :raises ScheduleError: when Azkaban api returns error in response
         """
 
@@ -279,13 +559,19 @@ class Azkaban(object):
             **execution_options
         )
 
-        self.__catch_response_error(response, ScheduleError)
-
-        response_json = response.json()
+        response_json = self.__catch_cached_response_error(
+            response, ScheduleError, cache, lambda: cache.invalidate_project(self.__host, project)
+        )
         logging.info(response_json[u'message'])
         logging.info('scheduleId: %s' % (response_json[u'scheduleId']))
 
-    def fetch_flows(self, project):
+        # The response has no project id and the cached one may be stale, so the new schedule id is not cached under
+        # it, only the schedule id it replaces is dropped
+        project_id = cache.get_project_id(self.__host, project) if cache is not None else None
+        if project_id is not None:
+            cache.invalidate_schedule(self.__host, project_id, flow)
+
+    def fetch_flows(self, project, cache=None):
         """
         Fetch flows command, intended to make the request to Azkaban and treat the response properly.
 
@@ -295,7 +581,11 @@ class Azkaban(object):
         If project is wrong or there is no session_id, it returns false. If everything is fine, returns
         True.
 
+        If a metadata cache is passed, the project id is saved in it, or removed from it when the request fails.
+
         :param str project: project name on Azkaban
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
         :raises FetchFlowsError: when Azkaban api returns error in response
         """
 
@@ -308,12 +598,34 @@ class Azkaban(object):
             project
         )
 
-        self.__catch_response_error(response, FetchFlowsError)
-
-        response_json = response.json()
+        response_json = self.__catch_cached_response_error(
+            response, FetchFlowsError, cache, lambda: cache.invalidate_project(self.__host, project)
+        )
         logging.info('Project ID: %s' % (response_json[u'projectId']))
+
+        if cache is not None:
+            cache.set_project_id(self.__host, project, response_json[u'projectId'])
+
         return response_json
 
+    def fetch_project_id(self, project, cache=None):
+        """
+        Returns the id of the project, from the metadata cache when it has it or from a fetch flows request otherwise
+
+        :param str project: project name on Azkaban
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
+        :raises FetchFlowsError: when Azkaban api returns error in response
+        """
+
+        self.__check_if_logged()
+
+        project_id = cache.get_project_id(self.__host, project) if cache is not None else None
+        if project_id is not None:
+            return project_id
+
+        return self.fetch_flows(project, cache)[u'projectId']
+
     def fetch_jobs_from_flow(self, project, flow):
         """
         Fetch jobs of a flow command, intended to make the request to Azkaban and return
@@ -339,11 +651,9 @@ class Azkaban(object):
             flow
         )
 
-        self.__catch_response_error(response, FetchJobsFromFlowError)
-
-        return response.json()
+        return self.__catch_response_error(response, FetchJobsFromFlowError)
 
-    def fetch_schedule(self, project_id, flow):
+    def fetch_schedule(self, project_id, flow, cache=None):
         """
         Fetch schedule command, intended to make the request to Azkaban and treat the response properly.
 
@@ -353,8 +663,12 @@ class Azkaban(object):
         If project_id or flow is wrong or there is no session_id, it returns false. If everything is fine, returns
         True.
 
+        If a metadata cache is passed, the schedule id is saved in it, or removed from it when the request fails.
+
         :param str project_id: project id on Azkaban
         :param str flow: flow name on Azkaban
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
         :raises FetchScheduleError: when Azkaban api returns error in response
         """
 
@@ -368,12 +682,36 @@ class Azkaban(object):
             flow
         )
 
-        self.__catch_response_error(response, FetchScheduleError)
-
-        response_json = response.json()
+        response_json = self.__catch_cached_response_error(
+            response, FetchScheduleError, cache, lambda: cache.invalidate_schedule(self.__host, project_id, flow)
+        )
         logging.info('Schedule ID: %s' % (response_json[u'schedule'][u'scheduleId']))
+
+        if cache is not None:
+            cache.set_schedule_id(self.__host, project_id, flow, response_json[u'schedule'][u'scheduleId'])
+
         return response_json
 
+    def fetch_schedule_id(self, project_id, flow, cache=None):
+        """
+        Returns the schedule id of the flow, from the metadata cache when it has it or from a fetch schedule request
+        otherwise
+
+        :param str project_id: project id on Azkaban
+        :param str flow: flow name on Azkaban
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
+        :raises FetchScheduleError: when Azkaban api returns error in response
+        """
+
+        self.__check_if_logged()
+
+        schedule_id = cache.get_schedule_id(self.__host, project_id, flow) if cache is not None else None
+        if schedule_id is not None:
+            return schedule_id
+
+        return self.fetch_schedule(project_id, flow, cache)[u'schedule'][u'scheduleId']
+
     def unschedule(self, schedule_id):
         """
         Unschedule command, intended to make the request to Azkaban and treat the response properly.
@@ -397,11 +735,137 @@ class Azkaban(object):
             schedule_id
         )
 
-        self.__catch_response_error(response, UnscheduleError)
-
-        response_json = response.json()
+        response_json = self.__catch_response_error(response, UnscheduleError)
         logging.info(response_json[u'message'])
 
+    def unschedule_flow(self, project, flow, project_id=None, cache=None):
+        """
+        Unschedules a flow given the project and flow names, looking up the project id and the schedule id first.
+
+        With a metadata cache, the ids are taken from it when possible, so unscheduling takes a single request. If the
+        unschedule request fails with cached ids, or the schedule cannot be fetched with a cached project id, they may
+        be stale, so they are dropped and looked up again.
+
+        :param str project: Project name on Azkaban
+        :param str flow: Flow name on Azkaban
+        :param project_id: Project id on Azkaban, optional. Looked up when not passed.
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
+        :raises FetchFlowsError: when the project cannot be found
+        :return: The schedule id of the flow before it was unscheduled
+        :raises FetchScheduleError: when the flow is not scheduled
+        :raises UnscheduleError: when Azkaban api returns error in response
+        """
+
+        self.__check_if_logged()
+
+        try:
+            if cache is not None:
+                if project_id is None:
+                    project_id = cache.get_project_id(self.__host, project)
+                schedule_id = cache.get_schedule_id(self.__host, project_id, flow) if project_id is not None else None
+
+                if schedule_id is not None:
+                    try:
+                        self.unschedule(schedule_id)
+                    except UnscheduleError:
+                        logging.debug('Cached schedule id %s of flow %s is stale' % (schedule_id, flow))
+                        cache.invalidate_project(self.__host, project)
+                        project_id = None
+                    else:
+                        cache.invalidate_schedule(self.__host, project_id, flow)
+                        return schedule_id
+
+            project_id, schedule_id = self.__lookup_schedule_id(project, flow, project_id, cache)
+            self.unschedule(schedule_id)
+        except SessionError:
+            if cache is not None:
+                cache.invalidate_host(self.__host)
+            raise
+
+        if cache is not None:
+            cache.invalidate_schedule(self.__host, project_id, flow)
+
+        return schedule_id
+
+    def __lookup_schedule_id(self, project, flow, project_id=None, cache=None):
+        """ PRIVATE
+        Returns the project id and the schedule id of the flow. A project id taken from the metadata cache may belong
+        to a project that was deleted and created again, so when the schedule cannot be fetched with it, the project id
+        is looked up again and, if it changed, the schedule is fetched once more.
+        :raise: FetchFlowsError or FetchScheduleError
+        """
+        cached_project_id = cache.get_project_id(self.__host, project) if cache is not None else None
+        if project_id is None:
+            project_id = self.fetch_project_id(project, cache)
+
+        try:
+            return project_id, self.fetch_schedule_id(project_id, flow, cache)
+        except FetchScheduleError:
+            if cached_project_id is None or cached_project_id != project_id:
+                raise
+
+            # Another flow may have replaced the stale id already
+            current_project_id = cache.get_project_id(self.__host, project)
+            if current_project_id is None or current_project_id == project_id:
+                logging.debug('Cached project id %s of project %s may be stale' % (project_id, project))
+                cache.invalidate_project(self.__host, project)
+                current_project_id = self.fetch_project_id(project, cache)
+            if current_project_id == project_id:
+                raise
+
+        return current_project_id, self.fetch_schedule_id(current_project_id, flow, cache)
+
+    def unschedule_flows(self, project, flows, project_id=None, max_workers=8, cache=None, dry_run=False):
+        """
+        Unschedules many flows of a project at the same time, over a bounded pool of concurrent requests.
+
+        A failure in one flow does not stop the others, it is reported in its result instead. Flows that are not
+        scheduled are reported with scheduled False. If dry_run is True, the schedules are only looked up.
+
+        :param str project: Project name on Azkaban
+        :param list flows: Flow names on Azkaban
+        :param project_id: Project id on Azkaban, optional. Looked up once when not passed.
+        :param int max_workers: Maximum number of concurrent requests, optional.
+        :param cache: Metadata cache, optional
+        :type cache: azkaban_cli.cache.MetadataCache
+        :param bool dry_run: Only look up the schedules, without unscheduling them, optional.
+        :return: A list of dictionaries containing flow, scheduled, scheduleId and error as keys, in the order of the
+         flows
+        :rtype: list
+        :raises NotLoggedOnError: when there is no logged session
+        :raises FetchFlowsError: when the project cannot be found
+        """
+
+        self.__check_if_logged()
+
+        if project_id is None:
+            project_id = self.fetch_project_id(project, cache)
+            if cache is not None:
+                # Each flow reads it from the cache, so once a stale id is replaced every flow uses the new one
+                project_id = None
+
+        def unschedule_one(flow):
+            result = {u'flow': flow, u'scheduled': False, u'scheduleId': None, u'error': None}
+
+            try:
+                if dry_run:
+                    result[u'scheduleId'] = self.__lookup_schedule_id(project, flow, project_id, cache)[1]
+                else:
+                    result[u'scheduleId'] = self.unschedule_flow(project, flow, project_id, cache)
+                result[u'scheduled'] = True
+            except FetchScheduleError as e:
+                # Azkaban answers an empty json when the flow has no schedule
+                if not is_empty_response(e):
+                    result[u'error'] = str(e)
+            except (FetchFlowsError, UnscheduleError) as e:
+                result[u'error'] = str(e) or e.__class__.__name__
+
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(unschedule_one, flows))
+
     def execute(self, project, flow, **execution_options):
         """
         Execute command, intended to make the request to Azkaban and treat the response properly.
@@ -429,9 +893,7 @@ class Azkaban(object):
             **execution_options
         )
 
-        self.__catch_response_error(response, ExecuteError)
-
-        response_json = response.json()
+        response_json = self.__catch_response_error(response, ExecuteError)
         logging.info('%s' % (response_json[u'message']))
 
     def cancel(self, execution_id):
@@ -483,7 +945,7 @@ class Azkaban(object):
 
         logging.info('Project %s created successfully' % (project))
 
-    def delete(self, project):
+    def delete(self, project, cache=None):
         """
         Delete command, intended to make the request to Azkaban and treat the response properly.
 
@@ -491,6 +953,8 @@ class Azkaban(object):
         evaluate the response.
 
         :param str project: Project name on Azkaban
+        :param cache: Metadata cache to remove the project ids from, optional
+        :type cache: azkaban_cli.cache.MetadataCache
         """
 
         self.__check_if_logged()
@@ -504,10 +968,33 @@ class Azkaban(object):
 
         # The delete request does not return any message
 
+        if cache is not None:
+            cache.invalidate_project(self.__host, project)
+
     def fetch_projects(self):
         """
         Fetch all projects command, intended to make the request to Azkaban and treat the response properly.
         This method makes the fetch projects request to fetch all the projects and evaluates the response.
+
+        :return: A list of dictionaries containing name, user and description as keys, see iter_projects
+        :rtype: list
+        :raises SessionError: when the session expired
+        :raises FetchProjectsError: when the index page cannot be parsed
+        """
+
+        return list(self.iter_projects())
+
+    def iter_projects(self):
+        """
+        Iterate projects command, intended to list the projects without loading the whole index page in memory.
+
+        This method makes the fetch projects request and parses the html of the index page while it is downloaded,
+        yielding each project as soon as its project-info block is parsed.
+
+        :return: A generator of dictionaries containing name, user (who last modified it) and description as keys
+        :rtype: generator
+        :raises SessionError: when the session expired
+        :raises FetchProjectsError: when the index page cannot be parsed
         """
 
         self.__check_if_logged()
@@ -515,13 +1002,50 @@ class Azkaban(object):
         response = api.fetch_projects_request(
             self.__session,
             self.__host,
-            self.__session_id
+            self.__session_id,
+            stream=True
         )
 
+        parser = ProjectInfoParser()
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+        except (LookupError, TypeError):
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        head = u''
+
+        def feed(text, final=False):
+            try:
+                parser.feed(text)
+                if final:
+                    parser.close()
+            except Exception:
+                raise FetchProjectsError("Error parsing response")
+
+        try:
+            for chunk in response.iter_content(chunk_size=PROJECTS_CHUNK_SIZE):
+                text = decoder.decode(chunk)
+                if len(head) < LOGIN_ERROR_TEXT_LENGTH:
+                    head = (head + text)[:LOGIN_ERROR_TEXT_LENGTH]
+
+                feed(text)
+                if parser.login_page:
+                    raise SessionError('Session expired')
+
+                for project in parser.drain():
+                    yield project
+
+            feed(decoder.decode(b'', final=True), final=True)
+        finally:
+            response.close()
+
         # The fetch projects request returns an html content, so we only catch login errors
-        self.__catch_login(response)
+        if head.strip() == LOGIN_ERROR_TEXT:
+            raise SessionError(LOGIN_ERROR_TEXT)
+        if parser.login_page:
+            raise SessionError('Session expired')
 
-        return response.text
+        for project in parser.drain():
+            yield project
 
     def add_permission(self, project, group, permission_options):
         """
@@ -606,6 +1130,111 @@ class Azkaban(object):
 
         logging.info('Group [%s] AAA received new permissions [%s] in the Project [%s] successfully' % (group, permission_options, project))
 
+    def fetch_group_permissions(self, project):
+        """
+        Fetch group permissions command, intended to make the request to Azkaban and treat the response properly.
+
+        This method receives the project name, makes the request to fetch the permissions of the groups in the project
+        and evaluates the response.
+
+        :param str project: Project name on Azkaban
+        :return: A dictionary mapping each group name to its permissions, a dictionary with admin, read, write,
+         execute and schedule as keys. A group with admin permission has every permission.
+        :rtype: dict
+        :raises FetchGroupPermissionsError: when Azkaban api returns error in response
+        """
+
+        self.__check_if_logged()
+
+        response = api.fetch_group_permissions_request(
+            self.__session,
+            self.__host,
+            self.__session_id,
+            project
+        )
+
+        response_json = self.__catch_response_error(response, FetchGroupPermissionsError)
+
+        group_permissions = {}
+        for permission in response_json.get(u'permissions', []):
+            granted = set(option.lower() for option in permission[u'permission'])
+            group_permissions[permission[u'username']] = {
+                option: u'admin' in granted or option in granted for option in PERMISSION_OPTIONS
+            }
+
+        return group_permissions
+
+    def sync_permissions(self, permissions, max_workers=8, dry_run=False):
+        """
+        Sync permissions command, intended to make the group permissions of many projects match the ones passed.
+
+        The current permissions of the projects are fetched over a bounded pool of concurrent requests and compared to
+        the passed ones, normalized the same way add_permission does. Only the groups whose permissions differ are
+        added, changed or removed, also concurrently. Groups not passed for a project are left as they are.
+
+        A failure in one change does not stop the others, it is reported in its result instead.
+
+        :param dict permissions: Dictionary mapping each project name to a dictionary mapping group names to
+         permission options, as in add_permission, or None to remove the group from the project
+        :param int max_workers: Maximum number of concurrent requests, optional.
+        :param bool dry_run: Only compute the changes, without applying them, optional.
+        :return: A list of dictionaries containing project, group, action (add, change or remove), permissions,
+         previous and error as keys
+        :rtype: list
+        :raises FetchGroupPermissionsError: when the permissions of a project cannot be fetched
+        """
+
+        self.__check_if_logged()
+
+        projects = sorted(permissions)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            current = dict(zip(projects, executor.map(self.fetch_group_permissions, projects)))
+
+        changes = []
+        for project in projects:
+            for group in sorted(permissions[project]):
+                options = permissions[project][group]
+                desired = self.__check_group_permissions(options) if options is not None else None
+                previous = current[project].get(group)
+
+                if desired == previous:
+                    continue
+
+                if desired is None:
+                    action = u'remove'
+                elif previous is None:
+                    action = u'add'
+                else:
+                    action = u'change'
+
+                changes.append({
+                    u'project': project,
+                    u'group': group,
+                    u'action': action,
+                    u'permissions': desired,
+                    u'previous': previous,
+                    u'error': None,
+                })
+
+        if dry_run:
+            return changes
+
+        def apply_one(change):
+            try:
+                if change[u'action'] == u'add':
+                    self.add_permission(change[u'project'], change[u'group'], change[u'permissions'])
+                elif change[u'action'] == u'change':
+                    self.change_permission(change[u'project'], change[u'group'], change[u'permissions'])
+                else:
+                    self.remove_permission(change[u'project'], change[u'group'])
+            except (AddPermissionError, ChangePermissionError, RemovePermissionError) as e:
+                change[u'error'] = str(e) or e.__class__.__name__
+
+            return change
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(apply_one, changes))
+
     def fetch_sla(self, schedule_id):
         """
         Fetch SLA command, intended to make the request to Azkaban and treat the response properly.
@@ -623,9 +1252,7 @@ class Azkaban(object):
             schedule_id
         )
 
-        self.__catch_response_error(response, FetchSLAError)
-
-        response_json = response.json()
+        response_json = self.__catch_response_error(response, FetchSLAError)
         return response_json
 
     def __check_group_permissions(self, permission_options):
@@ -686,9 +1313,7 @@ class Azkaban(object):
             execution_id
         )
 
-        self.__catch_response_error(response, FetchFlowExecutionError)
-
-        return response.json()
+        return self.__catch_response_error(response, FetchFlowExecutionError)
 
     def fetch_flow_execution_updates(self, execution_id, last_update_time):
         """
@@ -718,9 +1343,117 @@ class Azkaban(object):
             last_update_time
         )
 
-        self.__catch_response_error(response, FetchFlowExecutionUpdatesError)
+        return self.__catch_response_error(response, FetchFlowExecutionUpdatesError)
 
-        return response.json()
+    def watch_execution(self, execution_id, interval=5.0):
+        """
+        Watch execution command, intended to follow a flow execution until it finishes.
+
+        This method polls fetch_flow_execution_updates sending the largest updateTime seen as lastUpdateTime, so each
+        poll only transfers the nodes that changed, and yields the status transitions of the jobs and of the flow,
+        such as a job started, succeeded or failed. It stops after the flow reaches a finished status.
+
+        :param str execution_id: Execution id on Azkaban
+        :param float interval: Seconds between polls, optional.
+        :return: A generator of status transitions, see azkaban_cli.watcher.ExecutionState.update
+        :rtype: generator
+        :raises FetchFlowExecutionUpdatesError: when Azkaban api returns error in response
+        """
+
+        state = ExecutionState(execution_id)
+
+        while True:
+            response_json = self.fetch_flow_execution_updates(execution_id, state.last_update_time)
+
+            for event in state.update(response_json):
+                yield event
+
+            if state.finished:
+                return
+
+            time.sleep(interval)
+
+    def watch_executions(self, execution_ids, min_interval=1.0, max_interval=30.0, max_workers=8):
+        """
+        Watch executions command, intended to follow many flow executions at the same time.
+
+        This method keeps a single polling schedule for all the executions and polls the ones that are due over a
+        thread pool sharing the client session, the same way watch_execution polls one execution. The interval of each
+        execution adapts to its activity: it goes back to min_interval after a poll with transitions and doubles up to
+        max_interval after a poll without them. An execution leaves the schedule when its flow finishes.
+
+        The status transitions of all executions are yielded as one stream. An execution that cannot be fetched leaves
+        the schedule with an 'error' event containing the error message in the error key. When Azkaban cannot be
+        reached (connection errors, timeouts or an open circuit) the 'error' event is yielded and the execution is
+        polled again after max_interval.
+
+        :param list execution_ids: Execution ids on Azkaban
+        :param float min_interval: Seconds between polls of an execution with transitions, optional.
+        :param float max_interval: Maximum seconds between polls of an idle execution, optional.
+        :param int max_workers: Maximum number of concurrent requests, optional.
+        :return: A generator of status transitions, see azkaban_cli.watcher.ExecutionState.update
+        :rtype: generator
+        :raises NotLoggedOnError: when there is no logged session
+        """
+
+        self.__check_if_logged()
+
+        states = {execution_id: ExecutionState(execution_id) for execution_id in execution_ids}
+        intervals = {execution_id: min_interval for execution_id in states}
+        schedule = [(0, execution_id) for execution_id in states]
+        heapq.heapify(schedule)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while schedule:
+                wait = schedule[0][0] - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+
+                due = []
+                now = time.monotonic()
+                while schedule and schedule[0][0] <= now:
+                    due.append(heapq.heappop(schedule)[1])
+
+                futures = [
+                    (execution_id, executor.submit(
+                        self.fetch_flow_execution_updates, execution_id, states[execution_id].last_update_time
+                    ))
+                    for execution_id in due
+                ]
+
+                for execution_id, future in futures:
+                    state = states[execution_id]
+
+                    try:
+                        events = state.update(future.result())
+                    except (FetchFlowExecutionUpdatesError, CircuitOpenError) + RETRY_EXCEPTIONS as e:
+                        yield {
+                            u'execid': execution_id,
+                            u'job': None,
+                            u'event': u'error',
+                            u'status': None,
+                            u'previous': state.flow_status,
+                            u'time': None,
+                            u'error': str(e),
+                        }
+                        if not isinstance(e, FetchFlowExecutionUpdatesError):
+                            # Azkaban could not be reached, the execution is polled again once it may be back
+                            intervals[execution_id] = max_interval
+                            heapq.heappush(schedule, (time.monotonic() + max_interval, execution_id))
+                        continue
+
+                    for event in events:
+                        yield event
+
+                    if state.finished:
+                        continue
+
+                    if events:
+                        intervals[execution_id] = min_interval
+                    else:
+                        intervals[execution_id] = min(intervals[execution_id] * 2, max_interval)
+
+                    heapq.heappush(schedule, (time.monotonic() + intervals[execution_id], execution_id))
 
     def fetch_executions_of_a_flow(self, project, flow, start, length):
         """
@@ -744,6 +1477,7 @@ class Azkaban(object):
 
         response = api.fetch_executions_of_a_flow_request(
             self.__session,
+            self.__host,
             self.__session_id,
             project,
             flow,
@@ -751,9 +1485,7 @@ class Azkaban(object):
             length
         )
 
-        self.__catch_response_error(response, FetchExecutionsOfAFlowError)
-
-        return response.json()
+        return self.__catch_response_error(response, FetchExecutionsOfAFlowError)
 
     def fetch_execution_job_log(self, execution_id, jobid, offset, length):
         """Fetches the correponding job logs.
@@ -787,9 +1519,132 @@ class Azkaban(object):
             length
         )
 
-        self.__catch_response_error(response, FetchExecutionJobsLogError)
+        return self.__catch_response_error(response, FetchExecutionJobsLogError)
 
-        return response.json()
+    def follow_execution_job_log(self, execution_id, jobid, offset=0, length=50000, min_interval=1.0,
+                                 max_interval=30.0):
+        """Follows the log of a job while it runs.
+
+        This method fetches the job log from the offset in chunks of the length passed, advancing the offset by the
+        offset and length of each response. While no new data arrives, it waits before fetching again, doubling the
+        interval up to max_interval, and checks the job status with fetch_flow_execution_updates. It stops after the
+        last chunk of the log once the job (or the flow, if the job is not found) is finished.
+
+        :param execution_id: Execution id on Azkaban
+        :type execution_id: str
+        :param jobid: The unique id for the job to be followed.
+        :type jobid: str
+        :param offset: The offset where the log data starts, optional.
+        :type offset: int
+        :param length: The maximum length of each chunk of log data, optional.
+        :type length: int
+        :param float min_interval: Seconds to wait after the first fetch without new data, optional.
+        :param float max_interval: Maximum seconds to wait between fetches without new data, optional.
+        :return: A generator of log data chunks
+        :rtype: generator
+        :raises FetchExecutionJobsLogError: when Azkaban api returns error in response
+        :raises FetchFlowExecutionUpdatesError: when Azkaban api returns error in response
+        """
+
+        offset = int(offset)
+        interval = min_interval
+        finished = False
+
+        while True:
+            response_json = self.fetch_execution_job_log(execution_id, jobid, offset, length)
+            data = response_json.get(u'data')
+
+            if data:
+                offset = int(response_json[u'offset']) + int(response_json[u'length'])
+                interval = min_interval
+                yield data
+                continue
+
+            if finished:
+                return
+
+            # Fetch once more after the job finishes, the last lines may be written after the status changes
+            finished = self.__is_job_finished(execution_id, jobid)
+            if not finished:
+                time.sleep(interval)
+                interval = min(interval * 2, max_interval)
+
+    def download_execution_logs(self, execution_id, directory, chunk_size=50000, max_workers=8, compress=False):
+        """Downloads the logs of every job of a flow execution.
+
+        This method fetches the flow execution, walks its nodes (including the nodes of embedded flows) and fetches the
+        log of each job in chunks of chunk_size, writing it to <jobid>.log in the directory, or to <jobid>.log.gz if
+        compress is True. The jobs are downloaded over a thread pool of max_workers, which is the limit of concurrent
+        requests to the Azkaban host. Jobs that never started have no logs and are not downloaded.
+
+        A failure in one job does not stop the others, it is reported in its result instead.
+
+        :param str execution_id: Execution id on Azkaban
+        :param str directory: Directory where the logs are written, created if it does not exist
+        :param int chunk_size: Length of the log data fetched by each request, optional.
+        :param int max_workers: Maximum number of concurrent requests, optional.
+        :param bool compress: Write gzip compressed logs, optional.
+        :return: A list of dictionaries containing job, path, size and error as keys, size being the number of
+         characters of log written, before compression
+        :rtype: list
+        :raises FetchFlowExecutionError: when Azkaban api returns error in response
+        """
+
+        execution = self.fetch_flow_execution(execution_id)
+
+        def walk(nodes):
+            for node in nodes:
+                if u'nodes' in node:
+                    for job in walk(node[u'nodes']):
+                        yield job
+                elif node.get(u'status') not in (u'READY', u'DISABLED', u'SKIPPED'):
+                    yield node.get(u'nestedId') or node[u'id']
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        def download(jobid):
+            path = os.path.join(directory, jobid.replace(os.sep, u'_') + (u'.log.gz' if compress else u'.log'))
+            result = {u'job': jobid, u'path': path, u'size': 0, u'error': None}
+
+            try:
+                with (gzip.open(path, 'wt', encoding='utf-8') if compress else open(path, 'w', encoding='utf-8')) as f:
+                    offset = 0
+                    while True:
+                        response_json = self.fetch_execution_job_log(execution_id, jobid, offset, chunk_size)
+                        data = response_json.get(u'data')
+                        if not data:
+                            break
+                        f.write(data)
+                        result[u'size'] += len(data)
+                        offset = int(response_json[u'offset']) + int(response_json[u'length'])
+            except SessionError:
+                raise
+            except Exception as e:
+                result[u'error'] = str(e) or e.__class__.__name__
+
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(download, walk(execution.get(u'nodes', []))))
+
+    def __is_job_finished(self, execution_id, jobid):
+        """ PRIVATE
+        Checks if the job, or the flow when the job is not found, has a finished status.
+        """
+        flow = self.fetch_flow_execution_updates(execution_id, u'-1')
+
+        def find_node(nodes):
+            for node in nodes:
+                if jobid in (node.get(u'id'), node.get(u'nestedId')):
+                    return node
+                nested = find_node(node.get(u'nodes', []))
+                if nested:
+                    return nested
+
+        node = find_node(flow.get(u'nodes', [])) or flow
+
+        return node.get(u'status') in FINISHED_STATUSES
 
     def resume_flow_execution(self, execution_id):
         """Resume a flow execution for the Azkaban API
@@ -808,9 +1663,7 @@ class Azkaban(object):
             execution_id
         )
 
-        self.__catch_response_error(response, ResumeFlowExecutionError, ignore_empty_responses=True)
-
-        return response.json()
+        return self.__catch_response_error(response, ResumeFlowExecutionError, ignore_empty_responses=True)
 
     def fetch_running_executions_of_a_flow(self, project, flow):
         """Fetch running executions of a flow command, intended to make the request to Azkaban
@@ -837,6 +1690,4 @@ class Azkaban(object):
             flow,
         )
 
-        self.__catch_response_error(response, FetchRunningExecutionsOfAFlowError)
-
-        return response.json()
+        return self.__catch_response_error(response, FetchRunningExecutionsOfAFlowError)
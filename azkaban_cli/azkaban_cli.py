@@ -1,14 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import absolute_import
-from bs4 import BeautifulSoup
 import logging
 import click
 import json
-import requests
 import sys
 import os
-from azkaban_cli.azkaban import Azkaban
+from azkaban_cli.cache import MetadataCache, UploadCache
+from azkaban_cli.profiles import SessionStore
 from azkaban_cli.exceptions import (
     NotLoggedOnError,
     LoginError,
@@ -33,17 +32,84 @@ from azkaban_cli.exceptions import (
     FetchExecutionJobsLogError,
     ResumeFlowExecutionError,
     FetchRunningExecutionsOfAFlowError,
+    ManifestError,
+    FetchGroupPermissionsError,
+    SessionConfigError,
+    AgentError,
 )
 from azkaban_cli.__version__ import __version__
 
+# Modules importing requests (azkaban_cli.azkaban, azkaban_cli.sync and the session modules) are imported by the
+# commands that use them, so the commands that do not reach Azkaban, and --help, start faster.
+
 APP_NAME = "Azkaban CLI"
 
+LOG_FORMAT = u"%(asctime)s\t%(levelname)s\t%(message)s"
+
 AZKABAN_CLI_PATH = os.getenv("AZKABAN_CLI_PATH", "")
 if AZKABAN_CLI_PATH == "":
     HOME_PATH = os.path.expanduser("~")
     AZKABAN_CLI_PATH = os.path.join(HOME_PATH, ".azkaban_cli")
 
 SESSION_JSON_PATH = os.path.join(AZKABAN_CLI_PATH, "user-session.json")
+UPLOAD_CACHE_JSON_PATH = os.path.join(AZKABAN_CLI_PATH, "upload-cache.json")
+METADATA_CACHE_JSON_PATH = os.path.join(AZKABAN_CLI_PATH, "metadata-cache.json")
+CONFIG_JSON_PATH = os.path.join(AZKABAN_CLI_PATH, "config.json")
+
+
+def __azkaban(ctx):
+    if ctx.obj.get(u"azkaban") is None:
+        from azkaban_cli.azkaban import Azkaban
+
+        profile = ctx.obj[u"profile"]
+        clients = ctx.obj[u"clients"]
+
+        azkaban = clients.get(profile) if clients is not None else None
+        try:
+            if azkaban is not None:
+                from azkaban_cli.session import load_session_config
+
+                # The agent runs commands forwarded with other AZKABAN_CLI_* session options, or after the config
+                # file changed, with a new instance
+                if azkaban.get_session_config() != load_session_config(CONFIG_JSON_PATH):
+                    azkaban = None
+
+            if azkaban is None:
+                azkaban = Azkaban(config_path=CONFIG_JSON_PATH)
+                if clients is not None:
+                    clients[profile] = azkaban
+        except SessionConfigError as e:
+            logging.error(str(e))
+            ctx.exit(1)
+
+        tracer = ctx.obj.get(u"tracer")
+        if tracer is not None:
+            azkaban.set_tracer(tracer)
+            ctx.find_root().call_on_close(lambda: azkaban.set_tracer(None))
+
+        metrics = ctx.obj.get(u"metrics")
+        if metrics is not None:
+            azkaban.add_request_hook(metrics)
+            # The agent keeps the instance for the next commands, which may not want metrics
+            ctx.find_root().call_on_close(lambda: azkaban.remove_request_hook(metrics))
+
+        # The agent counts the requests sent, a command that sent some is not run again by the client
+        request_hook = ctx.obj.get(u"request_hook")
+        if request_hook is not None:
+            azkaban.add_request_hook(request_hook)
+            ctx.find_root().call_on_close(lambda: azkaban.remove_request_hook(request_hook))
+
+        # Read on every command, so the agent sees the logins and logouts made by other processes
+        logged_session = __load_logged_session(profile)
+
+        if logged_session:
+            azkaban.set_logged_session(**logged_session)
+        else:
+            azkaban.logout()
+
+        ctx.obj[u"azkaban"] = azkaban
+
+    return ctx.obj[u"azkaban"]
 
 
 def __call_for_login(ctx):
@@ -53,7 +119,7 @@ def __call_for_login(ctx):
 
 
 def __login_expired(ctx):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     session = azkaban.get_logged_session()
     host = session["host"]
@@ -69,41 +135,40 @@ def login_required(function):
         try:
             function(ctx, *args, **kwargs)
         except NotLoggedOnError:
+            # The agent has no terminal to prompt, the command is run again by the client
+            if ctx.obj.get(u"agent"):
+                raise
             __call_for_login(ctx)
             function_wrapper(ctx, *args, **kwargs)
         except SessionError:
+            if ctx.obj.get(u"agent"):
+                raise
             __login_expired(ctx)
             function_wrapper(ctx, *args, **kwargs)
 
     return function_wrapper
 
 
-def __save_logged_session(logged_session):
-    if not os.path.exists(AZKABAN_CLI_PATH):
-        os.mkdir(AZKABAN_CLI_PATH)
+def __save_logged_session(profile, logged_session):
+    SessionStore(SESSION_JSON_PATH).set(profile, logged_session)
 
-    with open(SESSION_JSON_PATH, "w") as session_file:
-        json.dump(logged_session, session_file)
 
+def __load_logged_session(profile):
+    return SessionStore(SESSION_JSON_PATH).get(profile)
 
-def __load_logged_session():
-    if os.path.exists(SESSION_JSON_PATH):
-        with open(SESSION_JSON_PATH, "r") as session_file:
-            logged_session = json.load(session_file)
-            return logged_session
 
-
-def __delete_logged_session():
-    if os.path.exists(SESSION_JSON_PATH):
-        os.remove(SESSION_JSON_PATH)
+def __delete_logged_session(profile):
+    SessionStore(SESSION_JSON_PATH).delete(profile)
 
 
 def __login(ctx, host, user, password):
-    azkaban = ctx.obj[u"azkaban"]
+    import requests
+
+    azkaban = __azkaban(ctx)
 
     try:
         azkaban.login(host, user, password)
-        __save_logged_session(azkaban.get_logged_session())
+        __save_logged_session(ctx.obj[u"profile"], azkaban.get_logged_session())
         logging.info("Logged in successfully!")
     except (requests.exceptions.ConnectionError, requests.exceptions.MissingSchema) as e:
         logging.error("Could not connect to host: %s", str(e))
@@ -112,44 +177,194 @@ def __login(ctx, host, user, password):
 
 
 def __logout(ctx):
-    azkaban = ctx.obj[u"azkaban"]
-
-    azkaban.logout()
-    __delete_logged_session()
+    if ctx.obj.get(u"azkaban") is not None:
+        ctx.obj[u"azkaban"].logout()
+    __delete_logged_session(ctx.obj[u"profile"])
 
     logging.info("Logged out")
 
 
+def __agent(ctx, idle_timeout, detach):
+    from azkaban_cli.agent import Agent
+
+    agent = Agent(idle_timeout=idle_timeout or None)
+
+    if detach:
+        if os.fork() > 0:
+            logging.info("Agent started in background, listening on %s" % (agent.path))
+            return
+        os.setsid()
+        with open(os.devnull, "r+") as devnull:
+            for stream in (sys.stdin, sys.stdout, sys.stderr):
+                os.dup2(devnull.fileno(), stream.fileno())
+
+    try:
+        agent.serve()
+    except AgentError as e:
+        logging.error(str(e))
+    except KeyboardInterrupt:
+        logging.info("Agent stopped")
+
+    if detach:
+        os._exit(0)
+
+
+def __profiles(ctx):
+    store = SessionStore(SESSION_JSON_PATH)
+    profiles = store.profiles()
+
+    if not profiles:
+        logging.info("No profiles, login to create one")
+        return
+
+    name_width = max([len(u"PROFILE")] + [len(name) for name in profiles])
+    row = u"%s %-" + str(name_width) + u"s  %-40s  %s"
+
+    logging.info(row % (u" ", u"PROFILE", u"HOST", u"USER"))
+    for name in sorted(profiles):
+        current = u"*" if name == store.current else u" "
+        logging.info(row % (current, name, profiles[name].get(u"host"), profiles[name].get(u"user")))
+
+
+def __log_cluster_results(results, header, rows):
+    table = [[u"CLUSTER"] + list(header)]
+    for result in results:
+        if result[u"error"]:
+            table.append([result[u"cluster"], u"FAILED: %s" % (result[u"error"])])
+        else:
+            table.extend([result[u"cluster"]] + [u"%s" % (value) for value in row] for row in rows(result[u"result"]))
+
+    # Every column but the last one of each line is padded, so failures are not cut by the columns after CLUSTER
+    widths = {}
+    for line in table:
+        for index, value in enumerate(line[:-1]):
+            widths[index] = max(widths.get(index, 0), len(value))
+
+    for line in table:
+        logging.info(u"  ".join([value.ljust(widths[index]) for index, value in enumerate(line[:-1])] + line[-1:]))
+
+
+def __report_metrics(ctx, timings, metrics_file):
+    metrics = ctx.obj[u"metrics"]
+
+    if timings:
+        logging.info("Request timings by ajax action:")
+        for line in metrics.format_timings():
+            logging.info(line)
+
+    if metrics_file:
+        azkaban = ctx.obj.get(u"azkaban")
+        retry_stats = azkaban.get_retry_stats() if azkaban is not None else None
+        try:
+            metrics.write_textfile(metrics_file, retry_stats)
+        except (IOError, OSError) as e:
+            logging.error("Could not write metrics file: %s" % (e))
+
+
+def __export_trace(ctx, trace_file):
+    try:
+        ctx.obj[u"tracer"].export(trace_file)
+    except (IOError, OSError) as e:
+        logging.error("Could not write trace file: %s" % (e))
+
+
+def __stop_profiler(profiler):
+    from azkaban_cli.profiling import summary_path
+
+    try:
+        allocations = profiler.stop()
+    except (IOError, OSError) as e:
+        logging.error("Could not write profile: %s" % (e))
+        return
+
+    for line in allocations:
+        logging.info(line)
+    logging.info("CPU profile written to %s, summary to %s" % (profiler.path, summary_path(profiler.path)))
+
+
+def __query_all_clusters(query, errors):
+    from azkaban_cli.profiles import query_profiles
+
+    profiles = SessionStore(SESSION_JSON_PATH).profiles()
+    if not profiles:
+        logging.error("No profiles, login to at least one cluster")
+        return []
+
+    ctx = click.get_current_context()
+    request_hooks = [ctx.obj[u"metrics"]] if ctx.obj.get(u"metrics") is not None else []
+
+    return query_profiles(
+        profiles,
+        query,
+        errors=errors,
+        config_path=CONFIG_JSON_PATH,
+        request_hooks=request_hooks,
+        tracer=ctx.obj.get(u"tracer"),
+    )
+
+
 @login_required
-def __upload(ctx, path, project, zip_name):
-    azkaban = ctx.obj[u"azkaban"]
+def __upload(ctx, path, project, zip_name, stream, skip_unchanged, force):
+    azkaban = __azkaban(ctx)
+
+    cache = UploadCache(UPLOAD_CACHE_JSON_PATH) if skip_unchanged else None
 
     try:
-        azkaban.upload(path, project, zip_name)
+        azkaban.upload(path, project, zip_name, stream=stream, cache=cache, force=force)
     except UploadError as e:
         logging.error(str(e))
 
 
+def __log_upload_results(results):
+    project_width = max([len(u"PROJECT")] + [len(result[u"project"]) for result in results])
+    row = u"%-" + str(project_width) + u"s  %-8s  %s"
+
+    logging.info(row % (u"PROJECT", u"VERSION", u"STATUS"))
+    for result in results:
+        if result[u"error"]:
+            status = u"FAILED: %s" % (result[u"error"])
+        elif result[u"skipped"]:
+            status = u"UNCHANGED"
+        else:
+            status = u"UPLOADED"
+        logging.info(row % (result[u"project"], result[u"version"] or u"-", status))
+
+    failures = len([result for result in results if result[u"error"]])
+    logging.info("%d projects uploaded, %d failed" % (len(results) - failures, failures))
+
+
+@login_required
+def __bulk_upload(ctx, paths, max_workers, processes, stream, skip_unchanged, force):
+    azkaban = __azkaban(ctx)
+
+    cache = UploadCache(UPLOAD_CACHE_JSON_PATH) if skip_unchanged else None
+
+    results = azkaban.upload_many(
+        paths, max_workers=max_workers, processes=processes, stream=stream, cache=cache, force=force
+    )
+    __log_upload_results(results)
+
+
+def __metadata_cache(no_cache):
+    return None if no_cache else MetadataCache(METADATA_CACHE_JSON_PATH)
+
+
 @login_required
-def __schedule(ctx, project, flow, cron, concurrent_option):
-    azkaban = ctx.obj[u"azkaban"]
+def __schedule(ctx, project, flow, cron, concurrent_option, no_cache):
+    azkaban = __azkaban(ctx)
 
     try:
-        azkaban.schedule(project, flow, cron, concurrentOption=concurrent_option)
+        azkaban.schedule(project, flow, cron, cache=__metadata_cache(no_cache), concurrentOption=concurrent_option)
     except ScheduleError as e:
         logging.error(str(e))
 
 
 @login_required
-def __unschedule(ctx, project, flow):
-    azkaban = ctx.obj[u"azkaban"]
+def __unschedule(ctx, project, flow, no_cache):
+    azkaban = __azkaban(ctx)
 
     try:
-        flows = azkaban.fetch_flows(project)
-        project_id = flows[u"projectId"]
-        schedule = azkaban.fetch_schedule(project_id, flow)
-        schedule_id = schedule[u"schedule"][u"scheduleId"]
-        azkaban.unschedule(schedule_id)
+        azkaban.unschedule_flow(project, flow, cache=__metadata_cache(no_cache))
     except FetchFlowsError as e:
         logging.error(str(e))
     except FetchScheduleError as e:
@@ -158,9 +373,60 @@ def __unschedule(ctx, project, flow):
         logging.error(str(e))
 
 
+def __log_schedule_changes(changes):
+    from azkaban_cli.sync import CREATE, DELETE
+
+    for change in changes:
+        name = u"%s/%s" % (change[u"project"], change[u"flow"])
+        previous = change[u"previous"] or {}
+        previous = u"%s (%s)" % (previous.get(u"cron"), previous.get(u"concurrentOption"))
+        desired = u"%s (%s)" % (change[u"cron"], change[u"concurrentOption"])
+
+        if change[u"action"] == CREATE:
+            line = u"+ %s  %s" % (name, desired)
+        elif change[u"action"] == DELETE:
+            line = u"- %s  %s" % (name, previous)
+        else:
+            line = u"~ %s  %s -> %s" % (name, previous, desired)
+
+        if change.get(u"error"):
+            logging.error(u"%s  FAILED: %s" % (line, change[u"error"]))
+        else:
+            logging.info(line)
+
+
+@login_required
+def __sync_schedules(ctx, manifest, apply, max_workers):
+    from azkaban_cli.sync import CREATE, DELETE, ScheduleSync, load_manifest
+
+    azkaban = __azkaban(ctx)
+
+    sync = ScheduleSync(azkaban, max_workers=max_workers)
+    try:
+        changes = sync.plan(load_manifest(manifest))
+    except (ManifestError, FetchFlowsError, FetchScheduleError) as e:
+        logging.error(str(e))
+        return
+
+    actions = [change[u"action"] for change in changes]
+    logging.info("Plan: %d to create, %d to update, %d to delete" % (
+        actions.count(CREATE), len(actions) - actions.count(CREATE) - actions.count(DELETE), actions.count(DELETE)
+    ))
+
+    if not apply:
+        __log_schedule_changes(changes)
+        return
+
+    results = sync.apply(changes)
+    __log_schedule_changes(results)
+
+    failed = [result for result in results if result[u"error"]]
+    logging.info("Applied %d changes, %d failed" % (len(results) - len(failed), len(failed)))
+
+
 @login_required
 def __execute(ctx, project, flow, **execution_options):
-    azkaban = ctx.obj[u'azkaban']
+    azkaban = __azkaban(ctx)
 
     try:
         azkaban.execute(project, flow, **execution_options)
@@ -170,7 +436,7 @@ def __execute(ctx, project, flow, **execution_options):
 
 @login_required
 def __cancel(ctx, execution_id):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         azkaban.cancel(execution_id)
@@ -180,94 +446,99 @@ def __cancel(ctx, execution_id):
 
 @login_required
 def __create(ctx, project, description):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
     try:
         azkaban.create(project, description)
     except CreateError as e:
         logging.error(str(e))
 
 
+def __log_unschedule_results(results, dry_run):
+    flow_width = max([len(u"FLOW")] + [len(result[u"flow"]) for result in results])
+    row = u"%-" + str(flow_width) + u"s  %-10s  %s"
+
+    logging.info(row % (u"FLOW", u"SCHEDULE", u"STATUS"))
+    for result in results:
+        if result[u"error"]:
+            status = u"FAILED: %s" % (result[u"error"])
+        elif not result[u"scheduled"]:
+            status = u"NOT SCHEDULED"
+        elif dry_run:
+            status = u"WOULD UNSCHEDULE"
+        else:
+            status = u"UNSCHEDULED"
+        logging.info(row % (result[u"flow"], result[u"scheduleId"] or u"-", status))
+
+
 @login_required
-def __delete(ctx, project):
-    azkaban = ctx.obj[u"azkaban"]
+def __delete(ctx, project, no_cache, dry_run, max_workers):
+    azkaban = __azkaban(ctx)
+
+    cache = __metadata_cache(no_cache)
     try:
         # To delete a project, all flows must be unscheduled. The first thing we do
-        # is try fetching the project flows and unscheduling each one in succession.
-        # Then, we attempt to delete the project. If no exception was raised, it means
-        # the project was deleted successfully.
+        # is try fetching the project flows and unscheduling all of them concurrently.
+        # Then, if every flow was unscheduled, we attempt to delete the project.
         # Note: the projectID is stored in Azkaban's internal database. Therefore,
         # fetching its flows will work even if the project has already been deleted.
         # An INFO log is printed to explain this scenario, since this command will say that
         # the project was deleted (even though it had already been deleted prior to this).
 
-        flows = azkaban.fetch_flows(project)
+        flows = azkaban.fetch_flows(project, cache)
         project_id = flows[u"projectId"]
-        flow_ids = flows[u"flows"]
+        flow_names = [flow_id[u"flowId"] for flow_id in flows[u"flows"]]
 
-        if len(flow_ids) > 0:
-            logging.debug("Will unschedule %d flows before deleting the project" % (len(flow_ids)))
+        if len(flow_names) > 0:
+            logging.debug("Will unschedule %d flows before deleting the project" % (len(flow_names)))
         else:
             logging.info("Project %s has no flows or does not exist anymore!" % (project))
 
-        for flow_id in flow_ids:
-            flow_name = flow_id[u"flowId"]
-            logging.debug("Unscheduling flow %s" % (flow_name))
-
-            try:
-                schedule = azkaban.fetch_schedule(project_id, flow_name)
-            except:
-                logging.debug("Schedule not found")
-                schedule = None
-
-            if schedule is not None:
-                schedule_id = schedule[u"schedule"][u"scheduleId"]
-                azkaban.unschedule(schedule_id)
-
-            logging.debug("Done")
-
-        azkaban.delete(project)
-
-    except FetchScheduleError as e:
-        logging.error(str(e))
+        results = azkaban.unschedule_flows(
+            project, flow_names, project_id=project_id, max_workers=max_workers, cache=cache, dry_run=dry_run
+        )
     except FetchFlowsError as e:
         logging.error(str(e))
-    except UnscheduleError as e:
-        logging.error(str(e))
-    else:
-        logging.info("Project %s was successfully deleted" % (project))
+        return
 
+    if results:
+        __log_unschedule_results(results, dry_run)
 
-def __parse_projects(text, user):
-    def get_text(div):
-        return div.find_all("a")[0].text
+    failed = [result for result in results if result[u"error"]]
+    if failed:
+        logging.error("Project %s was not deleted, %d flows could not be unscheduled" % (project, len(failed)))
+    elif dry_run:
+        logging.info("Dry run, project %s would be deleted" % (project))
+    else:
+        azkaban.delete(project, cache)
+        logging.info("Project %s was successfully deleted" % (project))
 
-    def get_user(div):
-        return div.find_all("p", {"class": "project-last-modified"})[0].text.split("\n")[-1].strip()[:-1]
 
-    try:
-        soup = BeautifulSoup(text, "html.parser")
-        all_projects = soup.find_all("div", {"class": "project-info"})
-        all_projects_for_user = [get_text(div) for div in all_projects if get_user(div) == user]
-        logging.info("Found %d projects for user %s:" % (len(all_projects_for_user), user))
+def __fetch_projects_all_clusters(user):
+    def query(azkaban):
+        project_user = user or azkaban.get_logged_session().get(u"user")
+        return [project[u"name"] for project in azkaban.iter_projects() if project[u"user"] == project_user]
 
-        for project in all_projects_for_user:
-            logging.info("- %s" % (project))
-    except Exception:
-        raise FetchProjectsError("Error parsing response")
+    results = __query_all_clusters(query, (FetchProjectsError,))
+    __log_cluster_results(results, [u"PROJECT"], lambda projects: [[project] for project in projects])
 
 
 @login_required
 def __fetch_projects(ctx, user):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     if not user:
         user = azkaban.get_logged_session().get(u"user")
 
     try:
-        text = azkaban.fetch_projects()
-        __parse_projects(text, user)
+        all_projects_for_user = [project[u"name"] for project in azkaban.iter_projects() if project[u"user"] == user]
     except FetchProjectsError as e:
         logging.error(str(e))
+        return
+
+    logging.info("Found %d projects for user %s:" % (len(all_projects_for_user), user))
+
+    for project in all_projects_for_user:
+        logging.info("- %s" % (project))
 
 
 def __log_sla(json):
@@ -289,7 +560,7 @@ def __log_sla(json):
 
 @login_required
 def __fetch_sla(ctx, schedule):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         json = azkaban.fetch_sla(schedule)
@@ -300,7 +571,7 @@ def __fetch_sla(ctx, schedule):
 
 @login_required
 def __add_permission(ctx, project, group, admin, read, write, _execute, _schedule):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
     try:
         azkaban.add_permission(
             project,
@@ -319,7 +590,7 @@ def __add_permission(ctx, project, group, admin, read, write, _execute, _schedul
 
 @login_required
 def __remove_permission(ctx, project, group):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
     try:
         azkaban.remove_permission(project, group)
     except RemovePermissionError as e:
@@ -328,7 +599,7 @@ def __remove_permission(ctx, project, group):
 
 @login_required
 def __change_permission(ctx, project, group, admin, read, write, _execute, _schedule):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
     try:
         azkaban.change_permission(
             project,
@@ -345,6 +616,44 @@ def __change_permission(ctx, project, group, admin, read, write, _execute, _sche
         logging.error(str(e))
 
 
+def __format_permissions(permission_options):
+    if not permission_options:
+        return u"-"
+    return u",".join(option for option in sorted(permission_options) if permission_options[option])
+
+
+@login_required
+def __sync_permissions(ctx, manifest, apply, max_workers):
+    from azkaban_cli.sync import load_permissions_manifest
+
+    azkaban = __azkaban(ctx)
+
+    try:
+        changes = azkaban.sync_permissions(
+            load_permissions_manifest(manifest), max_workers=max_workers, dry_run=not apply
+        )
+    except (ManifestError, FetchGroupPermissionsError) as e:
+        logging.error(str(e))
+        return
+
+    symbols = {u"add": u"+", u"change": u"~", u"remove": u"-"}
+    for change in changes:
+        line = u"%s %s/%s  %s -> %s" % (
+            symbols[change[u"action"]], change[u"project"], change[u"group"], __format_permissions(change[u"previous"]),
+            __format_permissions(change[u"permissions"])
+        )
+        if change[u"error"]:
+            logging.error(u"%s  FAILED: %s" % (line, change[u"error"]))
+        else:
+            logging.info(line)
+
+    failed = [change for change in changes if change[u"error"]]
+    if apply:
+        logging.info("Applied %d changes, %d failed" % (len(changes) - len(failed), len(failed)))
+    else:
+        logging.info("Plan: %d changes" % (len(changes)))
+
+
 def __log_jobs(json):
     logging.info("Project: %s" % (json.get("project")))
     logging.info("Project Id: %s" % (json.get("projectId")))
@@ -363,7 +672,7 @@ def __log_jobs(json):
 
 @login_required
 def __fetch_jobs_from_flow(ctx, project, flow):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         json = azkaban.fetch_jobs_from_flow(project, flow)
@@ -408,7 +717,7 @@ def __log_flow_execution(json):
 
 @login_required
 def __fetch_flow_execution(ctx, execution_id):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         json = azkaban.fetch_flow_execution(execution_id)
@@ -438,7 +747,7 @@ def __log_flow_execution_updates(json):
 
 @login_required
 def __fetch_flow_execution_updates(ctx, execution_id, last_update_time):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         json = azkaban.fetch_flow_execution_updates(execution_id, last_update_time)
@@ -447,6 +756,30 @@ def __fetch_flow_execution_updates(ctx, execution_id, last_update_time):
         logging.error(str(e))
 
 
+def __log_execution_event(event):
+    transition = u"%s -> %s" % (event[u"previous"], event[u"status"]) if event[u"previous"] else event[u"status"]
+    logging.info("%s %s (%s)" % (event[u"job"] or u"Flow", event[u"event"], transition))
+
+
+@login_required
+def __watch_execution(ctx, execution_id, interval):
+    azkaban = __azkaban(ctx)
+
+    try:
+        for event in azkaban.watch_execution(execution_id, interval):
+            __log_execution_event(event)
+    except FetchFlowExecutionUpdatesError as e:
+        logging.error(str(e))
+
+
+@login_required
+def __watch_executions(ctx, execution_ids, min_interval, max_interval, max_workers):
+    azkaban = __azkaban(ctx)
+
+    for event in azkaban.watch_executions(execution_ids, min_interval, max_interval, max_workers):
+        click.echo(json.dumps(event))
+
+
 def __log_executions_of_a_flow(json):
     logging.info("Total: %s" % (json.get("total")))
     logging.info("Project: %s" % (json.get("project")))
@@ -466,9 +799,24 @@ def __log_executions_of_a_flow(json):
         logging.info("Flow Id: %s" % (json.get("flowId")))
 
 
+def __fetch_executions_of_a_flow_all_clusters(project, flow, start, length):
+    def query(azkaban):
+        return azkaban.fetch_executions_of_a_flow(project, flow, start, length)
+
+    def rows(json):
+        return [
+            [execution.get(u"execId"), execution.get(u"status"), execution.get(u"submitUser"),
+             execution.get(u"startTime"), execution.get(u"endTime")]
+            for execution in json.get(u"executions", [])
+        ]
+
+    results = __query_all_clusters(query, (FetchExecutionsOfAFlowError,))
+    __log_cluster_results(results, [u"EXECUTION", u"STATUS", u"SUBMIT USER", u"START TIME", u"END TIME"], rows)
+
+
 @login_required
 def __fetch_executions_of_a_flow(ctx, project, flow, start, length):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         json = azkaban.fetch_executions_of_a_flow(project, flow, start, length)
@@ -484,18 +832,44 @@ def __log_execution_job_log(json):
 
 
 @login_required
-def __fetch_execution_job_log(ctx, execution_id, jobid, offset, length):
-    azkaban = ctx.obj[u"azkaban"]
+def __fetch_execution_job_log(ctx, execution_id, jobid, offset, length, follow):
+    azkaban = __azkaban(ctx)
     try:
-        json = azkaban.fetch_execution_job_log(execution_id, jobid, offset, length)
-        __log_execution_job_log(json)
-    except FetchExecutionJobsLogError as e:
+        if follow:
+            for data in azkaban.follow_execution_job_log(execution_id, jobid, offset, length):
+                click.echo(data, nl=False)
+        else:
+            json = azkaban.fetch_execution_job_log(execution_id, jobid, offset, length)
+            __log_execution_job_log(json)
+    except (FetchExecutionJobsLogError, FetchFlowExecutionUpdatesError) as e:
         logging.error(str(e))
 
 
+@login_required
+def __download_execution_logs(ctx, execution_id, directory, chunk_size, max_workers, compress):
+    azkaban = __azkaban(ctx)
+
+    try:
+        results = azkaban.download_execution_logs(
+            execution_id, directory, chunk_size=chunk_size, max_workers=max_workers, compress=compress
+        )
+    except FetchFlowExecutionError as e:
+        logging.error(str(e))
+        return
+
+    for result in results:
+        if result[u"error"]:
+            logging.error("%s: %s" % (result[u"job"], result[u"error"]))
+        else:
+            logging.info("%s: %d characters written to %s" % (result[u"job"], result[u"size"], result[u"path"]))
+
+    failures = len([result for result in results if result[u"error"]])
+    logging.info("%d job logs downloaded, %d failed" % (len(results) - failures, failures))
+
+
 @login_required
 def __resume_flow_execution(ctx, execution_id):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
         azkaban.resume_flow_execution(execution_id)
@@ -508,12 +882,33 @@ def __log_running_executions_of_a_flow(json):
     logging.info("ExecIds: %s" % (json.get("execIds")))
 
 
+def __fetch_running_executions_of_a_flow_all_clusters(project, flow):
+    from azkaban_cli.azkaban import is_empty_response
+
+    def query(azkaban):
+        try:
+            return azkaban.fetch_running_executions_of_a_flow(project, flow)
+        except FetchRunningExecutionsOfAFlowError as e:
+            # Azkaban answers an empty json when the flow is not running
+            if is_empty_response(e):
+                return {}
+            raise
+
+    results = __query_all_clusters(query, (FetchRunningExecutionsOfAFlowError,))
+    __log_cluster_results(
+        results, [u"EXECUTION"], lambda json: [[execution_id] for execution_id in json.get(u"execIds", [])]
+    )
+
+    running = [result for result in results if result[u"result"] and result[u"result"].get(u"execIds")]
+    logging.info("Flow %s is running in %d of %d clusters" % (flow, len(running), len(results)))
+
+
 @login_required
 def _fetch_running_executions_of_a_flow(ctx, project, flow):
-    azkaban = ctx.obj[u"azkaban"]
+    azkaban = __azkaban(ctx)
 
     try:
-        json = azkaban.fetch_running_executions_of_a_flow(ctx, project, flow)
+        json = azkaban.fetch_running_executions_of_a_flow(project, flow)
         __log_running_executions_of_a_flow(json)
     except FetchRunningExecutionsOfAFlowError as e:
         logging.error(str(e))
@@ -523,27 +918,106 @@ def _fetch_running_executions_of_a_flow(ctx, project, flow):
 # Interface
 # ----------------------------------------------------------------------------------------------------------------------
 
+# Command arguments recorded as attributes of the command spans, see --trace-file
+COMMAND_SPAN_ATTRIBUTES = {
+    u"project": u"azkaban.project",
+    u"flow": u"azkaban.flow",
+    u"execution_id": u"azkaban.exec_id",
+    u"jobid": u"azkaban.job_id",
+}
+
+
+class TracedCommand(click.Command):
+    """Command run as the root span of a trace, with the requests it makes as children, when --trace-file is passed"""
+
+    def invoke(self, ctx):
+        tracer = (ctx.obj or {}).get(u"tracer")
+        if tracer is None:
+            return click.Command.invoke(self, ctx)
+
+        attributes = {u"azkaban_cli.command": self.name, u"azkaban_cli.profile": ctx.obj.get(u"profile")}
+        for param, attribute in COMMAND_SPAN_ATTRIBUTES.items():
+            if ctx.params.get(param) is not None:
+                attributes[attribute] = u"%s" % (ctx.params[param])
+
+        with tracer.span(self.name, attributes=attributes, root=True):
+            return click.Command.invoke(self, ctx)
+
 
 @click.group(chain=True)
 @click.version_option(version=__version__, prog_name=APP_NAME)
-def cli():
+@click.option(
+    u"--profile",
+    envvar=u"AZKABAN_CLI_PROFILE",
+    help=u"Name of the saved session to use, one per Azkaban cluster. Default value is the last one logged in.",
+)
+@click.option(u"--timings", is_flag=True, help=u"Print a latency histogram of the requests by ajax action at exit.")
+@click.option(
+    u"--metrics-file",
+    envvar=u"AZKABAN_CLI_METRICS_FILE",
+    type=click.Path(dir_okay=False),
+    help=u"Write request metrics at exit to this file, for the Prometheus node exporter textfile collector.",
+)
+@click.option(
+    u"--trace-file",
+    envvar=u"AZKABAN_CLI_TRACE_FILE",
+    type=click.Path(dir_okay=False),
+    help=u"Append a trace of each command and the requests it makes to this file, as OTLP/JSON lines.",
+)
+@click.option(
+    u"--profile-output",
+    type=click.Path(dir_okay=False),
+    help=u"Profile the commands with cProfile and tracemalloc, writing the cProfile stats to this file and a summary "
+         u"of the top allocations and functions next to it, with the .txt extension.",
+)
+@click.option(
+    u"--profile-top",
+    type=click.INT,
+    default=20,
+    show_default=True,
+    help=u"Number of allocation sites and functions in the --profile-output summary.",
+)
+def cli(profile, timings, metrics_file, trace_file, profile_output, profile_top):
     # set default logging (to console)
-    logging.basicConfig(level=logging.INFO, format=u"%(asctime)s\t%(levelname)s\t%(message)s")
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
 
     ctx = click.get_current_context()
-    ctx.obj = {}
 
-    azkaban = Azkaban()
+    # The agent passes the Azkaban instances it keeps between commands, one per profile, and a hook called with every
+    # request sent
+    clients = (ctx.obj or {}).get(u"clients")
+    request_hook = (ctx.obj or {}).get(u"request_hook")
+    ctx.obj = {u"agent": clients is not None, u"clients": clients, u"request_hook": request_hook}
+
+    ctx.obj["profile"] = profile or SessionStore(SESSION_JSON_PATH).current
+
+    # The Azkaban instance is created by the first command using it, see __azkaban
+    ctx.obj["azkaban"] = None
+
+    ctx.obj["metrics"] = None
+    if timings or metrics_file:
+        from azkaban_cli.metrics import RequestMetrics
 
-    logged_session = __load_logged_session()
+        ctx.obj["metrics"] = RequestMetrics()
+        ctx.call_on_close(lambda: __report_metrics(ctx, timings, metrics_file))
 
-    if logged_session:
-        azkaban.set_logged_session(**logged_session)
+    ctx.obj["tracer"] = None
+    if trace_file:
+        from azkaban_cli.tracing import Tracer
 
-    ctx.obj["azkaban"] = azkaban
+        ctx.obj["tracer"] = Tracer()
+        ctx.call_on_close(lambda: __export_trace(ctx, trace_file))
 
+    # Started last, so it stops first and the reports above are not profiled
+    if profile_output:
+        from azkaban_cli.profiling import Profiler
 
-@click.command(u"login")
+        profiler = Profiler(profile_output, profile_top)
+        profiler.start()
+        ctx.call_on_close(lambda: __stop_profiler(profiler))
+
+
+@click.command(u"login", cls=TracedCommand)
 @click.pass_context
 @click.option(u"--host", prompt=True, help=u"Azkaban hostname with protocol.")
 @click.option(u"--user", prompt=True, help=u"Login user.")
@@ -553,32 +1027,90 @@ def login(ctx, host, user, password):
     __login(ctx, host, user, password)
 
 
-@click.command(u"logout")
+@click.command(u"logout", cls=TracedCommand)
 @click.pass_context
 def logout(ctx):
     """Logout from Azkaban session"""
     __logout(ctx)
 
 
-@click.command(u"upload")
+@click.command(u"agent", cls=TracedCommand)
+@click.pass_context
+@click.option(
+    u"--idle-timeout",
+    type=click.FLOAT,
+    default=3600,
+    show_default=True,
+    help=u"Stop after this many seconds without commands, 0 runs until interrupted.",
+)
+@click.option(u"--detach", is_flag=True, help=u"Run in background.")
+def agent(ctx, idle_timeout, detach):
+    """Keep sessions and connections warm for the next commands"""
+    __agent(ctx, idle_timeout, detach)
+
+
+@click.command(u"profiles", cls=TracedCommand)
+@click.pass_context
+def profiles(ctx):
+    """List the saved sessions, the current one is marked with *"""
+    __profiles(ctx)
+
+
+@click.command(u"upload", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"path", type=click.STRING)
 @click.option(
     u"--project",
     type=click.STRING,
-    help=u"Project name in Azkaban, default value is the dirname specified in path argument.",
+    help=u"Project name in Azkaban, default value is the basename of the path argument.",
 )
 @click.option(
     u"--zip-name",
     type=click.STRING,
     help=u"If you wanna specify Zip file name that will be generated and uploaded to Azkaban. Default value is project name.",
 )
-def upload(ctx, path, project, zip_name):
+@click.option(
+    u"--stream",
+    is_flag=True,
+    help=u"Build the zip on the fly while uploading it, without writing it to disk.",
+)
+@click.option(
+    u"--skip-unchanged",
+    is_flag=True,
+    help=u"Skip the upload if the path content did not change since the last upload of the project to the same host.",
+)
+@click.option(u"--force", is_flag=True, help=u"Upload even if --skip-unchanged finds the path content unchanged.")
+def upload(ctx, path, project, zip_name, stream, skip_unchanged, force):
     """Generates a zip of path passed as argument and uploads it to Azkaban."""
-    __upload(ctx, path, project, zip_name)
+    __upload(ctx, path, project, zip_name, stream, skip_unchanged, force)
+
+
+@click.command(u"bulk_upload", cls=TracedCommand)
+@click.pass_context
+@click.argument(u"paths", type=click.STRING, nargs=-1, required=True)
+@click.option(u"--max-workers", type=click.INT, default=8, show_default=True, help=u"Maximum concurrent uploads.")
+@click.option(
+    u"--processes",
+    type=click.INT,
+    help=u"Number of processes creating zips. Default value is the number of CPUs, 0 creates them in the upload threads.",
+)
+@click.option(
+    u"--stream",
+    is_flag=True,
+    help=u"Build the zips on the fly while uploading them, without writing them to disk.",
+)
+@click.option(
+    u"--skip-unchanged",
+    is_flag=True,
+    help=u"Skip the projects whose content did not change since their last upload to the same host.",
+)
+@click.option(u"--force", is_flag=True, help=u"Upload even if --skip-unchanged finds the project content unchanged.")
+def bulk_upload(ctx, paths, max_workers, processes, stream, skip_unchanged, force):
+    """Uploads many paths or glob patterns, each one to the project named as its basename."""
+    __bulk_upload(ctx, paths, max_workers, processes, stream, skip_unchanged, force)
 
 
-@click.command(u"schedule")
+@click.command(u"schedule", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"flow", type=click.STRING)
@@ -588,21 +1120,33 @@ def upload(ctx, path, project, zip_name):
     type=click.STRING,
     help=u"If you wanna specify concurrent option for scheduling flow. Possible values: ignore, pipeline, skip",
 )
-def schedule(ctx, project, flow, cron, concurrent_option):
+@click.option(u"--no-cache", is_flag=True, help=u"Do not use nor update the local cache of project and schedule ids.")
+def schedule(ctx, project, flow, cron, concurrent_option, no_cache):
     """Schedule a flow from a project with specified cron in quartz format"""
-    __schedule(ctx, project, flow, cron, concurrent_option)
+    __schedule(ctx, project, flow, cron, concurrent_option, no_cache)
 
 
-@click.command(u"unschedule")
+@click.command(u"unschedule", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"flow", type=click.STRING)
-def unschedule(ctx, project, flow):
+@click.option(u"--no-cache", is_flag=True, help=u"Do not use nor update the local cache of project and schedule ids.")
+def unschedule(ctx, project, flow, no_cache):
     """Unschedule a flow from a project"""
-    __unschedule(ctx, project, flow)
+    __unschedule(ctx, project, flow, no_cache)
 
 
-@click.command(u"execute")
+@click.command(u"sync_schedules", cls=TracedCommand)
+@click.pass_context
+@click.argument(u"manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option(u"--apply", is_flag=True, help=u"Apply the plan. Without it, the changes are only printed.")
+@click.option(u"--max-workers", type=click.INT, default=8, help=u"Maximum number of concurrent requests.")
+def sync_schedules(ctx, manifest, apply, max_workers):
+    """Make the schedules of the projects in a yaml or json manifest match it"""
+    __sync_schedules(ctx, manifest, apply, max_workers)
+
+
+@click.command(u"execute", cls=TracedCommand)
 @click.pass_context
 @click.argument(u'project', type=click.STRING)
 @click.argument(u'flow', type=click.STRING)
@@ -634,7 +1178,7 @@ def execute(ctx, project, flow, disabled, success_emails, failure_emails,
     __execute(ctx, project, flow, **execution_options)
 
 
-@click.command(u"cancel")
+@click.command(u"cancel", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"execution_id", type=click.STRING)
 def cancel(ctx, execution_id):
@@ -642,7 +1186,7 @@ def cancel(ctx, execution_id):
     __cancel(ctx, execution_id)
 
 
-@click.command(u"create")
+@click.command(u"create", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"description", type=click.STRING)
@@ -651,23 +1195,30 @@ def create(ctx, project, description):
     __create(ctx, project, description)
 
 
-@click.command(u"delete")
+@click.command(u"delete", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
-def delete(ctx, project):
-    """Delete a project"""
-    __delete(ctx, project)
+@click.option(u"--no-cache", is_flag=True, help=u"Do not use nor update the local cache of project and schedule ids.")
+@click.option(u"--dry-run", is_flag=True, help=u"Only print the schedules that would be removed, without deleting.")
+@click.option(u"--max-workers", type=click.INT, default=8, help=u"Maximum number of concurrent unschedule requests.")
+def delete(ctx, project, no_cache, dry_run, max_workers):
+    """Delete a project, unscheduling its flows first"""
+    __delete(ctx, project, no_cache, dry_run, max_workers)
 
 
-@click.command(u"fetch_projects")
+@click.command(u"fetch_projects", cls=TracedCommand)
 @click.pass_context
 @click.option(u"--user", type=click.STRING, required=False, help=u"Azkaban user to fetch projects from")
-def fetch_projects(ctx, user):
+@click.option(u"--all-clusters", is_flag=True, help=u"Query every saved profile concurrently and merge the results.")
+def fetch_projects(ctx, user, all_clusters):
     """Fetch all project from a user"""
-    __fetch_projects(ctx, user)
+    if all_clusters:
+        __fetch_projects_all_clusters(user)
+    else:
+        __fetch_projects(ctx, user)
 
 
-@click.command(u"fetch_sla")
+@click.command(u"fetch_sla", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"schedule", type=click.STRING)
 def fetch_sla(ctx, schedule):
@@ -675,7 +1226,7 @@ def fetch_sla(ctx, schedule):
     __fetch_sla(ctx, schedule)
 
 
-@click.command(u"add_permission")
+@click.command(u"add_permission", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"group", type=click.STRING)
@@ -695,7 +1246,7 @@ def add_permission(ctx, project, group, _admin, _read, _write, _execute, _schedu
     __add_permission(ctx, project, group, _admin, _read, _write, _execute, _schedule)
 
 
-@click.command(u"remove_permission")
+@click.command(u"remove_permission", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"group", type=click.STRING)
@@ -704,7 +1255,7 @@ def remove_permission(ctx, project, group):
     __remove_permission(ctx, project, group)
 
 
-@click.command(u"change_permission")
+@click.command(u"change_permission", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"group", type=click.STRING)
@@ -724,7 +1275,17 @@ def change_permission(ctx, project, group, _admin, _read, _write, _execute, _sch
     __change_permission(ctx, project, group, _admin, _read, _write, _execute, _schedule)
 
 
-@click.command(u"fetch_jobs_from_flow")
+@click.command(u"sync_permissions", cls=TracedCommand)
+@click.pass_context
+@click.argument(u"manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option(u"--apply", is_flag=True, help=u"Apply the plan. Without it, the changes are only printed.")
+@click.option(u"--max-workers", type=click.INT, default=8, help=u"Maximum number of concurrent requests.")
+def sync_permissions(ctx, manifest, apply, max_workers):
+    """Make the group permissions of projects match a yaml or json manifest"""
+    __sync_permissions(ctx, manifest, apply, max_workers)
+
+
+@click.command(u"fetch_jobs_from_flow", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"flow", type=click.STRING)
@@ -733,7 +1294,7 @@ def fetch_jobs_from_flow(ctx, project, flow):
     __fetch_jobs_from_flow(ctx, project, flow)
 
 
-@click.command(u"fetch_flow_execution")
+@click.command(u"fetch_flow_execution", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"execution_id", type=click.STRING)
 def fetch_flow_execution(ctx, execution_id):
@@ -741,18 +1302,22 @@ def fetch_flow_execution(ctx, execution_id):
     __fetch_flow_execution(ctx, execution_id)
 
 
-@click.command(u"fetch_executions_of_a_flow")
+@click.command(u"fetch_executions_of_a_flow", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"flow", type=click.STRING)
 @click.argument(u"start", type=click.INT, default=0)
 @click.argument(u"length", type=click.INT, default=3)
-def fetch_executions_of_a_flow(ctx, project, flow, start, length):
+@click.option(u"--all-clusters", is_flag=True, help=u"Query every saved profile concurrently and merge the results.")
+def fetch_executions_of_a_flow(ctx, project, flow, start, length, all_clusters):
     """Fetch executions of a flow"""
-    __fetch_executions_of_a_flow(ctx, project, flow, start, length)
+    if all_clusters:
+        __fetch_executions_of_a_flow_all_clusters(project, flow, start, length)
+    else:
+        __fetch_executions_of_a_flow(ctx, project, flow, start, length)
 
 
-@click.command(u"fetch_flow_execution_updates")
+@click.command(u"fetch_flow_execution_updates", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"execution_id", type=click.STRING)
 @click.option(
@@ -768,31 +1333,83 @@ def fetch_flow_execution_updates(ctx, execution_id, last_update_time):
     __fetch_flow_execution_updates(ctx, execution_id, last_update_time)
 
 
-@click.command(u"fetch_execution_job_log")
+@click.command(u"watch_execution", cls=TracedCommand)
+@click.pass_context
+@click.argument(u"execution_id", type=click.STRING)
+@click.option(u"--interval", type=click.FLOAT, default=5.0, show_default=True, help=u"Seconds between polls.")
+def watch_execution(ctx, execution_id, interval):
+    """Watch the status transitions of a flow execution until it finishes"""
+    __watch_execution(ctx, execution_id, interval)
+
+
+@click.command(u"watch_executions", cls=TracedCommand)
+@click.pass_context
+@click.argument(u"execution_ids", type=click.STRING, nargs=-1, required=True)
+@click.option(
+    u"--min-interval", type=click.FLOAT, default=1.0, show_default=True, help=u"Seconds between polls of active executions."
+)
+@click.option(
+    u"--max-interval", type=click.FLOAT, default=30.0, show_default=True, help=u"Maximum seconds between polls of idle executions."
+)
+@click.option(u"--max-workers", type=click.INT, default=8, show_default=True, help=u"Maximum concurrent requests.")
+def watch_executions(ctx, execution_ids, min_interval, max_interval, max_workers):
+    """Watch many flow executions, printing their status transitions as JSON lines"""
+    __watch_executions(ctx, execution_ids, min_interval, max_interval, max_workers)
+
+
+@click.command(u"fetch_execution_job_log", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"execution_id", type=click.STRING)
 @click.argument(u"jobid", type=click.STRING)
 @click.argument(u"offset", type=click.STRING)
 @click.argument(u"length", type=click.STRING)
-def fetch_execution_job_log(ctx, execution_id, jobid, offset, length):
+@click.option(
+    u"--follow",
+    "-f",
+    is_flag=True,
+    help=u"Keep fetching the log in chunks of length and print it as it grows, until the job finishes.",
+)
+def fetch_execution_job_log(ctx, execution_id, jobid, offset, length, follow):
     """Fetch flow execution job logs"""
-    __fetch_execution_job_log(ctx, execution_id, jobid, offset, length)
+    __fetch_execution_job_log(ctx, execution_id, jobid, offset, length, follow)
 
 
-@click.command(u"fetch_running_executions_of_a_flow")
+@click.command(u"download_execution_logs", cls=TracedCommand)
+@click.pass_context
+@click.argument(u"execution_id", type=click.STRING)
+@click.argument(u"directory", type=click.STRING)
+@click.option(
+    u"--chunk-size", type=click.INT, default=50000, show_default=True, help=u"Length of log data fetched per request."
+)
+@click.option(u"--max-workers", type=click.INT, default=8, show_default=True, help=u"Maximum concurrent requests.")
+@click.option(u"--gzip", u"compress", is_flag=True, help=u"Write gzip compressed logs (<jobid>.log.gz).")
+def download_execution_logs(ctx, execution_id, directory, chunk_size, max_workers, compress):
+    """Download the logs of every job of a flow execution to a directory"""
+    __download_execution_logs(ctx, execution_id, directory, chunk_size, max_workers, compress)
+
+
+@click.command(u"fetch_running_executions_of_a_flow", cls=TracedCommand)
 @click.pass_context
 @click.argument(u"project", type=click.STRING)
 @click.argument(u"flow", type=click.STRING)
-def fetch_running_executions_of_a_flow(ctx, project, flow):
+@click.option(u"--all-clusters", is_flag=True, help=u"Query every saved profile concurrently and merge the results.")
+def fetch_running_executions_of_a_flow(ctx, project, flow, all_clusters):
     """ Fetch running executions of a flow"""
-    _fetch_running_executions_of_a_flow(ctx, project, flow)
+    if all_clusters:
+        __fetch_running_executions_of_a_flow_all_clusters(project, flow)
+    else:
+        _fetch_running_executions_of_a_flow(ctx, project, flow)
 
 
 cli.add_command(login)
 cli.add_command(logout)
+cli.add_command(profiles)
+cli.add_command(agent)
 cli.add_command(upload)
+cli.add_command(bulk_upload)
 cli.add_command(schedule)
 cli.add_command(unschedule)
+cli.add_command(sync_schedules)
 cli.add_command(execute)
 cli.add_command(cancel)
 cli.add_command(create)
@@ -802,11 +1419,15 @@ cli.add_command(fetch_sla)
 cli.add_command(add_permission)
 cli.add_command(remove_permission)
 cli.add_command(change_permission)
+cli.add_command(sync_permissions)
 cli.add_command(fetch_jobs_from_flow)
 cli.add_command(fetch_flow_execution)
 cli.add_command(fetch_flow_execution_updates)
+cli.add_command(watch_execution)
+cli.add_command(watch_executions)
 cli.add_command(fetch_executions_of_a_flow)
 cli.add_command(fetch_execution_job_log)
+cli.add_command(download_execution_logs)
 cli.add_command(fetch_running_executions_of_a_flow)
 
 # Interface
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.cache
+
+This module provides local caches persisted as json files
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Seconds the project and schedule ids are kept in the metadata cache
+METADATA_TTL = 24 * 60 * 60
+
+
+class JsonFileCache(object):
+    def __init__(self, path):
+        """
+        Dictionary persisted in a json file. The file is only read on first access and is replaced atomically on save.
+
+        :param str path: Path of the json file
+        """
+
+        self.__path = path
+        self.__entries = None
+        self.__lock = threading.RLock()
+
+    @property
+    def entries(self):
+        with self.__lock:
+            if self.__entries is None:
+                self.__entries = self.__load()
+            return self.__entries
+
+    def __load(self):
+        """ PRIVATE
+        Reads the json file, a missing or corrupted file is treated as an empty cache.
+        """
+        try:
+            with open(self.__path, "r") as cache_file:
+                entries = json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        return entries if isinstance(entries, dict) else {}
+
+    def update(self, key, value):
+        """Sets the entry of the key and writes the entries to the json file"""
+
+        with self.__lock:
+            self.entries[key] = value
+            self.save()
+
+    def remove(self, keys):
+        """Removes the entries of the keys, if any of them exists, and writes the entries to the json file"""
+
+        with self.__lock:
+            removed = [self.entries.pop(key) for key in keys if key in self.entries]
+            if removed:
+                self.save()
+
+    def save(self):
+        """Writes the entries to the json file"""
+
+        with self.__lock:
+            directory = os.path.dirname(os.path.abspath(self.__path))
+            if not os.path.exists(directory):
+                os.makedirs(directory)
+
+            file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w") as cache_file:
+                    json.dump(self.entries, cache_file)
+                os.replace(temp_path, self.__path)
+            except Exception:
+                os.remove(temp_path)
+                raise
+
+
+class UploadCache(JsonFileCache):
+    """
+    Cache of the content hash of the last directory tree uploaded for each (host, project).
+
+    Every file hash is stored together with the file mtime and size, so unchanged files are not read again.
+    """
+
+    def __key(self, host, project):
+        return u"%s|%s" % (host, project)
+
+    def get(self, host, project):
+        """
+        Returns the entry saved by the last successful upload of the project to the host
+
+        :param str host: Azkaban hostname
+        :param str project: Project name on Azkaban
+        :return: A dictionary containing digest, files, projectId and version as keys, or None
+        :rtype: dict
+        """
+
+        return self.entries.get(self.__key(host, project))
+
+    def set(self, host, project, digest, files, project_id, version):
+        """
+        Saves the tree uploaded to the project on the host
+
+        :param str host: Azkaban hostname
+        :param str project: Project name on Azkaban
+        :param str digest: Content hash of the directory tree, see hash_tree
+        :param dict files: File hashes of the directory tree, see hash_tree
+        :param str project_id: Project id returned by the upload
+        :param str version: Project version returned by the upload
+        """
+
+        self.update(self.__key(host, project), {
+            u"digest": digest,
+            u"files": files,
+            u"projectId": project_id,
+            u"version": version,
+        })
+
+    def hash_tree(self, host, project, path):
+        """
+        Computes the content hash of a directory tree, reusing the hashes saved for files whose mtime and size did
+        not change since the last upload of the project to the host
+
+        :param str host: Azkaban hostname
+        :param str project: Project name on Azkaban
+        :param str path: Directory that would be uploaded
+        :return: The tree digest and a dictionary mapping each relative file path to [mtime_ns, size, sha256]
+        :rtype: tuple
+        """
+
+        entry = self.get(host, project) or {}
+        cached_files = entry.get(u"files", {})
+
+        tree_hash = hashlib.sha256()
+        files = {}
+
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            relative_root = os.path.relpath(root, path)
+
+            if relative_root != os.curdir:
+                tree_hash.update((u"%s/\n" % (relative_root.replace(os.sep, u"/"))).encode("utf-8"))
+
+            for name in sorted(names):
+                file_path = os.path.join(root, name)
+                relative_path = os.path.normpath(os.path.join(relative_root, name)).replace(os.sep, u"/")
+                stat = os.stat(file_path)
+
+                cached = cached_files.get(relative_path)
+                if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                    file_hash = cached[2]
+                else:
+                    file_hash = self.__hash_file(file_path)
+
+                files[relative_path] = [stat.st_mtime_ns, stat.st_size, file_hash]
+                tree_hash.update((u"%s\0%s\n" % (relative_path, file_hash)).encode("utf-8"))
+
+        return tree_hash.hexdigest(), files
+
+    def __hash_file(self, file_path):
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as source:
+            for data in iter(lambda: source.read(HASH_CHUNK_SIZE), b""):
+                file_hash.update(data)
+        return file_hash.hexdigest()
+
+
+class MetadataCache(JsonFileCache):
+    def __init__(self, path, ttl=METADATA_TTL):
+        """
+        Cache of the ids Azkaban assigns to projects (project name to projectId) and schedules ((projectId, flow) to
+        scheduleId) for each host. Entries older than ttl seconds are ignored.
+
+        :param str path: Path of the json file
+        :param float ttl: Seconds an entry is valid
+        """
+
+        JsonFileCache.__init__(self, path)
+
+        self.ttl = ttl
+
+    def __project_key(self, host, project):
+        return u"%s|project|%s" % (host, project)
+
+    def __schedule_key(self, host, project_id, flow):
+        return u"%s|schedule|%s|%s" % (host, project_id, flow)
+
+    def __get(self, key):
+        entry = self.entries.get(key)
+        if not entry or time.time() - entry[1] > self.ttl:
+            return None
+        return entry[0]
+
+    def get_project_id(self, host, project):
+        """
+        Returns the cached id of the project on the host
+
+        :param str host: Azkaban hostname
+        :param str project: Project name on Azkaban
+        :return: The project id, or None when it is not cached or expired
+        """
+
+        return self.__get(self.__project_key(host, project))
+
+    def set_project_id(self, host, project, project_id):
+        """
+        Saves the id of the project on the host
+
+        :param str host: Azkaban hostname
+        :param str project: Project name on Azkaban
+        :param project_id: Project id on Azkaban
+        """
+
+        self.update(self.__project_key(host, project), [project_id, time.time()])
+
+    def get_schedule_id(self, host, project_id, flow):
+        """
+        Returns the cached schedule id of the flow on the host
+
+        :param str host: Azkaban hostname
+        :param project_id: Project id on Azkaban
+        :param str flow: Flow name on Azkaban
+        :return: The schedule id, or None when it is not cached or expired
+        """
+
+        return self.__get(self.__schedule_key(host, project_id, flow))
+
+    def set_schedule_id(self, host, project_id, flow, schedule_id):
+        """
+        Saves the schedule id of the flow on the host
+
+        :param str host: Azkaban hostname
+        :param project_id: Project id on Azkaban
+        :param str flow: Flow name on Azkaban
+        :param schedule_id: Schedule id on Azkaban
+        """
+
+        self.update(self.__schedule_key(host, project_id, flow), [schedule_id, time.time()])
+
+    def invalidate_schedule(self, host, project_id, flow):
+        """Removes the schedule id of the flow on the host"""
+
+        self.remove([self.__schedule_key(host, project_id, flow)])
+
+    def invalidate_project(self, host, project):
+        """Removes the id of the project on the host, together with the schedule ids of its flows"""
+
+        key = self.__project_key(host, project)
+        entry = self.entries.get(key)
+
+        keys = [key]
+        if entry:
+            prefix = self.__schedule_key(host, entry[0], u"")
+            keys.extend(cached for cached in list(self.entries) if cached.startswith(prefix))
+
+        self.remove(keys)
+
+    def invalidate_host(self, host):
+        """Removes every id cached for the host"""
+
+        prefix = u"%s|" % (host)
+        self.remove([key for key in list(self.entries) if key.startswith(prefix)])
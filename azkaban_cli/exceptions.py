@@ -68,3 +68,18 @@ class ResumeFlowExecutionError(Exception):
 
 class FetchRunningExecutionsOfAFlowError(Exception):
     pass
+
+class ManifestError(Exception):
+    pass
+
+class FetchGroupPermissionsError(Exception):
+    pass
+
+class SessionConfigError(Exception):
+    pass
+
+class CircuitOpenError(Exception):
+    pass
+
+class AgentError(Exception):
+    pass
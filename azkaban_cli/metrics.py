@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.metrics
+
+This module provides the aggregation of the metrics passed to request hooks, see Azkaban.add_request_hook, into latency
+histograms by ajax action and a Prometheus textfile.
+
+The metrics of a request are a dictionary containing as keys:
+
+- method, host and endpoint (the url path, such as /executor) of the request
+- action: ajax or action parameter, such as fetchexecflow, None for pages like /index
+- status: HTTP status of the last attempt, None when the request raised
+- error: name of the exception raised by the request, None when it returned
+- bytes_out and bytes_in: sizes of the request and response bodies, None when unknown (streamed bodies)
+- retries: number of attempts after the first one
+- dns, connect and tls: seconds spent opening the connection of the last attempt, None when a pooled one was reused
+- ttfb: seconds from sending the last attempt until its response headers arrived, including the connection
+- total: seconds spent in the request, including retries and the download of the body
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+# Upper bounds, in seconds, of the latency histogram buckets
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+PHASES = (u'dns', u'connect', u'tls', u'ttfb')
+
+PROMETHEUS_PREFIX = u'azkaban_cli_'
+
+HISTOGRAM_WIDTH = 40
+
+
+def action_name(metrics):
+    """Name the request is aggregated by: its ajax action, or its endpoint when it has none"""
+
+    return metrics.get(u'action') or metrics.get(u'endpoint') or u'/'
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return u'-'
+    if seconds < 1:
+        return u'%.1fms' % (seconds * 1000)
+    return u'%.2fs' % (seconds)
+
+
+def format_bytes(size):
+    if size < 1024:
+        return u'%dB' % (size)
+    for unit in (u'KB', u'MB', u'GB'):
+        size /= 1024.0
+        if size < 1024 or unit == u'GB':
+            return u'%.1f%s' % (size, unit)
+
+
+def labels(**values):
+    """Formats Prometheus labels, escaping their values"""
+
+    pairs = []
+    for name in sorted(values):
+        value = u'%s' % (values[name]) if values[name] is not None else u''
+        value = value.replace(u'\\', u'\\\\').replace(u'"', u'\\"').replace(u'\n', u'\\n')
+        pairs.append(u'%s="%s"' % (name, value))
+    return u'{%s}' % (u','.join(pairs))
+
+
+class RequestMetrics(object):
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        """
+        Request hook aggregating the metrics of the requests by ajax action: a latency histogram of the total time,
+        the sum of each connection phase, bytes, retries and request counts by status.
+
+        Safe to share between threads, such as the ones of upload_many.
+
+        :param tuple buckets: Upper bounds of the histogram buckets, in seconds
+        """
+
+        self.buckets = tuple(sorted(buckets))
+
+        self.__actions = {}
+        self.__requests = {}
+        self.__lock = threading.Lock()
+
+    def __call__(self, metrics):
+        """
+        Adds the metrics of a request
+
+        :param dict metrics: Metrics of a request, see the module documentation
+        """
+
+        name = action_name(metrics)
+        total = metrics.get(u'total') or 0.0
+        status = metrics.get(u'status') or metrics.get(u'error') or u'unknown'
+
+        with self.__lock:
+            action = self.__actions.get(name)
+            if action is None:
+                action = self.__actions[name] = {
+                    u'count': 0,
+                    u'sum': 0.0,
+                    u'max': 0.0,
+                    u'buckets': [0] * len(self.buckets),
+                    u'phases': {phase: [0, 0.0] for phase in PHASES},
+                    u'bytes_out': 0,
+                    u'bytes_in': 0,
+                    u'retries': 0,
+                }
+
+            action[u'count'] += 1
+            action[u'sum'] += total
+            action[u'max'] = max(action[u'max'], total)
+            for index, bound in enumerate(self.buckets):
+                if total <= bound:
+                    action[u'buckets'][index] += 1
+                    break
+
+            for phase in PHASES:
+                if metrics.get(phase) is not None:
+                    action[u'phases'][phase][0] += 1
+                    action[u'phases'][phase][1] += metrics[phase]
+
+            action[u'bytes_out'] += metrics.get(u'bytes_out') or 0
+            action[u'bytes_in'] += metrics.get(u'bytes_in') or 0
+            action[u'retries'] += metrics.get(u'retries') or 0
+
+            key = (metrics.get(u'host'), metrics.get(u'endpoint'), name, u'%s' % (status))
+            self.__requests[key] = self.__requests.get(key, 0) + 1
+
+    def summary(self):
+        """
+        Returns the aggregated metrics of every action
+
+        :return: A dictionary mapping each action to a dictionary containing count, sum, max, buckets (the count of
+         requests in each bucket, not cumulative, requests slower than the last bound are only in count), phases
+         (mapping each phase to [count, sum]), bytes_out, bytes_in and retries as keys
+        :rtype: dict
+        """
+
+        with self.__lock:
+            return {
+                name: dict(
+                    action,
+                    buckets=list(action[u'buckets']),
+                    phases={phase: list(values) for phase, values in action[u'phases'].items()},
+                )
+                for name, action in self.__actions.items()
+            }
+
+    def format_timings(self):
+        """
+        Returns a latency histogram of each action, slowest total time first, as lines of text
+
+        :rtype: list
+        """
+
+        summary = self.summary()
+        if not summary:
+            return [u'No requests made']
+
+        lines = []
+        for name in sorted(summary, key=lambda name: -summary[name][u'sum']):
+            action = summary[name]
+            phases = [
+                u'%s %s' % (phase, format_seconds(total / count))
+                for phase, (count, total) in sorted(action[u'phases'].items(), key=lambda item: PHASES.index(item[0]))
+                if count
+            ]
+            lines.append(u'%s: %d requests, mean %s, max %s, %d retries, %s out, %s in%s' % (
+                name,
+                action[u'count'],
+                format_seconds(action[u'sum'] / action[u'count']),
+                format_seconds(action[u'max']),
+                action[u'retries'],
+                format_bytes(action[u'bytes_out']),
+                format_bytes(action[u'bytes_in']),
+                u' (mean %s)' % (u', '.join(phases)) if phases else u'',
+            ))
+
+            counts = action[u'buckets'] + [action[u'count'] - sum(action[u'buckets'])]
+            bounds = [u'<= %s' % (format_seconds(bound)) for bound in self.buckets] + [
+                u'> %s' % (format_seconds(self.buckets[-1]))
+            ]
+            used = [index for index, count in enumerate(counts) if count]
+            largest = max(counts)
+            for index in range(used[0], used[-1] + 1):
+                bar = u'#' * int(round(HISTOGRAM_WIDTH * counts[index] / float(largest)))
+                lines.append(u'  %10s |%-*s %d' % (bounds[index], HISTOGRAM_WIDTH, bar, counts[index]))
+
+        return lines
+
+    def prometheus_text(self, retry_stats=None):
+        """
+        Returns the metrics in the Prometheus text exposition format
+
+        :param dict retry_stats: Retry counters of the session, optional. See Azkaban.get_retry_stats.
+        :rtype: str
+        """
+
+        summary = self.summary()
+        with self.__lock:
+            requests = dict(self.__requests)
+
+        metric = PROMETHEUS_PREFIX + u'requests_total'
+        lines = [
+            u'# HELP %s Requests made to Azkaban, by status or exception of the last attempt.' % (metric),
+            u'# TYPE %s counter' % (metric),
+        ]
+        for (host, endpoint, action, status), count in sorted(requests.items()):
+            lines.append(u'%s%s %d' % (metric, labels(host=host, endpoint=endpoint, action=action, status=status), count))
+
+        metric = PROMETHEUS_PREFIX + u'request_duration_seconds'
+        lines.append(u'# HELP %s Total time of the requests, including retries.' % (metric))
+        lines.append(u'# TYPE %s histogram' % (metric))
+        for name in sorted(summary):
+            action = summary[name]
+            cumulative = 0
+            for bound, count in zip(self.buckets, action[u'buckets']):
+                cumulative += count
+                lines.append(u'%s_bucket%s %d' % (metric, labels(action=name, le=repr(float(bound))), cumulative))
+            lines.append(u'%s_bucket%s %d' % (metric, labels(action=name, le=u'+Inf'), action[u'count']))
+            lines.append(u'%s_sum%s %r' % (metric, labels(action=name), action[u'sum']))
+            lines.append(u'%s_count%s %d' % (metric, labels(action=name), action[u'count']))
+
+        metric = PROMETHEUS_PREFIX + u'request_phase_seconds'
+        lines.append(u'# HELP %s Time spent in each phase of the requests that went through it.' % (metric))
+        lines.append(u'# TYPE %s summary' % (metric))
+        for name in sorted(summary):
+            for phase in PHASES:
+                count, total = summary[name][u'phases'][phase]
+                lines.append(u'%s_sum%s %r' % (metric, labels(action=name, phase=phase), total))
+                lines.append(u'%s_count%s %d' % (metric, labels(action=name, phase=phase), count))
+
+        for key, help_text in (
+            (u'bytes_out', u'Bytes sent in request bodies.'),
+            (u'bytes_in', u'Bytes received in response bodies.'),
+            (u'retries', u'Retries of the requests.'),
+        ):
+            metric = PROMETHEUS_PREFIX + u'request_%s_total' % (key)
+            lines.append(u'# HELP %s %s' % (metric, help_text))
+            lines.append(u'# TYPE %s counter' % (metric))
+            for name in sorted(summary):
+                lines.append(u'%s%s %d' % (metric, labels(action=name), summary[name][key]))
+
+        for counter in sorted(retry_stats or {}):
+            metric = PROMETHEUS_PREFIX + u'retry_policy_%s_total' % (counter)
+            lines.append(u'# HELP %s Retry policy counter %s of the session.' % (metric, counter))
+            lines.append(u'# TYPE %s counter' % (metric))
+            lines.append(u'%s %d' % (metric, retry_stats[counter]))
+
+        metric = PROMETHEUS_PREFIX + u'last_run_timestamp_seconds'
+        lines.append(u'# HELP %s Time the metrics were written.' % (metric))
+        lines.append(u'# TYPE %s gauge' % (metric))
+        lines.append(u'%s %r' % (metric, time.time()))
+
+        return u'\n'.join(lines) + u'\n'
+
+    def write_textfile(self, path, retry_stats=None):
+        """
+        Writes the metrics to a file read by the textfile collector of the Prometheus node exporter. The file is
+        replaced atomically, so the collector never reads it half written.
+
+        :param str path: Path of the file, its name should end with .prom
+        :param dict retry_stats: Retry counters of the session, optional. See Azkaban.get_retry_stats.
+        """
+
+        directory = os.path.dirname(os.path.abspath(path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix=u'.metrics', suffix=u'.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'w') as metrics_file:
+                metrics_file.write(self.prometheus_text(retry_stats))
+            # The node exporter must be able to read it, mkstemp creates it readable by the owner only
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except Exception:
+            os.remove(temp_path)
+            raise
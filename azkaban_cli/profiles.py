@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.profiles
+
+This module provides the logged sessions of many Azkaban clusters, saved as named profiles, and read only queries made
+concurrently to all of them
+"""
+
+from azkaban_cli.cache import JsonFileCache
+from azkaban_cli.exceptions import CircuitOpenError, NotLoggedOnError, SessionError
+
+DEFAULT_PROFILE = u'default'
+
+SESSION_KEYS = (u'host', u'user', u'session_id')
+
+
+class SessionStore(JsonFileCache):
+    """
+    Logged sessions by profile name, plus the name of the current profile, persisted in a json file as
+    {"current": name, "profiles": {name: {"host": ..., "user": ..., "session_id": ...}}}.
+
+    A file with a single session, as written by older versions, is read as the default profile.
+    """
+
+    def __profiles(self):
+        """ PRIVATE
+        Returns the profiles dictionary of the entries, converting a single session to the default profile.
+        """
+        entries = self.entries
+        if u'host' in entries:
+            session = {key: entries.pop(key) for key in SESSION_KEYS if key in entries}
+            entries[u'profiles'] = {DEFAULT_PROFILE: session}
+            entries[u'current'] = DEFAULT_PROFILE
+        if not isinstance(entries.get(u'profiles'), dict):
+            entries[u'profiles'] = {}
+        return entries[u'profiles']
+
+    @property
+    def current(self):
+        """Name of the profile used when none is chosen, the default profile when there is none"""
+
+        self.__profiles()
+        return self.entries.get(u'current') or DEFAULT_PROFILE
+
+    def profiles(self):
+        """
+        Returns the logged sessions of every profile
+
+        :return: A dictionary mapping each profile name to a dictionary containing host, user and session_id as keys
+        :rtype: dict
+        """
+
+        return dict(self.__profiles())
+
+    def get(self, profile=None):
+        """
+        Returns the logged session of the profile
+
+        :param str profile: Profile name, optional. The current profile if not passed.
+        :return: A dictionary containing host, user and session_id as keys, None when the profile does not exist
+        :rtype: dict
+        """
+
+        return self.__profiles().get(profile or self.current)
+
+    def set(self, profile, logged_session):
+        """
+        Saves the logged session of the profile and makes it the current profile
+
+        :param str profile: Profile name
+        :param dict logged_session: Dictionary containing host, user and session_id as keys
+        """
+
+        self.__profiles()[profile] = {key: logged_session.get(key) for key in SESSION_KEYS}
+        self.update(u'current', profile)
+
+    def delete(self, profile):
+        """
+        Removes the logged session of the profile. If it is the current profile, another one becomes current.
+
+        :param str profile: Profile name
+        """
+
+        profiles = self.__profiles()
+        profiles.pop(profile, None)
+        if self.entries.get(u'current') == profile:
+            self.entries[u'current'] = sorted(profiles)[0] if profiles else None
+        self.save()
+
+
+def query_profiles(profiles, query, errors=(), max_workers=None, config_path=None, request_hooks=(), tracer=None):
+    """
+    Runs a read only query concurrently against the Azkaban cluster of every profile.
+
+    A failure in one cluster does not stop the others, it is reported in its result instead. Expired sessions, missing
+    logins, connection errors and open circuits are always reported, other exceptions only if listed in errors.
+
+    :param dict profiles: Dictionary mapping profile names to logged sessions, see SessionStore.profiles
+    :param query: Function receiving a logged Azkaban instance and returning the result of the cluster
+    :param tuple errors: Exception types reported as errors of a cluster, optional
+    :param int max_workers: Maximum number of concurrent queries, optional. One per profile if not passed.
+    :param str config_path: Path of the json config file of the Azkaban instances, optional
+    :param list request_hooks: Functions added to every Azkaban instance, see Azkaban.add_request_hook
+    :param tracer: Tracer set on every Azkaban instance, optional. See Azkaban.set_tracer.
+    :type tracer: azkaban_cli.tracing.Tracer
+    :return: A list of dictionaries containing cluster, host, result and error as keys, sorted by profile name
+    :rtype: list
+    """
+
+    # Imported here, the session store is read by every command and must not import requests
+    from concurrent.futures import ThreadPoolExecutor
+
+    from azkaban_cli.azkaban import Azkaban
+    from azkaban_cli.retry import RETRY_EXCEPTIONS
+
+    names = sorted(profiles)
+    errors = tuple(errors) + (SessionError, NotLoggedOnError, CircuitOpenError) + RETRY_EXCEPTIONS
+
+    def query_one(name):
+        logged_session = profiles[name]
+        result = {u'cluster': name, u'host': logged_session.get(u'host'), u'result': None, u'error': None}
+
+        try:
+            azkaban = Azkaban(config_path=config_path)
+            for hook in request_hooks:
+                azkaban.add_request_hook(hook)
+            azkaban.set_tracer(tracer)
+            azkaban.set_logged_session(**logged_session)
+            result[u'result'] = query(azkaban)
+        except SessionError:
+            result[u'error'] = u'Session expired, login again with --profile %s' % (name)
+        except errors as e:
+            result[u'error'] = str(e) or e.__class__.__name__
+
+        return result
+
+    if not names:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(names)) as executor:
+        return list(executor.map(query_one, names))
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.profiling
+
+This module provides the CPU and memory profiling of commands, written to files that can be attached to performance
+reports
+"""
+
+import cProfile
+import io
+import linecache
+import os
+import pstats
+import tracemalloc
+
+# Allocations made by the profilers themselves and by the import machinery are not reported
+IGNORED_ALLOCATIONS = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, u"<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, u"<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, u"<unknown>"),
+)
+
+
+def format_size(size):
+    for unit in (u"B", u"KiB", u"MiB"):
+        if abs(size) < 1024:
+            return u"%.1f %s" % (size, unit)
+        size /= 1024.0
+    return u"%.1f GiB" % (size)
+
+
+def summary_path(path):
+    """Path of the text summary written next to the cProfile file, with the .txt extension"""
+
+    return os.path.splitext(path)[0] + u".txt"
+
+
+class Profiler(object):
+    def __init__(self, path, top=20):
+        """
+        Profiles the CPU time of the current thread with cProfile and the memory allocated by every thread with
+        tracemalloc, between start and stop.
+
+        :param str path: Path of the cProfile file, such as azkaban.prof. It can be read with pstats or snakeviz.
+        :param int top: Number of allocation sites and functions in the summary
+        """
+
+        self.path = path
+        self.top = top
+
+        self.__profile = cProfile.Profile()
+
+    def start(self):
+        tracemalloc.start()
+        self.__profile.enable()
+
+    def stop(self):
+        """
+        Stops profiling, writes the cProfile file and a text summary next to it, see summary_path. The allocation sites
+        are the ones of the memory still allocated when profiling stops, the peak covers everything allocated before.
+
+        :return: Lines of the summary of the allocations
+        :rtype: list
+        """
+
+        self.__profile.disable()
+
+        snapshot = tracemalloc.take_snapshot().filter_traces(IGNORED_ALLOCATIONS)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        allocations = [
+            u"Memory traced: %s at exit, %s at peak" % (format_size(current), format_size(peak)),
+            u"Top %d allocation sites:" % (self.top),
+        ]
+        for index, statistic in enumerate(snapshot.statistics(u"lineno")[:self.top]):
+            frame = statistic.traceback[0]
+            allocations.append(u"#%d %s:%d %s in %d blocks" % (
+                index + 1, frame.filename, frame.lineno, format_size(statistic.size), statistic.count
+            ))
+            line = linecache.getline(frame.filename, frame.lineno).strip()
+            if line:
+                allocations.append(u"    %s" % (line))
+
+        functions = io.StringIO()
+        pstats.Stats(self.__profile, stream=functions).sort_stats(u"cumulative").print_stats(self.top)
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.__profile.dump_stats(self.path)
+        with open(summary_path(self.path), "w") as summary_file:
+            summary_file.write(u"\n".join(allocations) + u"\n\n")
+            summary_file.write(u"Top %d functions by cumulative time:\n" % (self.top))
+            summary_file.write(functions.getvalue())
+
+        return allocations
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.projects
+
+This module provides a streaming extractor of the projects listed in the Azkaban index page
+"""
+
+from html.parser import HTMLParser
+
+LOGIN_SCRIPT_SRC = u"/js/azkaban/view/login.js"
+
+
+class ProjectInfoParser(HTMLParser):
+    """
+    Event based parser of the project-info blocks of the Azkaban index page.
+
+    The page can be fed in chunks of any size, only the project being parsed and the projects not drained yet are kept
+    in memory. If the page is the login page, the login_page attribute becomes True.
+    """
+
+    def __init__(self):
+        HTMLParser.__init__(self)
+
+        self.login_page = False
+
+        self.__projects = []
+        self.__depth = 0
+        self.__field = None
+        self.__parts = None
+
+    def drain(self):
+        """
+        Returns the projects parsed since the last call
+
+        :return: A list of dictionaries containing name, user and description as keys
+        :rtype: list
+        """
+
+        projects = self.__projects
+        self.__projects = []
+        return projects
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get(u"class") or u"").split()
+
+        if tag == u"script" and attrs.get(u"src") == LOGIN_SCRIPT_SRC:
+            self.login_page = True
+
+        if tag == u"div":
+            if self.__depth:
+                self.__depth += 1
+            elif u"project-info" in classes:
+                self.__depth = 1
+                self.__parts = {u"name": None, u"user": [], u"description": []}
+            return
+
+        if not self.__depth:
+            return
+
+        if tag == u"a" and self.__parts[u"name"] is None:
+            self.__parts[u"name"] = []
+            self.__field = u"name"
+        elif tag == u"p" and u"project-description" in classes:
+            self.__field = u"description"
+        elif tag == u"p" and u"project-last-modified" in classes:
+            self.__field = u"user"
+
+    def handle_endtag(self, tag):
+        if not self.__depth:
+            return
+
+        if tag == u"div":
+            self.__depth -= 1
+            if not self.__depth:
+                self.__projects.append(self.__project())
+                self.__field = None
+                self.__parts = None
+        elif (tag == u"a" and self.__field == u"name") or (tag == u"p" and self.__field in (u"description", u"user")):
+            self.__field = None
+
+    def handle_data(self, data):
+        if self.__field:
+            self.__parts[self.__field].append(data)
+
+    def __project(self):
+        # The last line of the last modified paragraph is "<user>."
+        last_modified = u"".join(self.__parts[u"user"])
+
+        return {
+            u"name": u"".join(self.__parts[u"name"] or []),
+            u"user": last_modified.split(u"\n")[-1].strip()[:-1],
+            u"description": u"".join(self.__parts[u"description"]).strip(),
+        }
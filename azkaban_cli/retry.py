@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.retry
+
+This module provides the retry policy applied to the requests made to Azkaban
+"""
+
+from __future__ import absolute_import
+
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+
+# Statuses returned by an overloaded Azkaban web server or by the proxies in front of it
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class RetryBudget(object):
+    def __init__(self, ratio=0.2, max_tokens=10.0):
+        """
+        Limits the retries to a fraction of the requests, so a server in trouble is not flooded with retries.
+
+        Every request deposits ratio tokens, up to max_tokens, and every retry withdraws one. The budget starts full,
+        so a one-shot command can still retry a few times.
+
+        :param float ratio: Tokens deposited by each request
+        :param float max_tokens: Maximum number of tokens
+        """
+
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+
+        self.__tokens = max_tokens
+        self.__lock = threading.Lock()
+
+    def deposit(self):
+        with self.__lock:
+            self.__tokens = min(self.max_tokens, self.__tokens + self.ratio)
+
+    def withdraw(self):
+        """Takes a token for a retry, returns False when there is none left"""
+
+        with self.__lock:
+            if self.__tokens < 1:
+                return False
+            self.__tokens -= 1
+            return True
+
+
+class RetryPolicy(object):
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30.0, statuses=RETRY_STATUSES,
+                 retry_non_idempotent=False, budget=None, sleep=time.sleep):
+        """
+        Retries requests that failed to connect, timed out or got an overloaded status, with exponential backoff and
+        full jitter. A Retry-After header, in seconds or as a date, is used instead of the backoff when present.
+
+        Only idempotent requests are retried unless retry_non_idempotent is True.
+
+        :param int max_retries: Maximum number of retries of a request
+        :param float backoff_factor: Upper bound of the first delay, it doubles on every retry
+        :param float max_backoff: Maximum delay between attempts, also applied to Retry-After
+        :param statuses: Response statuses that are retried
+        :param bool retry_non_idempotent: Also retry requests that change state on Azkaban, such as executeFlow
+        :param budget: Retry budget shared by all the requests, optional. A RetryBudget is created if not passed.
+        :type budget: RetryBudget
+        :param sleep: Function used to wait between attempts
+        """
+
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.budget = budget if budget is not None else RetryBudget()
+        self.sleep = sleep
+
+        self.__stats = {u'requests': 0, u'retries': 0, u'gave_up': 0, u'budget_exhausted': 0}
+        self.__lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """
+        Counters of the requests made, retries, requests that failed after the last retry and retries denied by the
+        budget
+
+        :rtype: dict
+        """
+
+        with self.__lock:
+            return dict(self.__stats)
+
+    def __count(self, counter):
+        with self.__lock:
+            self.__stats[counter] += 1
+
+    def backoff(self, attempt):
+        """Random delay before the retry following the attempt, between 0 and backoff_factor * 2 ** attempt"""
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def retry_after(self, response):
+        """Seconds to wait from the Retry-After header of the response, None when it has no valid one"""
+
+        value = response.headers.get(u'Retry-After')
+        if not value:
+            return None
+
+        try:
+            seconds = float(value)
+        except ValueError:
+            try:
+                seconds = email.utils.mktime_tz(email.utils.parsedate_tz(value)) - time.time()
+            except (TypeError, ValueError, OverflowError):
+                return None
+
+        return min(self.max_backoff, max(0.0, seconds))
+
+    def __can_retry(self, attempt, idempotent, replayable):
+        if not replayable or not (idempotent or self.retry_non_idempotent):
+            return False
+
+        if attempt >= self.max_retries:
+            self.__count(u'gave_up')
+            return False
+
+        if not self.budget.withdraw():
+            self.__count(u'budget_exhausted')
+            return False
+
+        return True
+
+    def call(self, send, idempotent=False, replayable=True):
+        """
+        Calls send until it returns a response that should not be retried, raises an exception that should not be
+        retried or the retries run out. The last response is returned, or the last exception raised.
+
+        :param send: Function making the request and returning the response
+        :param bool idempotent: If the request can be repeated without changing the outcome
+        :param bool replayable: If the request body can be sent again, False for streamed bodies
+        :return: The response from the last attempt
+        :rtype: requests.Response
+        """
+
+        self.__count(u'requests')
+        self.budget.deposit()
+
+        attempt = 0
+        while True:
+            try:
+                response = send()
+            except RETRY_EXCEPTIONS as e:
+                if not self.__can_retry(attempt, idempotent, replayable):
+                    raise
+                delay = self.backoff(attempt)
+                reason = e.__class__.__name__
+            else:
+                if response.status_code not in self.statuses or not self.__can_retry(attempt, idempotent, replayable):
+                    return response
+                delay = self.retry_after(response)
+                if delay is None:
+                    delay = self.backoff(attempt)
+                reason = u'status %d' % (response.status_code)
+                response.close()
+
+            attempt += 1
+            self.__count(u'retries')
+            logging.debug(u'Request failed with %s, retry %d in %.2f seconds' % (reason, attempt, delay))
+            self.sleep(delay)
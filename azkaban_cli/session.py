@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.session
+
+This module provides the creation of the requests.Session used by the Azkaban class, with configurable connection
+pools, timeouts, TCP keep-alive, retries, rate limits and circuit breaking
+"""
+
+from __future__ import absolute_import
+
+import json
+import os
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from azkaban_cli.exceptions import SessionConfigError
+from azkaban_cli.retry import RetryPolicy
+from azkaban_cli.throttle import Throttle
+
+ENV_PREFIX = u"AZKABAN_CLI_"
+
+# Option name -> (type, default value). Each option can also be set with the environment variable ENV_PREFIX followed
+# by the option name in upper case, e.g. AZKABAN_CLI_POOL_MAXSIZE. The rate_limits option maps endpoints to requests per
+# second, set in the environment as a comma separated list, e.g. AZKABAN_CLI_RATE_LIMITS=/executor=5,/manager=10.
+SESSION_OPTIONS = {
+    u"pool_connections": (int, 10),
+    u"pool_maxsize": (int, 10),
+    u"pool_block": (bool, False),
+    u"connect_timeout": (float, 10.0),
+    u"read_timeout": (float, 300.0),
+    u"tcp_keepalive": (bool, True),
+    u"tcp_keepalive_idle": (int, 60),
+    u"tcp_keepalive_interval": (int, 15),
+    u"tcp_keepalive_count": (int, 4),
+    u"max_retries": (int, 3),
+    u"retry_backoff_factor": (float, 0.5),
+    u"retry_max_backoff": (float, 30.0),
+    u"retry_non_idempotent": (bool, False),
+    u"rate_limit": (float, None),
+    u"rate_limits": (dict, {}),
+    u"rate_burst": (float, None),
+    u"circuit_failure_threshold": (int, 5),
+    u"circuit_reset_timeout": (float, 30.0),
+}
+
+# Options that can be None, meaning no timeout or no limit
+NULLABLE_OPTIONS = frozenset([u"connect_timeout", u"read_timeout", u"rate_limit", u"rate_burst"])
+
+TRUE_VALUES = (u"1", u"true", u"yes", u"on")
+FALSE_VALUES = (u"0", u"false", u"no", u"off")
+NONE_VALUES = (u"", u"none", u"null")
+
+# Timings of the last connection opened by each thread, as a dictionary containing dns, connect and tls as keys, read by
+# azkaban_cli.api for the request hooks. Only set by sessions passed to instrument_connections.
+CONNECTION_TIMINGS = threading.local()
+
+
+def __convert(option, value):
+    """ PRIVATE
+    Converts a value from the constructor, environment or config file to the type of the option. Timeouts and rate
+    limits can be None, meaning no timeout or no limit.
+    """
+    option_type = SESSION_OPTIONS[option][0]
+
+    if option_type is dict:
+        return __convert_rate_limits(option, value)
+
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if option in NULLABLE_OPTIONS and text in NONE_VALUES:
+            return None
+        if option_type is bool:
+            if text not in TRUE_VALUES + FALSE_VALUES:
+                raise SessionConfigError(u"Invalid value %r for session option %s" % (value, option))
+            return text in TRUE_VALUES
+
+    if value is None and option in NULLABLE_OPTIONS:
+        return None
+
+    try:
+        return option_type(value)
+    except (TypeError, ValueError):
+        raise SessionConfigError(u"Invalid value %r for session option %s" % (value, option))
+
+
+def __convert_rate_limits(option, value):
+    """ PRIVATE
+    Converts a mapping, or a comma separated list of endpoint=rate, to a dictionary of endpoints to requests per second.
+    """
+    try:
+        if isinstance(value, str):
+            value = dict(item.split(u"=", 1) for item in value.split(u",") if item.strip())
+        return {
+            u"/" + endpoint.strip().strip(u"/"): float(rate) for endpoint, rate in value.items()
+        }
+    except (AttributeError, TypeError, ValueError):
+        raise SessionConfigError(u"Invalid value %r for session option %s" % (value, option))
+
+
+def __read_config_file(config_path):
+    """ PRIVATE
+    Reads the "session" section of a json config file, a missing file is treated as an empty config.
+    """
+    if not config_path or not os.path.exists(config_path):
+        return {}
+
+    try:
+        with open(config_path, "r") as config_file:
+            config = json.load(config_file)
+    except (IOError, OSError, ValueError) as e:
+        raise SessionConfigError(u"Could not read config file %s: %s" % (config_path, e))
+
+    section = config.get(u"session", {}) if isinstance(config, dict) else None
+    if not isinstance(section, dict):
+        raise SessionConfigError(u"The session section of %s must be an object" % (config_path))
+
+    return section
+
+
+def load_session_config(config_path=None, **options):
+    """
+    Resolves the session options. Options passed as arguments take precedence over environment variables, which take
+    precedence over the "session" section of the json config file, which takes precedence over the defaults.
+
+    :param str config_path: Path of the json config file, optional
+    :param options: Session options, see SESSION_OPTIONS
+    :return: A dictionary with a value for every session option
+    :rtype: dict
+    :raises SessionConfigError: when an option is unknown or has an invalid value
+    """
+
+    config = {option: default for option, (_, default) in SESSION_OPTIONS.items()}
+
+    sources = [
+        __read_config_file(config_path),
+        {
+            option: os.environ[ENV_PREFIX + option.upper()]
+            for option in SESSION_OPTIONS if ENV_PREFIX + option.upper() in os.environ
+        },
+        options,
+    ]
+
+    for source in sources:
+        for option, value in source.items():
+            if option not in SESSION_OPTIONS:
+                raise SessionConfigError(u"Unknown session option %s" % (option))
+            config[option] = __convert(option, value)
+
+    return config
+
+
+def keepalive_socket_options(idle, interval, count):
+    """
+    Socket options enabling TCP keep-alive, so connections idle in the pool are not silently dropped by firewalls and
+    dead peers are detected. The idle, interval and count options are only set where the platform supports them.
+
+    :param int idle: Seconds a connection is idle before the first probe
+    :param int interval: Seconds between probes
+    :param int count: Number of unanswered probes before the connection is dropped
+    :return: Socket options, including urllib3 defaults
+    :rtype: list
+    """
+
+    socket_options = list(HTTPConnection.default_socket_options)
+    socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+    for name, value in ((u"TCP_KEEPIDLE", idle), (u"TCP_KEEPINTVL", interval), (u"TCP_KEEPCNT", count)):
+        if hasattr(socket, name):
+            socket_options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+
+    return socket_options
+
+
+class TimedConnectionMixin(object):
+    """
+    Connection measuring the name resolution, TCP connect and TLS handshake of every new connection, saved in
+    CONNECTION_TIMINGS. The host is resolved before connecting, so the resolution is not part of the connect time, and
+    the resolved addresses are tried in order as urllib3 does.
+    """
+
+    def _new_conn(self):
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror:
+            # urllib3 raises the resolution error
+            return super(TimedConnectionMixin, self)._new_conn()
+        resolved = time.perf_counter()
+
+        host = self._dns_host
+        error = None
+        try:
+            for address in addresses:
+                self._dns_host = address[4][0]
+                try:
+                    conn = super(TimedConnectionMixin, self)._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+            else:
+                raise error
+        finally:
+            self._dns_host = host
+
+        CONNECTION_TIMINGS.last = {u"dns": resolved - start, u"connect": time.perf_counter() - resolved, u"tls": None}
+        return conn
+
+    def connect(self):
+        start = time.perf_counter()
+        super(TimedConnectionMixin, self).connect()
+
+        timings = getattr(CONNECTION_TIMINGS, u"last", None)
+        if timings is not None and isinstance(self, HTTPSConnection):
+            timings[u"tls"] = max(0.0, time.perf_counter() - start - timings[u"dns"] - timings[u"connect"])
+
+
+class TimedHTTPConnection(TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def instrument_connections(session):
+    """
+    Makes the adapters of the session open connections measuring their dns, connect and tls timings, see
+    TimedConnectionMixin. Connections already in the pools are closed.
+
+    :param session: A session created by create_session
+    :type session: requests.Session
+    """
+
+    for adapter in session.adapters.values():
+        poolmanager = getattr(adapter, u"poolmanager", None)
+        if poolmanager is None or poolmanager.pool_classes_by_scheme.get(u"http") is TimedHTTPConnectionPool:
+            continue
+        poolmanager.pool_classes_by_scheme = {u"http": TimedHTTPConnectionPool, u"https": TimedHTTPSConnectionPool}
+        poolmanager.clear()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    def __init__(self, timeout=None, socket_options=None, **kwargs):
+        """
+        HTTPAdapter applying a default timeout to requests sent without one and socket options to new connections.
+
+        :param timeout: Default timeout, a number or a (connect, read) tuple, optional
+        :param list socket_options: Socket options of new connections, optional. urllib3 defaults when not passed.
+        :param kwargs: HTTPAdapter arguments, such as pool_connections and pool_maxsize
+        """
+
+        # HTTPAdapter.__init__ creates the pool manager, so the socket options must be set before
+        self.timeout = timeout
+        self.socket_options = socket_options
+
+        HTTPAdapter.__init__(self, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        if self.socket_options is not None:
+            kwargs[u"socket_options"] = self.socket_options
+        return HTTPAdapter.init_poolmanager(self, *args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get(u"timeout") is None:
+            kwargs[u"timeout"] = self.timeout
+        return HTTPAdapter.send(self, request, **kwargs)
+
+
+def create_session(config):
+    """
+    Creates a requests.Session with the connection pool, timeouts and keep-alive of the config. The retry policy and
+    the throttle of the config are set as the retry_policy and throttle attributes of the session, an empty list of
+    request hooks as its request_hooks attribute and no tracer as its tracer attribute, used by azkaban_cli.api.
+
+    :param dict config: Session options, see load_session_config
+    :return: The session, ignoring SSL verify
+    :rtype: requests.Session
+    """
+
+    timeout = None
+    if config[u"connect_timeout"] is not None or config[u"read_timeout"] is not None:
+        timeout = (config[u"connect_timeout"], config[u"read_timeout"])
+
+    socket_options = None
+    if config[u"tcp_keepalive"]:
+        socket_options = keepalive_socket_options(
+            config[u"tcp_keepalive_idle"], config[u"tcp_keepalive_interval"], config[u"tcp_keepalive_count"]
+        )
+
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        socket_options=socket_options,
+        pool_connections=config[u"pool_connections"],
+        pool_maxsize=config[u"pool_maxsize"],
+        pool_block=config[u"pool_block"],
+    )
+
+    session = requests.Session()
+    session.mount(u"http://", adapter)
+    session.mount(u"https://", adapter)
+    session.verify = False
+    session.retry_policy = RetryPolicy(
+        max_retries=config[u"max_retries"],
+        backoff_factor=config[u"retry_backoff_factor"],
+        max_backoff=config[u"retry_max_backoff"],
+        retry_non_idempotent=config[u"retry_non_idempotent"],
+    )
+    # Functions called with the metrics of every request, see azkaban_cli.metrics
+    session.request_hooks = []
+    # Tracer recording a span for every request, see azkaban_cli.tracing
+    session.tracer = None
+    session.throttle = Throttle(
+        rate_limit=config[u"rate_limit"],
+        rate_limits=config[u"rate_limits"],
+        burst=config[u"rate_burst"],
+        failure_threshold=config[u"circuit_failure_threshold"],
+        reset_timeout=config[u"circuit_reset_timeout"],
+    )
+
+    return session
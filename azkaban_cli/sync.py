@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.sync
+
+This module provides the reconciliation of the schedules and permissions on Azkaban with declarative manifests
+"""
+
+from __future__ import absolute_import
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from azkaban_cli.azkaban import PERMISSION_OPTIONS, is_empty_response
+from azkaban_cli.exceptions import FetchScheduleError, ManifestError, ScheduleError, UnscheduleError
+
+# Concurrent option Azkaban uses when the schedule request does not have one
+DEFAULT_CONCURRENT_OPTION = u'skip'
+
+CREATE = u'create'
+UPDATE = u'update'
+DELETE = u'delete'
+
+
+def __read_manifest(path):
+    """ PRIVATE
+    Reads a yaml (if PyYAML is installed) or json manifest.
+    """
+    try:
+        with open(path, "r") as manifest_file:
+            if path.endswith((u'.yaml', u'.yml')):
+                if yaml is None:
+                    raise ManifestError(u'PyYAML must be installed to read yaml manifests')
+                return yaml.safe_load(manifest_file)
+            return json.load(manifest_file)
+    except (IOError, OSError, ValueError) as e:
+        raise ManifestError(u'Could not read manifest %s: %s' % (path, e))
+
+
+def load_manifest(path):
+    """
+    Reads a manifest of schedules, in yaml (if PyYAML is installed) or json.
+
+    The manifest is a list of entries, or a mapping with the list under the "schedules" key. Each entry has project,
+    flow and cron keys and, optionally, concurrentOption.
+
+    :param str path: Path of the manifest, files ending in .yaml or .yml are read as yaml
+    :return: A list of dictionaries containing project, flow, cron and concurrentOption as keys
+    :rtype: list
+    :raises ManifestError: when the manifest cannot be read or an entry is invalid
+    """
+
+    manifest = __read_manifest(path)
+
+    if isinstance(manifest, dict):
+        manifest = manifest.get(u'schedules')
+    if not isinstance(manifest, list):
+        raise ManifestError(u'Manifest must be a list of schedules')
+
+    entries = []
+    seen = set()
+    for index, entry in enumerate(manifest):
+        if not isinstance(entry, dict) or not all(entry.get(key) for key in (u'project', u'flow', u'cron')):
+            raise ManifestError(u'Schedule %d must have project, flow and cron' % (index))
+
+        key = (entry[u'project'], entry[u'flow'])
+        if key in seen:
+            raise ManifestError(u'Flow %s of project %s is scheduled more than once' % (key[1], key[0]))
+        seen.add(key)
+
+        entries.append({
+            u'project': entry[u'project'],
+            u'flow': entry[u'flow'],
+            u'cron': u' '.join(entry[u'cron'].split()),
+            u'concurrentOption': entry.get(u'concurrentOption') or DEFAULT_CONCURRENT_OPTION,
+        })
+
+    return entries
+
+
+def load_permissions_manifest(path):
+    """
+    Reads a manifest of group permissions, in yaml (if PyYAML is installed) or json.
+
+    The manifest maps each project name to a mapping of group names to lists of permissions (admin, read, write,
+    execute or schedule), optionally under the "permissions" key. An empty list or null removes the group from the
+    project.
+
+    :param str path: Path of the manifest, files ending in .yaml or .yml are read as yaml
+    :return: A dictionary mapping each project name to a dictionary mapping group names to permission options, as
+     expected by Azkaban.sync_permissions
+    :rtype: dict
+    :raises ManifestError: when the manifest cannot be read or a permission is invalid
+    """
+
+    manifest = __read_manifest(path)
+
+    if isinstance(manifest, dict) and isinstance(manifest.get(u'permissions'), dict):
+        manifest = manifest[u'permissions']
+    if not isinstance(manifest, dict):
+        raise ManifestError(u'Manifest must map projects to group permissions')
+
+    permissions = {}
+    for project, groups in manifest.items():
+        if not isinstance(groups, dict):
+            raise ManifestError(u'Project %s must map groups to permissions' % (project))
+
+        permissions[project] = {}
+        for group, options in groups.items():
+            if options is not None and not isinstance(options, list):
+                raise ManifestError(u'Permissions of group %s in project %s must be a list' % (group, project))
+
+            options = [str(option).lower() for option in options or []]
+            invalid = [option for option in options if option not in PERMISSION_OPTIONS]
+            if invalid:
+                raise ManifestError(u'Invalid permissions %s of group %s in project %s' % (invalid, group, project))
+
+            permissions[project][group] = {option: True for option in options} if options else None
+
+    return permissions
+
+
+class ScheduleSync(object):
+    def __init__(self, azkaban, max_workers=8):
+        """
+        Reconciles the schedules of the projects listed in a manifest.
+
+        The plan is computed from the current schedules of every flow of those projects, fetched concurrently: flows
+        missing on Azkaban are created, flows with another cron or concurrent option are updated, and scheduled flows
+        missing in the manifest are deleted. Flows already as in the manifest do not generate any request on apply.
+
+        :param azkaban: Logged Azkaban instance
+        :type azkaban: azkaban_cli.azkaban.Azkaban
+        :param int max_workers: Maximum number of concurrent requests
+        """
+
+        self.__azkaban = azkaban
+        self.__max_workers = max_workers
+
+    def __map(self, function, items):
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            return list(executor.map(function, items))
+
+    def fetch_schedules(self, projects):
+        """
+        Fetches the current schedules of every flow of the projects
+
+        :param list projects: Project names on Azkaban
+        :return: A dictionary mapping each (project, flow) to its schedule, None when the flow is not scheduled. A
+         schedule is a dictionary containing cron, concurrentOption and scheduleId as keys.
+        :rtype: dict
+        :raises FetchFlowsError: when the flows of a project cannot be fetched
+        :raises FetchScheduleError: when a schedule cannot be fetched
+        """
+
+        flows = self.__map(self.__azkaban.fetch_flows, projects)
+
+        project_flows = []
+        for project, response_json in zip(projects, flows):
+            for flow in response_json.get(u'flows', []):
+                project_flows.append((project, response_json[u'projectId'], flow[u'flowId']))
+
+        def fetch_one(project_flow):
+            try:
+                response_json = self.__azkaban.fetch_schedule(project_flow[1], project_flow[2])
+            except FetchScheduleError as e:
+                # Azkaban answers an empty json when the flow has no schedule
+                if is_empty_response(e):
+                    return None
+                raise
+
+            schedule = response_json[u'schedule']
+            execution_options = schedule.get(u'executionOptions') or {}
+            return {
+                u'cron': u' '.join((schedule.get(u'cronExpression') or u'').split()),
+                u'concurrentOption': execution_options.get(u'concurrentOption') or DEFAULT_CONCURRENT_OPTION,
+                u'scheduleId': schedule[u'scheduleId'],
+            }
+
+        schedules = self.__map(fetch_one, project_flows)
+
+        return {
+            (project, flow): schedule for (project, _, flow), schedule in zip(project_flows, schedules)
+        }
+
+    def plan(self, entries):
+        """
+        Computes the changes needed to make the schedules of the projects in the manifest match it
+
+        :param list entries: Manifest entries, see load_manifest
+        :return: A list of dictionaries containing action (create, update or delete), project, flow, cron,
+         concurrentOption, scheduleId and previous (the current schedule, if any) as keys
+        :rtype: list
+        """
+
+        projects = sorted(set(entry[u'project'] for entry in entries))
+        current = self.fetch_schedules(projects)
+        desired = {(entry[u'project'], entry[u'flow']): entry for entry in entries}
+
+        changes = []
+        for key in sorted(set(desired) | set(key for key, schedule in current.items() if schedule)):
+            entry = desired.get(key)
+            schedule = current.get(key)
+
+            if entry is None:
+                action = DELETE
+            elif schedule is None:
+                action = CREATE
+            elif (entry[u'cron'], entry[u'concurrentOption']) != (schedule[u'cron'], schedule[u'concurrentOption']):
+                action = UPDATE
+            else:
+                continue
+
+            changes.append({
+                u'action': action,
+                u'project': key[0],
+                u'flow': key[1],
+                u'cron': entry[u'cron'] if entry else None,
+                u'concurrentOption': entry[u'concurrentOption'] if entry else None,
+                u'scheduleId': schedule[u'scheduleId'] if schedule else None,
+                u'previous': schedule,
+            })
+
+        return changes
+
+    def apply(self, changes):
+        """
+        Applies the changes of a plan concurrently. A failure in one change does not stop the others, it is reported
+        in its result instead.
+
+        :param list changes: Changes returned by plan
+        :return: The changes, in the same order, with an error key added
+        :rtype: list
+        """
+
+        def apply_one(change):
+            result = dict(change, error=None)
+
+            try:
+                if change[u'action'] == DELETE:
+                    self.__azkaban.unschedule(change[u'scheduleId'])
+                else:
+                    self.__azkaban.schedule(
+                        change[u'project'], change[u'flow'], change[u'cron'],
+                        concurrentOption=change[u'concurrentOption']
+                    )
+            except (ScheduleError, UnscheduleError) as e:
+                result[u'error'] = str(e) or e.__class__.__name__
+
+            return result
+
+        return self.__map(apply_one, changes)
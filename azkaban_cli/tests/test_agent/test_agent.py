@@ -0,0 +1,243 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+from unittest.mock import patch
+
+import responses
+
+import azkaban_cli.azkaban_cli
+from azkaban_cli.__version__ import __version__
+from azkaban_cli.agent import Agent, forward, forwardable
+from azkaban_cli.profiles import SessionStore
+
+
+class ForwardableTest(TestCase):
+    def test_forwardable(self):
+        """
+        Test if commands that run until interrupted or prompt for a password are not forwarded to the agent
+        """
+
+        self.assertTrue(forwardable(['fetch_projects']))
+        self.assertTrue(forwardable(['login', '--host', 'http://azkaban-mock.com', '--user', 'u', '--password', 'p']))
+        self.assertFalse(forwardable(['login', '--host', 'http://azkaban-mock.com']))
+        self.assertFalse(forwardable(['agent']))
+        self.assertFalse(forwardable(['watch_execution', '1234']))
+        self.assertFalse(forwardable(['fetch_execution_job_log', '-f', '1234', 'job', '0', '100']))
+
+
+class AgentTest(TestCase):
+    def setUp(self):
+        """
+        Creates an agent and a session file with a logged session, used by the commands run by the agent
+        """
+
+        cli_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cli_dir)
+
+        self.host = 'http://azkaban-mock.com'
+        self.session_path = os.path.join(cli_dir, 'user-session.json')
+        for name, value in (('SESSION_JSON_PATH', self.session_path),
+                            ('CONFIG_JSON_PATH', os.path.join(cli_dir, 'config.json'))):
+            patcher = patch.object(azkaban_cli.azkaban_cli, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        SessionStore(self.session_path).set('cluster-1', {'host': self.host, 'user': 'username', 'session_id': 'id'})
+
+        self.agent = Agent(path=os.path.join(cli_dir, 'agent.sock'), idle_timeout=0.5)
+
+        # The commands run by the agent configure the root logger when it has no handlers
+        root = logging.getLogger()
+        self.addCleanup(setattr, root, 'handlers', root.handlers)
+        self.addCleanup(root.setLevel, root.level)
+
+    @responses.activate
+    @patch.dict(os.environ, {}, clear=True)
+    def test_run_agent(self):
+        """
+        Test if the agent captures the logs of the command and keeps its Azkaban instance for the next commands
+        """
+
+        responses.add(responses.GET, self.host + '/executor', json={'execIds': [1234]}, status=200)
+
+        response = self.agent.run({'args': ['fetch_running_executions_of_a_flow', 'p', 'f'], 'cwd': os.getcwd()})
+        azkaban = self.agent.clients['cluster-1']
+        self.agent.run({'args': ['fetch_running_executions_of_a_flow', 'p', 'f'], 'cwd': os.getcwd()})
+
+        self.assertEqual(response['exit_code'], 0)
+        self.assertIn('ExecIds: [1234]', response['stderr'])
+        self.assertIs(self.agent.clients['cluster-1'], azkaban)
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    @patch.dict(os.environ, {}, clear=True)
+    def test_expired_session_agent(self):
+        """
+        Test if the agent asks the client to run the command when the session expired, instead of prompting
+        """
+
+        responses.add(responses.GET, self.host + '/executor', json={'error': 'session'}, status=200)
+
+        response = self.agent.run({'args': ['fetch_running_executions_of_a_flow', 'p', 'f'], 'cwd': os.getcwd()})
+
+        self.assertEqual(response, {'fallback': True})
+
+    @responses.activate
+    @patch.dict(os.environ, {}, clear=True)
+    def test_expired_session_after_requests_agent(self):
+        """
+        Test if the agent returns the output of a chained command whose session expired after other requests were sent,
+        instead of asking the client to run the whole command again
+        """
+
+        responses.add(responses.GET, self.host + '/executor', json={'execIds': [1234]}, status=200)
+        responses.add(responses.GET, self.host + '/executor', json={'error': 'session'}, status=200)
+
+        args = ['fetch_running_executions_of_a_flow', 'p', 'f', 'fetch_running_executions_of_a_flow', 'p', 'g']
+        response = self.agent.run({'args': args, 'cwd': os.getcwd()})
+
+        self.assertEqual(response['exit_code'], 1)
+        self.assertIn('ExecIds: [1234]', response['stderr'])
+        self.assertIn('Login needed after sending 2 requests', response['stderr'])
+        self.assertEqual(len(responses.calls), 2)
+
+    @responses.activate
+    @patch.dict(os.environ, {'AZKABAN_CLI_PROFILE': 'cluster-1'}, clear=True)
+    def test_client_env_agent(self):
+        """
+        Test if the agent runs a command with the AZKABAN_CLI_* environment variables of the client, and creates the
+        instance of the profile again when the session options change
+        """
+
+        other_host = 'http://other-azkaban.com'
+        SessionStore(self.session_path).set('cluster-2', {'host': other_host, 'user': 'username', 'session_id': 'id'})
+        responses.add(responses.GET, self.host + '/executor', json={'execIds': [1234]}, status=200)
+        responses.add(responses.GET, other_host + '/executor', json={'execIds': [5678]}, status=200)
+
+        args = ['fetch_running_executions_of_a_flow', 'p', 'f']
+        response = self.agent.run({'args': args, 'cwd': os.getcwd(), 'env': {'AZKABAN_CLI_PROFILE': 'cluster-2'}})
+        self.assertIn('ExecIds: [5678]', response['stderr'])
+        self.assertEqual(os.environ, {'AZKABAN_CLI_PROFILE': 'cluster-1'})
+
+        self.agent.run({'args': args, 'cwd': os.getcwd(), 'env': {'AZKABAN_CLI_PROFILE': 'cluster-1'}})
+        azkaban = self.agent.clients['cluster-1']
+        self.agent.run({
+            'args': args,
+            'cwd': os.getcwd(),
+            'env': {'AZKABAN_CLI_PROFILE': 'cluster-1', 'AZKABAN_CLI_READ_TIMEOUT': '5'},
+        })
+
+        self.assertIsNot(self.agent.clients['cluster-1'], azkaban)
+        self.assertEqual(self.agent.clients['cluster-1'].get_session_config()['read_timeout'], 5.0)
+        self.assertEqual([call.request.url.split('/executor')[0] for call in responses.calls], [
+            other_host, self.host, self.host,
+        ])
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_startup_env_agent(self):
+        """
+        Test if the agent asks the client to run the command when it sets environment variables read at startup
+        """
+
+        response = self.agent.run({'args': ['--version'], 'cwd': os.getcwd(), 'env': {'AZKABAN_CLI_PATH': '/tmp'}})
+
+        self.assertEqual(response, {'fallback': True})
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_usage_error_agent(self):
+        """
+        Test if the agent returns the usage errors of click with their exit code
+        """
+
+        response = self.agent.run({'args': ['no_such_command'], 'cwd': os.getcwd()})
+
+        self.assertEqual(response['exit_code'], 2)
+        self.assertIn('no_such_command', response['stderr'])
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_concurrent_run_agent(self):
+        """
+        Test if the agent refuses to run a command while another one is running, as commands swap the environment,
+        working directory and streams of the process
+        """
+
+        cwd = os.getcwd()
+
+        def nested_run(**kwargs):
+            self.agent.run({'args': ['--version'], 'cwd': cwd})
+
+        with patch.object(azkaban_cli.azkaban_cli.cli, 'main', side_effect=nested_run):
+            response = self.agent.run({'args': ['--version'], 'cwd': cwd})
+
+        self.assertEqual(response['exit_code'], 1)
+        self.assertIn('The agent runs one command at a time', response['stderr'])
+
+        response = self.agent.run({'args': ['--version'], 'cwd': cwd})
+
+        self.assertEqual(response['exit_code'], 0)
+        self.assertIn(__version__, response['stdout'])
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_serve_agent(self):
+        """
+        Test if commands are forwarded to a serving agent, which stops after the idle timeout
+        """
+
+        self.assertIsNone(forward(['--version'], self.agent.path))
+
+        thread = threading.Thread(target=self.agent.serve)
+        thread.start()
+        self.addCleanup(thread.join)
+
+        for _ in range(100):
+            if os.path.exists(self.agent.path):
+                break
+            threading.Event().wait(0.01)
+
+        response = forward(['--version'], self.agent.path)
+
+        self.assertEqual(response['exit_code'], 0)
+        self.assertIn(__version__, response['stdout'])
+
+        thread.join()
+        self.assertFalse(os.path.exists(self.agent.path))
+
+    @responses.activate
+    @patch.dict(os.environ, {}, clear=True)
+    def test_forward_profile_env_agent(self):
+        """
+        Test if the AZKABAN_CLI_PROFILE of the client is forwarded with the command and used by the agent
+        """
+
+        other_host = 'http://other-azkaban.com'
+        SessionStore(self.session_path).set('cluster-2', {'host': other_host, 'user': 'username', 'session_id': 'id'})
+        SessionStore(self.session_path).set('cluster-1', {'host': self.host, 'user': 'username', 'session_id': 'id'})
+        responses.add(responses.GET, other_host + '/executor', json={'execIds': [5678]}, status=200)
+
+        requests = []
+        run = self.agent.run
+
+        def record_run(request):
+            requests.append(request)
+            return run(request)
+
+        self.agent.run = record_run
+
+        thread = threading.Thread(target=self.agent.serve)
+        thread.start()
+        self.addCleanup(thread.join)
+
+        for _ in range(100):
+            if os.path.exists(self.agent.path):
+                break
+            threading.Event().wait(0.01)
+
+        with patch.dict(os.environ, {'AZKABAN_CLI_PROFILE': 'cluster-2'}):
+            response = forward(['fetch_running_executions_of_a_flow', 'p', 'f'], self.agent.path)
+
+        self.assertEqual(response['exit_code'], 0)
+        self.assertIn('ExecIds: [5678]', response['stderr'])
+        self.assertEqual(requests[-1]['env'], {'AZKABAN_CLI_PROFILE': 'cluster-2'})
@@ -0,0 +1,79 @@
+import logging
+from unittest import TestCase
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import azkaban_cli.api as api
+
+
+class ApiDebugLoggingTest(TestCase):
+    def setUp(self):
+        """
+        Creates a session mock whose responses record when their body is read
+        """
+
+        self.content = PropertyMock(return_value=b'{"status": "success"}' + b' ' * 10000)
+        self.text = PropertyMock(return_value=u'')
+
+        response = MagicMock(encoding='utf-8')
+        type(response).content = self.content
+        type(response).text = self.text
+
+        self.session = MagicMock()
+        self.session.request.return_value = response
+
+        self.root_level = logging.getLogger().level
+        self.addCleanup(logging.getLogger().setLevel, self.root_level)
+        self.addCleanup(api.set_debug_body_limit, api.DEBUG_BODY_LIMIT)
+
+    def test_body_not_read_without_debug(self):
+        """
+        Test if request functions do not read the response body when debug logging is disabled
+        """
+
+        logging.getLogger().setLevel(logging.INFO)
+
+        api.fetch_flows_request(self.session, 'http://azkaban-mock.com', 'session_id', 'project')
+
+        self.content.assert_not_called()
+        self.text.assert_not_called()
+
+    def test_body_truncated_with_debug(self):
+        """
+        Test if request functions log the response body truncated to the debug body limit
+        """
+
+        logging.getLogger().setLevel(logging.DEBUG)
+        api.set_debug_body_limit(21)
+
+        with self.assertLogs(level=logging.DEBUG) as logs:
+            api.fetch_flows_request(self.session, 'http://azkaban-mock.com', 'session_id', 'project')
+
+        self.assertEqual(logs.output, ['DEBUG:root:Response (first 21 of 10021 bytes): \n{"status": "success"}'])
+        self.text.assert_not_called()
+
+    def test_streamed_body_not_read_with_debug(self):
+        """
+        Test if request functions do not read the body of streamed responses even when debug logging is enabled
+        """
+
+        logging.getLogger().setLevel(logging.DEBUG)
+
+        api.fetch_projects_request(self.session, 'http://azkaban-mock.com', 'session_id', stream=True)
+
+        self.content.assert_not_called()
+
+    def test_invalid_debug_body_limit(self):
+        """
+        Test if a malformed AZKABAN_CLI_DEBUG_BODY_LIMIT falls back to the default limit with a warning
+        """
+
+        read_debug_body_limit = getattr(api, '__read_debug_body_limit')
+
+        with patch.dict('os.environ', {'AZKABAN_CLI_DEBUG_BODY_LIMIT': '4k'}):
+            with self.assertLogs(level=logging.WARNING) as logs:
+                self.assertEqual(read_debug_body_limit(), api.DEFAULT_DEBUG_BODY_LIMIT)
+
+        self.assertEqual(logs.output, ["WARNING:root:Invalid AZKABAN_CLI_DEBUG_BODY_LIMIT '4k', using 4096"])
+
+        with patch.dict('os.environ', {'AZKABAN_CLI_DEBUG_BODY_LIMIT': '100'}):
+            self.assertEqual(read_debug_body_limit(), 100)
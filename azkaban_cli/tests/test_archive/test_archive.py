@@ -0,0 +1,62 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from azkaban_cli.archive import iter_zip, make_archive
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        """
+        Creates a project directory with a nested directory for all archive tests
+        """
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+        self.path = os.path.join(self.root, 'project')
+        os.makedirs(os.path.join(self.path, 'scripts'))
+        with open(os.path.join(self.path, 'basic.flow'), 'w') as f:
+            f.write('nodes: []\n')
+        with open(os.path.join(self.path, 'scripts', 'run.sh'), 'w') as f:
+            f.write('echo run\n')
+
+    def test_make_archive(self):
+        """
+        Test if make archive creates the same zip as shutil.make_archive, without changing the working directory
+        """
+
+        expected = shutil.make_archive(os.path.join(self.root, 'expected'), 'zip', self.path)
+
+        with patch('os.chdir') as mock_chdir:
+            zip_path = make_archive(os.path.join(self.root, 'project'), 'zip', self.path)
+
+        mock_chdir.assert_not_called()
+        self.assertEqual(zip_path, os.path.join(self.root, 'project.zip'))
+        with zipfile.ZipFile(zip_path) as zip_file, zipfile.ZipFile(expected) as expected_file:
+            self.assertEqual(sorted(zip_file.namelist()), sorted(expected_file.namelist()))
+            self.assertEqual(zip_file.read('scripts/run.sh'), b'echo run\n')
+
+    def test_iter_zip(self):
+        """
+        Test if iter zip generates the same entries as make archive
+        """
+
+        zip_path = make_archive(os.path.join(self.root, 'project'), 'zip', self.path)
+
+        streamed = io.BytesIO(b''.join(iter_zip(self.path)))
+
+        with zipfile.ZipFile(streamed) as zip_file, zipfile.ZipFile(zip_path) as expected:
+            self.assertEqual(zip_file.namelist(), expected.namelist())
+
+    def test_error_missing_directory_make_archive(self):
+        """
+        Test if make archive raises FileNotFoundError when the directory does not exist
+        """
+
+        with self.assertRaises(FileNotFoundError):
+            make_archive(os.path.join(self.root, 'missing'), 'zip', os.path.join(self.root, 'missing'))
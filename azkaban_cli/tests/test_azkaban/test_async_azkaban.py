@@ -0,0 +1,161 @@
+import asyncio
+from unittest import TestCase
+from unittest.mock import patch, ANY
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.async_azkaban import AsyncAzkaban
+from azkaban_cli.exceptions import NotLoggedOnError, FetchFlowExecutionError, SessionError
+
+
+class AsyncAzkabanTest(TestCase):
+    def setUp(self):
+        """
+        Creates an AsyncAzkaban instance and set a logged session for all async tests
+        """
+
+        self.azk = AsyncAzkaban(azkaban_cli.azkaban.Azkaban())
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+    def tearDown(self):
+        self.azk.close()
+
+    def run_coroutine(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    @responses.activate
+    def test_fetch_flow_execution(self):
+        """
+        Test if fetch flow execution coroutine returns the json response as the blocking method does
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'execid': '1', 'status': 'RUNNING'}, status=200)
+
+        response_json = self.run_coroutine(self.azk.fetch_flow_execution('1'))
+
+        self.assertEqual(response_json, {'execid': '1', 'status': 'RUNNING'})
+
+    @responses.activate
+    def test_many_requests_in_flight(self):
+        """
+        Test if many coroutines can be gathered in the same event loop
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'status': 'RUNNING'}, status=200)
+
+        async def fetch_all():
+            return await asyncio.gather(*[self.azk.fetch_flow_execution(str(i)) for i in range(20)])
+
+        results = self.run_coroutine(fetch_all())
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(len(responses.calls), 20)
+
+    def test_max_workers_pool_maxsize(self):
+        """
+        Test if the thread pool is sized from the connection pool of the session when max_workers is not passed
+        """
+
+        sized = AsyncAzkaban(azkaban_cli.azkaban.Azkaban(pool_maxsize=64))
+        self.addCleanup(sized.close)
+        explicit = AsyncAzkaban(azkaban_cli.azkaban.Azkaban(), max_workers=4)
+        self.addCleanup(explicit.close)
+
+        self.assertEqual(sized.max_workers, 64)
+        self.assertEqual(explicit.max_workers, 4)
+
+    @patch('azkaban_cli.azkaban.api.fetch_flow_execution_request')
+    def test_fetch_flow_execution_request_called(self, mock_fetch_flow_execution_request):
+        """
+        Test if fetch flow execution coroutine is calling fetch flow execution request with expected arguments
+        """
+
+        self.run_coroutine(self.azk.fetch_flow_execution('1'))
+
+        mock_fetch_flow_execution_request.assert_called_with(ANY, self.host, self.session_id, '1')
+
+    def test_error_not_logged(self):
+        """
+        Test if coroutines raise NotLoggedOnError as the blocking methods do
+        """
+
+        self.azk.logout()
+
+        with self.assertRaises(NotLoggedOnError):
+            self.run_coroutine(self.azk.fetch_flow_execution('1'))
+
+    @responses.activate
+    def test_error_response(self):
+        """
+        Test if coroutines raise the same errors as the blocking methods when Azkaban returns an error
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'error': "Cannot find execution '0'"}, status=200)
+
+        with self.assertRaises(FetchFlowExecutionError):
+            self.run_coroutine(self.azk.fetch_flow_execution('0'))
+
+    @responses.activate
+    def test_error_session_expired(self):
+        """
+        Test if coroutines raise SessionError if request returns error caused by session expired
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={"error": "session"}, status=200)
+
+        with self.assertRaises(SessionError):
+            self.run_coroutine(self.azk.fetch_flow_execution('1'))
+
+    @responses.activate
+    def test_watch_execution(self):
+        """
+        Test if watch execution is an async iterator yielding the transitions of the blocking generator
+        """
+
+        responses.add(
+            responses.GET, self.host + "/executor",
+            json={'status': 'SUCCEEDED', 'updateTime': 20, 'nodes': [{'id': 'job-1', 'status': 'SUCCEEDED'}]},
+            status=200
+        )
+
+        async def watch():
+            events = []
+            async for event in self.azk.watch_execution('1', interval=0):
+                events.append((event['job'] or '', event['event']))
+            return events
+
+        self.assertEqual(sorted(self.run_coroutine(watch())), [('', 'succeeded'), ('job-1', 'succeeded')])
+
+    @responses.activate
+    def test_error_async_iterator(self):
+        """
+        Test if async iterators raise the same errors as the blocking generators
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={"error": "session"}, status=200)
+
+        async def watch():
+            async for event in self.azk.watch_execution('1'):
+                pass
+
+        with self.assertRaises(SessionError):
+            self.run_coroutine(watch())
+
+    def test_every_method(self):
+        """
+        Test if every public method of the Azkaban class has an equivalent in the AsyncAzkaban class
+        """
+
+        methods = [name for name in dir(azkaban_cli.azkaban.Azkaban) if not name.startswith('_')]
+
+        self.assertEqual([name for name in methods if not hasattr(AsyncAzkaban, name)], [])
@@ -0,0 +1,125 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from urllib.parse import urlparse, parse_qs
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import FetchFlowExecutionError, NotLoggedOnError
+
+
+class AzkabanDownloadExecutionLogsTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance, a logged session and an output directory for all download logs tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.exec_id = '1234'
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+        self.logs = {
+            'job-1': 'job 1 says hello\n' * 10,
+            'embedded:job-2': 'job 2 says hello\n' * 3,
+        }
+
+    def add_executor_callback(self):
+        def callback(request):
+            params = parse_qs(urlparse(request.url).query)
+            if params['ajax'] == ['fetchexecflow']:
+                body = {
+                    'execid': self.exec_id,
+                    'nodes': [
+                        {'id': 'job-1', 'status': 'SUCCEEDED'},
+                        {'id': 'embedded', 'nodes': [{'id': 'job-2', 'nestedId': 'embedded:job-2', 'status': 'FAILED'}]},
+                        {'id': 'job-3', 'status': 'READY'},
+                    ]
+                }
+            else:
+                # Azkaban counts the offset and length of the log in bytes
+                log = self.logs[params['jobId'][0]]
+                offset = int(params['offset'][0])
+                start = len(log.encode('utf-8')[:offset].decode('utf-8'))
+                data = log[start:start + int(params['length'][0])]
+                body = {'data': data, 'offset': offset, 'length': len(data.encode('utf-8'))}
+            return (200, {}, json.dumps(body))
+
+        responses.add_callback(responses.GET, self.host + "/executor", callback=callback)
+
+    @responses.activate
+    def test_download_execution_logs(self):
+        """
+        Test if download execution logs method from Azkaban class writes the full log of every job that started
+        """
+
+        self.add_executor_callback()
+
+        results = self.azk.download_execution_logs(self.exec_id, self.directory, chunk_size=40)
+
+        self.assertEqual(sorted(result['job'] for result in results), ['embedded:job-2', 'job-1'])
+        for jobid, log in self.logs.items():
+            with open(os.path.join(self.directory, jobid + '.log')) as f:
+                self.assertEqual(f.read(), log)
+
+    @responses.activate
+    def test_download_execution_logs_compressed(self):
+        """
+        Test if download execution logs method from Azkaban class writes gzip compressed logs
+        """
+
+        self.add_executor_callback()
+
+        self.azk.download_execution_logs(self.exec_id, self.directory, compress=True)
+
+        with gzip.open(os.path.join(self.directory, 'job-1.log.gz'), 'rt') as f:
+            self.assertEqual(f.read(), self.logs['job-1'])
+
+    @responses.activate
+    def test_download_execution_logs_size(self):
+        """
+        Test if the size returned by download execution logs method from Azkaban class is the number of characters
+        written, for compressed and non ASCII logs as well
+        """
+
+        self.logs['job-1'] = u'ação concluída\n' * 10
+        self.add_executor_callback()
+
+        for compress in (False, True):
+            results = self.azk.download_execution_logs(self.exec_id, self.directory, chunk_size=40, compress=compress)
+
+            self.assertEqual({result['job']: result['size'] for result in results},
+                             {jobid: len(log) for jobid, log in self.logs.items()})
+
+    @responses.activate
+    def test_error_execution_cannot_be_found_download_execution_logs(self):
+        """
+        Test if download execution logs method from Azkaban class raises FetchFlowExecutionError if the execution
+        is not found
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'error': "Cannot find execution '0'"}, status=200)
+
+        with self.assertRaises(FetchFlowExecutionError):
+            self.azk.download_execution_logs(self.exec_id, self.directory)
+
+    def test_error_not_logged_download_execution_logs(self):
+        """
+        Test if download execution logs method from Azkaban class raises NotLoggedOnError if there is no logged session
+        """
+
+        self.azk.logout()
+
+        with self.assertRaises(NotLoggedOnError):
+            self.azk.download_execution_logs(self.exec_id, self.directory)
@@ -109,4 +109,49 @@ class AzkabanFetchFlowExecutionTest(TestCase):
         responses.add(responses.GET, self.host + "/executor", json={"error": "session"}, status=200)
 
         with self.assertRaises(SessionError):
-            self.azk.fetch_flow_execution(self.exec_id)
\ No newline at end of file
+            self.azk.fetch_flow_execution(self.exec_id)
+
+    @responses.activate
+    def test_login_page_fetch_flow_execution(self):
+        """
+        Test if fetch flow execution method from Azkaban class raises SessionError if request
+        returns the login page
+        """
+
+        login_page = (
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+            '  <script type="text/javascript" src="/js/azkaban/view/login.js"></script>\n'
+            '</head>\n<body></body>\n</html>\n'
+        )
+        responses.add(responses.GET, self.host + "/executor", body=login_page, status=200)
+
+        with self.assertRaises(SessionError):
+            self.azk.fetch_flow_execution(self.exec_id)
+
+    @responses.activate
+    def test_login_script_in_json_fetch_flow_execution(self):
+        """
+        Test if fetch flow execution method from Azkaban class does not mistake a json response
+        mentioning the login page script for the login page
+        """
+
+        script = '<script type="text/javascript" src="/js/azkaban/view/login.js"></script>'
+        responses.add(responses.GET, self.host + "/executor", json={'id': 'test_id', 'log': script}, status=200)
+
+        response_json = self.azk.fetch_flow_execution(self.exec_id)
+
+        self.assertEqual(response_json, {'id': 'test_id', 'log': script})
+
+    @responses.activate
+    def test_fetch_flow_execution_without_orjson(self):
+        """
+        Test if fetch flow execution method from Azkaban class parses the response when orjson is
+        not installed
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'id': 'test_id'}, status=200)
+
+        with patch('azkaban_cli.azkaban.orjson', None):
+            response_json = self.azk.fetch_flow_execution(self.exec_id)
+
+        self.assertEqual(response_json, {'id': 'test_id'})
@@ -0,0 +1,94 @@
+from unittest import TestCase
+from unittest.mock import patch, ANY
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import FetchGroupPermissionsError, NotLoggedOnError, SessionError
+
+
+class AzkabanFetchGroupPermissionsTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance and set a logged session for all fetch group permissions tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.project = 'ProjectTest'
+
+    @responses.activate
+    def test_fetch_group_permissions(self):
+        """
+        Test fetch group permissions method from Azkaban class
+        """
+
+        responses.add(
+            responses.GET,
+            self.host + "/manager",
+            json={
+                'permissions': [
+                    {'username': 'team', 'permission': ['READ', 'EXECUTE']},
+                    {'username': 'admins', 'permission': ['ADMIN']},
+                ]
+            },
+            status=200
+        )
+
+        group_permissions = self.azk.fetch_group_permissions(self.project)
+
+        self.assertEqual(group_permissions, {
+            'team': {'admin': False, 'read': True, 'write': False, 'execute': True, 'schedule': False},
+            'admins': {'admin': True, 'read': True, 'write': True, 'execute': True, 'schedule': True},
+        })
+
+    @patch('azkaban_cli.azkaban.api.fetch_group_permissions_request')
+    def test_fetch_group_permissions_request_called(self, mock_fetch_group_permissions_request):
+        """
+        Test if fetch group permissions method from Azkaban class is calling fetch group permissions request with
+        expected arguments
+        """
+
+        self.azk.fetch_group_permissions(self.project)
+
+        mock_fetch_group_permissions_request.assert_called_with(ANY, self.host, self.session_id, self.project)
+
+    def test_error_not_logged_fetch_group_permissions(self):
+        """
+        Test if fetch group permissions method from Azkaban class raises NotLoggedOnError if there is no session
+        """
+
+        self.azk.logout()
+
+        with self.assertRaises(NotLoggedOnError):
+            self.azk.fetch_group_permissions(self.project)
+
+    @responses.activate
+    def test_error_project_doesnt_exist_fetch_group_permissions(self):
+        """
+        Test if fetch group permissions method from Azkaban class raises FetchGroupPermissionsError if the project
+        does not exist
+        """
+
+        responses.add(responses.GET, self.host + "/manager", json={'error': "Project 'x' doesn't exist."}, status=200)
+
+        with self.assertRaises(FetchGroupPermissionsError):
+            self.azk.fetch_group_permissions(self.project)
+
+    @responses.activate
+    def test_error_session_expired_fetch_group_permissions(self):
+        """
+        Test if fetch group permissions method from Azkaban class raises SessionError if request returns error caused
+        by session expired
+        """
+
+        responses.add(responses.GET, self.host + "/manager", json={"error": "session"}, status=200)
+
+        with self.assertRaises(SessionError):
+            self.azk.fetch_group_permissions(self.project)
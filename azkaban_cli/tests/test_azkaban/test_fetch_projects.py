@@ -6,6 +6,30 @@ import responses
 
 import azkaban_cli.azkaban
 from azkaban_cli.exceptions import SessionError
+from azkaban_cli.projects import ProjectInfoParser
+
+INDEX_PAGE = u"""<html>
+<head><script type="text/javascript" src="/js/azkaban/view/main.js"></script></head>
+<body>
+<ul id="project-list">
+%s
+</ul>
+</body>
+</html>
+"""
+
+PROJECT_INFO = u"""  <li>
+    <div class="project-expander" id="%(name)s">
+      <div class="project-info">
+        <h4><a href="/manager?project=%(name)s">%(name)s</a></h4>
+        <p class="project-description">%(description)s</p>
+        <p class="project-last-modified">Last modified on
+          <strong>2019-08-06 10:00:00</strong> by
+          <strong>%(user)s</strong>.</p>
+      </div>
+    </div>
+  </li>
+"""
 
 
 class AzkabanFetchProjectsTest(TestCase):
@@ -44,7 +68,7 @@ class AzkabanFetchProjectsTest(TestCase):
 
         self.azk.fetch_projects()
 
-        mock_fetch_projects_request.assert_called_with(ANY, self.host, self.session_id)
+        mock_fetch_projects_request.assert_called_with(ANY, self.host, self.session_id, stream=True)
 
     @responses.activate
     def test_error_session_expired_fetch_projects(self):
@@ -56,5 +80,54 @@ class AzkabanFetchProjectsTest(TestCase):
         with open(fixture_path) as f:
             responses.add(responses.GET, self.host + "/index", body=f.read(), status=200)
 
-        with self.assertRaises(SessionError):
+        with self.assertRaises(SessionError) as context:
             self.azk.fetch_projects()
+
+        self.assertEqual(str(context.exception), 'Session expired')
+
+    @responses.activate
+    def test_iter_projects(self):
+        """
+        Test if iter projects method from Azkaban class extracts name, user and description of every project
+        """
+
+        projects = [
+            {'name': 'project-%d' % i, 'user': 'user-%d' % (i % 2), 'description': 'Description %d' % i}
+            for i in range(3)
+        ]
+        body = INDEX_PAGE % (u''.join(PROJECT_INFO % project for project in projects))
+        responses.add(responses.GET, self.host + "/index", body=body, status=200)
+
+        self.assertEqual(list(self.azk.iter_projects()), projects)
+        self.assertEqual(self.azk.fetch_projects(), projects)
+
+    def test_parser_chunks(self):
+        """
+        Test if the project info parser extracts the same projects whatever the size of the chunks fed
+        """
+
+        projects = [{'name': 'project-%d' % i, 'user': 'user', 'description': ''} for i in range(50)]
+        body = INDEX_PAGE % (u''.join(PROJECT_INFO % project for project in projects))
+
+        parser = ProjectInfoParser()
+        parsed = []
+        for i in range(0, len(body), 7):
+            parser.feed(body[i:i + 7])
+            parsed.extend(parser.drain())
+        parser.close()
+
+        self.assertEqual(parsed, projects)
+        self.assertFalse(parser.login_page)
+
+    @responses.activate
+    def test_error_login_text_fetch_projects(self):
+        """
+        Test if fetch projects method from Azkaban class raises SessionError if request returns the login error text
+        """
+
+        responses.add(responses.GET, self.host + "/index", body="Login error. Need username and password", status=200)
+
+        with self.assertRaises(SessionError) as context:
+            self.azk.fetch_projects()
+
+        self.assertEqual(str(context.exception), 'Login error. Need username and password')
@@ -85,6 +85,24 @@ class AzkabanFetchScheduleTest(TestCase):
         with self.assertRaises(FetchScheduleError):
             self.azk.fetch_schedule(self.project_id, self.flow)
 
+    @responses.activate
+    def test_empty_response_fetch_schedule(self):
+        """
+        Test if fetch schedule method from Azkaban class marks the FetchScheduleError raised for an empty response, so
+        a flow without a schedule can be told apart from other errors
+        """
+
+        responses.add(responses.GET, self.host + "/schedule", json={}, status=200)
+        responses.add(responses.GET, self.host + "/schedule", json={"error": "Empty response"}, status=200)
+
+        with self.assertRaises(FetchScheduleError) as context:
+            self.azk.fetch_schedule(self.project_id, self.flow)
+        self.assertTrue(azkaban_cli.azkaban.is_empty_response(context.exception))
+
+        with self.assertRaises(FetchScheduleError) as context:
+            self.azk.fetch_schedule(self.project_id, self.flow)
+        self.assertFalse(azkaban_cli.azkaban.is_empty_response(context.exception))
+
     @responses.activate
     def test_error_session_expired_fetch_schedule(self):
         """
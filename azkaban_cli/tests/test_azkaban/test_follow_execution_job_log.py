@@ -0,0 +1,88 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import FetchExecutionJobsLogError
+
+
+class AzkabanFollowExecutionJobLogTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance and set a logged session for all follow job log tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.exec_id = '1234'
+        self.jobid = 'test-job-1'
+
+    def add_executor_callback(self, log_chunks, statuses):
+        """
+        Answers fetchExecJobLogs with the log chunks and fetchexecflowupdate with the job statuses, in order
+        """
+
+        self.log_requests = []
+
+        def callback(request):
+            params = parse_qs(urlparse(request.url).query)
+            if params['ajax'] == ['fetchExecJobLogs']:
+                self.log_requests.append(params)
+                offset = int(params['offset'][0])
+                data = log_chunks.pop(0) if log_chunks else ''
+                body = {'data': data, 'offset': offset, 'length': len(data)}
+            else:
+                body = {'status': 'RUNNING', 'nodes': [{'id': self.jobid, 'status': statuses.pop(0)}]}
+            return (200, {}, json.dumps(body))
+
+        responses.add_callback(responses.GET, self.host + "/executor", callback=callback)
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    def test_follow_execution_job_log(self, mock_sleep):
+        """
+        Test if follow execution job log method from Azkaban class yields the log chunks advancing the offset
+        """
+
+        self.add_executor_callback(['line 1\n', 'line 2\n', '', 'line 3\n'], ['RUNNING', 'SUCCEEDED'])
+
+        chunks = list(self.azk.follow_execution_job_log(self.exec_id, self.jobid, 0, 100))
+
+        self.assertEqual(chunks, ['line 1\n', 'line 2\n', 'line 3\n'])
+        self.assertEqual([r['offset'] for r in self.log_requests], [['0'], ['7'], ['14'], ['14'], ['21'], ['21']])
+        mock_sleep.assert_called_once_with(1.0)
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    def test_follow_backoff(self, mock_sleep):
+        """
+        Test if follow execution job log method from Azkaban class doubles the wait while no data arrives
+        """
+
+        self.add_executor_callback([], ['RUNNING', 'RUNNING', 'RUNNING', 'FAILED'])
+
+        chunks = list(self.azk.follow_execution_job_log(self.exec_id, self.jobid, min_interval=1, max_interval=3))
+
+        self.assertEqual(chunks, [])
+        self.assertEqual([call[0][0] for call in mock_sleep.call_args_list], [1, 2, 3])
+
+    @responses.activate
+    def test_error_follow_execution_job_log(self):
+        """
+        Test if follow execution job log method from Azkaban class raises FetchExecutionJobsLogError if request
+        returns error
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'error': 'Job not found'}, status=200)
+
+        with self.assertRaises(FetchExecutionJobsLogError):
+            list(self.azk.follow_execution_job_log(self.exec_id, self.jobid))
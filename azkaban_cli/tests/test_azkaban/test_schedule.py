@@ -1,10 +1,13 @@
 import os
+import shutil
+import tempfile
 from unittest import TestCase
 from unittest.mock import patch, ANY
 
 import responses
 
 import azkaban_cli.azkaban
+from azkaban_cli.cache import MetadataCache
 from azkaban_cli.exceptions import ScheduleError, SessionError
 
 
@@ -122,4 +125,29 @@ class AzkabanScheduleTest(TestCase):
             responses.add(responses.POST, self.host + "/schedule", body=f.read(), status=200)
 
         with self.assertRaises(SessionError):
-            self.azk.schedule(self.project, self.flow, self.cron)
\ No newline at end of file
+            self.azk.schedule(self.project, self.flow, self.cron)
+
+    @responses.activate
+    def test_cached_project_schedule(self):
+        """
+        Test if schedule method from Azkaban class drops the replaced schedule id from the metadata cache, without
+        caching the new one under a project id that may be stale
+        """
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = MetadataCache(os.path.join(cache_dir, 'metadata-cache.json'))
+        cache.set_project_id(self.host, self.project, 122)
+        cache.set_schedule_id(self.host, 122, self.flow, 40)
+
+        responses.add(
+            responses.POST,
+            self.host + "/schedule",
+            json={'message': 'ProjectTest.FlowTest scheduled.', 'scheduleId': 41, 'status': 'success'},
+            status=200
+        )
+
+        self.azk.schedule(self.project, self.flow, self.cron, cache=cache)
+
+        self.assertIsNone(cache.get_schedule_id(self.host, 122, self.flow))
+        self.assertEqual(cache.get_project_id(self.host, self.project), 122)
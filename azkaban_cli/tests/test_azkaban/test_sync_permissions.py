@@ -0,0 +1,117 @@
+import json
+from unittest import TestCase
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import FetchGroupPermissionsError
+
+
+class AzkabanSyncPermissionsTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance, set a logged session and a fake server state for all sync permissions tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.azk.set_logged_session(self.host, 'username', 'aebe406b-d5e6-4056-add6-bf41091e42c6')
+
+        # project -> getGroupPermissions response
+        self.server = {
+            'project_a': [{'username': 'team', 'permission': ['READ']}, {'username': 'old_team', 'permission': ['READ']}],
+            'project_b': [{'username': 'team', 'permission': ['READ', 'EXECUTE']}],
+        }
+
+    def add_server_callback(self, write_response='{}'):
+        def callback(request):
+            params = dict(param.split('=', 1) for param in request.url.split('?', 1)[1].split('&'))
+            if params['ajax'] == 'getGroupPermissions':
+                if params['project'] not in self.server:
+                    return (200, {}, json.dumps({'error': 'Project not found'}))
+                return (200, {}, json.dumps({'permissions': self.server[params['project']]}))
+            return (200, {}, write_response)
+
+        responses.add_callback(responses.GET, self.host + "/manager", callback=callback)
+
+    def write_calls(self):
+        return sorted(
+            call.request.url.split('ajax=')[1].split('&')[0] + ' ' + call.request.url.split('project=')[1].split('&')[0]
+            for call in responses.calls if 'getGroupPermissions' not in call.request.url
+        )
+
+    @responses.activate
+    def test_sync_permissions(self):
+        """
+        Test if sync permissions method from Azkaban class only adds, changes and removes the groups that differ
+        """
+
+        self.add_server_callback()
+
+        changes = self.azk.sync_permissions({
+            'project_a': {'team': {'read': True}, 'old_team': None, 'new_team': {'read': True, 'write': True}},
+            'project_b': {'team': {'execute': True}, 'new_team': None},
+        })
+
+        self.assertEqual([(change['project'], change['group'], change['action']) for change in changes], [
+            ('project_a', 'new_team', 'add'),
+            ('project_a', 'old_team', 'remove'),
+        ])
+        self.assertTrue(all(change['error'] is None for change in changes))
+        self.assertEqual(self.write_calls(), ['addPermission project_a', 'changePermission project_a'])
+
+    @responses.activate
+    def test_change_sync_permissions(self):
+        """
+        Test if sync permissions method from Azkaban class changes the permissions of a group normalized as in
+        add_permission
+        """
+
+        self.add_server_callback()
+
+        changes = self.azk.sync_permissions({'project_b': {'team': {'admin': True}}})
+
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]['action'], 'change')
+        self.assertEqual(changes[0]['permissions'], {
+            'admin': True, 'read': True, 'write': True, 'execute': True, 'schedule': True
+        })
+        self.assertEqual(self.write_calls(), ['changePermission project_b'])
+
+    @responses.activate
+    def test_dry_run_sync_permissions(self):
+        """
+        Test if sync permissions method from Azkaban class does not change anything in dry run mode
+        """
+
+        self.add_server_callback()
+
+        changes = self.azk.sync_permissions({'project_a': {'new_team': {'read': True}}}, dry_run=True)
+
+        self.assertEqual([change['action'] for change in changes], ['add'])
+        self.assertEqual(self.write_calls(), [])
+
+    @responses.activate
+    def test_error_sync_permissions(self):
+        """
+        Test if sync permissions method from Azkaban class reports the changes that failed
+        """
+
+        self.add_server_callback('{"error": "Group does not exist"}')
+
+        changes = self.azk.sync_permissions({'project_a': {'new_team': {'read': True}}})
+
+        self.assertEqual(changes[0]['error'], 'Group does not exist')
+
+    @responses.activate
+    def test_error_project_doesnt_exist_sync_permissions(self):
+        """
+        Test if sync permissions method from Azkaban class raises FetchGroupPermissionsError if a project does not
+        exist
+        """
+
+        self.add_server_callback()
+
+        with self.assertRaises(FetchGroupPermissionsError):
+            self.azk.sync_permissions({'missing': {'team': {'read': True}}})
@@ -0,0 +1,194 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.cache import MetadataCache
+from azkaban_cli.exceptions import FetchScheduleError, SessionError
+
+
+class AzkabanUnscheduleFlowTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance and set a logged session for all unschedule flow tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.project = 'ProjectTest'
+        self.flow = 'FlowTest'
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.cache_path = os.path.join(cache_dir, 'metadata-cache.json')
+
+    def add_lookup_responses(self, project_id=123, schedule_id=456):
+        responses.add(
+            responses.GET, self.host + "/manager", json={'projectId': project_id, 'flows': [{'flowId': self.flow}]},
+            status=200
+        )
+        responses.add(
+            responses.GET, self.host + "/schedule", json={'schedule': {'scheduleId': schedule_id}}, status=200
+        )
+
+    def add_unschedule_response(self):
+        responses.add(
+            responses.POST, self.host + "/schedule", json={'message': 'flow removed', 'status': 'success'}, status=200
+        )
+
+    def request_methods(self):
+        return [(call.request.method, call.request.url.split('?')[0]) for call in responses.calls]
+
+    @responses.activate
+    def test_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class looks up the project and schedule ids before unscheduling
+        """
+
+        self.add_lookup_responses()
+        self.add_unschedule_response()
+
+        self.azk.unschedule_flow(self.project, self.flow)
+
+        self.assertEqual(self.request_methods(), [
+            ('GET', self.host + '/manager'),
+            ('GET', self.host + '/schedule'),
+            ('POST', self.host + '/schedule'),
+        ])
+        self.assertIn('scheduleId=456', responses.calls[2].request.body)
+
+    @responses.activate
+    def test_cached_ids_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class makes a single request when the ids are cached
+        """
+
+        cache = MetadataCache(self.cache_path)
+        cache.set_project_id(self.host, self.project, 123)
+        cache.set_schedule_id(self.host, 123, self.flow, 456)
+        self.add_unschedule_response()
+
+        self.azk.unschedule_flow(self.project, self.flow, cache=cache)
+
+        self.assertEqual(self.request_methods(), [('POST', self.host + '/schedule')])
+        self.assertIsNone(MetadataCache(self.cache_path).get_schedule_id(self.host, 123, self.flow))
+        self.assertEqual(MetadataCache(self.cache_path).get_project_id(self.host, self.project), 123)
+
+    @responses.activate
+    def test_stale_ids_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class looks up the ids again when the cached ones are stale
+        """
+
+        cache = MetadataCache(self.cache_path)
+        cache.set_project_id(self.host, self.project, 122)
+        cache.set_schedule_id(self.host, 122, self.flow, 455)
+        responses.add(
+            responses.POST, self.host + "/schedule", json={'message': 'Schedule not found', 'status': 'error'},
+            status=200
+        )
+        self.add_unschedule_response()
+        self.add_lookup_responses()
+
+        self.azk.unschedule_flow(self.project, self.flow, cache=cache)
+
+        self.assertEqual(len(responses.calls), 4)
+        self.assertIn('scheduleId=456', responses.calls[3].request.body)
+        self.assertEqual(cache.get_project_id(self.host, self.project), 123)
+        self.assertIsNone(cache.get_schedule_id(self.host, 122, self.flow))
+
+    @responses.activate
+    def test_recreated_project_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class looks up the project id again when the cached one belongs to
+        a project that was deleted and created again
+        """
+
+        cache = MetadataCache(self.cache_path)
+        cache.set_project_id(self.host, self.project, 122)
+        responses.add(responses.GET, self.host + "/schedule", json={}, status=200)
+        self.add_lookup_responses()
+        self.add_unschedule_response()
+
+        self.assertEqual(self.azk.unschedule_flow(self.project, self.flow, cache=cache), 456)
+
+        self.assertEqual(self.request_methods(), [
+            ('GET', self.host + '/schedule'),
+            ('GET', self.host + '/manager'),
+            ('GET', self.host + '/schedule'),
+            ('POST', self.host + '/schedule'),
+        ])
+        self.assertIn('projectId=122', responses.calls[0].request.url)
+        self.assertIn('projectId=123', responses.calls[2].request.url)
+        self.assertEqual(cache.get_project_id(self.host, self.project), 123)
+
+    @responses.activate
+    def test_cached_project_not_scheduled_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class raises FetchScheduleError without fetching the schedule again
+        when the cached project id is still valid
+        """
+
+        cache = MetadataCache(self.cache_path)
+        cache.set_project_id(self.host, self.project, 123)
+        responses.add(responses.GET, self.host + "/schedule", json={}, status=200)
+        responses.add(responses.GET, self.host + "/manager", json={'projectId': 123, 'flows': []}, status=200)
+
+        with self.assertRaises(FetchScheduleError):
+            self.azk.unschedule_flow(self.project, self.flow, cache=cache)
+
+        self.assertEqual(self.request_methods(), [('GET', self.host + '/schedule'), ('GET', self.host + '/manager')])
+
+    @responses.activate
+    def test_expired_ids_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class ignores cached ids older than the cache ttl
+        """
+
+        cache = MetadataCache(self.cache_path, ttl=-1)
+        cache.set_project_id(self.host, self.project, 123)
+        cache.set_schedule_id(self.host, 123, self.flow, 456)
+        self.add_lookup_responses()
+        self.add_unschedule_response()
+
+        self.azk.unschedule_flow(self.project, self.flow, cache=cache)
+
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_not_scheduled_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class raises FetchScheduleError when the flow is not scheduled
+        """
+
+        responses.add(responses.GET, self.host + "/manager", json={'projectId': 123, 'flows': []}, status=200)
+        responses.add(responses.GET, self.host + "/schedule", json={}, status=200)
+
+        with self.assertRaises(FetchScheduleError):
+            self.azk.unschedule_flow(self.project, self.flow, cache=MetadataCache(self.cache_path))
+
+    @responses.activate
+    def test_error_session_expired_unschedule_flow(self):
+        """
+        Test if unschedule flow method from Azkaban class drops the cached ids of the host on SessionError
+        """
+
+        cache = MetadataCache(self.cache_path)
+        cache.set_project_id(self.host, self.project, 123)
+        cache.set_project_id('http://other-azkaban.com', self.project, 7)
+        responses.add(responses.GET, self.host + "/schedule", json={'error': 'session'}, status=200)
+
+        with self.assertRaises(SessionError):
+            self.azk.unschedule_flow(self.project, self.flow, cache=cache)
+
+        self.assertIsNone(cache.get_project_id(self.host, self.project))
+        self.assertEqual(cache.get_project_id('http://other-azkaban.com', self.project), 7)
@@ -0,0 +1,164 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.cache import MetadataCache
+from azkaban_cli.exceptions import SessionError
+
+
+class AzkabanUnscheduleFlowsTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance and set a logged session for all unschedule flows tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.project = 'ProjectTest'
+        self.project_id = 123
+
+        # flow name -> fetchSchedule response
+        self.schedules = {
+            'scheduled_flow': {'schedule': {'scheduleId': 1}},
+            'other_scheduled_flow': {'schedule': {'scheduleId': 2}},
+            'not_scheduled_flow': {},
+        }
+
+    def add_schedule_callbacks(self, unschedule_response='{"message": "removed", "status": "success"}'):
+        def fetch_schedule(request):
+            flow = request.url.split('flowId=')[1].split('&')[0]
+            return (200, {}, json.dumps(self.schedules[flow]))
+
+        responses.add_callback(responses.GET, self.host + "/schedule", callback=fetch_schedule)
+        responses.add_callback(
+            responses.POST, self.host + "/schedule", callback=lambda request: (200, {}, unschedule_response)
+        )
+
+    def unscheduled_ids(self):
+        return sorted(
+            call.request.body.split('scheduleId=')[1].split('&')[0]
+            for call in responses.calls if call.request.method == 'POST'
+        )
+
+    @responses.activate
+    def test_unschedule_flows(self):
+        """
+        Test if unschedule flows method from Azkaban class unschedules every scheduled flow and reports each one
+        """
+
+        self.add_schedule_callbacks()
+
+        results = self.azk.unschedule_flows(
+            self.project, ['scheduled_flow', 'not_scheduled_flow', 'other_scheduled_flow'], project_id=self.project_id
+        )
+
+        self.assertEqual(results, [
+            {'flow': 'scheduled_flow', 'scheduled': True, 'scheduleId': 1, 'error': None},
+            {'flow': 'not_scheduled_flow', 'scheduled': False, 'scheduleId': None, 'error': None},
+            {'flow': 'other_scheduled_flow', 'scheduled': True, 'scheduleId': 2, 'error': None},
+        ])
+        self.assertEqual(self.unscheduled_ids(), ['1', '2'])
+
+    @responses.activate
+    def test_dry_run_unschedule_flows(self):
+        """
+        Test if unschedule flows method from Azkaban class only looks up the schedules in dry run mode
+        """
+
+        self.add_schedule_callbacks()
+
+        results = self.azk.unschedule_flows(
+            self.project, ['scheduled_flow', 'not_scheduled_flow'], project_id=self.project_id, dry_run=True
+        )
+
+        self.assertEqual([(result['flow'], result['scheduled']) for result in results], [
+            ('scheduled_flow', True),
+            ('not_scheduled_flow', False),
+        ])
+        self.assertEqual(self.unscheduled_ids(), [])
+
+    @responses.activate
+    def test_error_unschedule_flows(self):
+        """
+        Test if unschedule flows method from Azkaban class reports the flows that could not be unscheduled
+        """
+
+        self.add_schedule_callbacks('{"message": "Permission denied", "status": "error"}')
+
+        results = self.azk.unschedule_flows(
+            self.project, ['scheduled_flow', 'not_scheduled_flow'], project_id=self.project_id
+        )
+
+        self.assertEqual(results[0]['error'], 'Permission denied')
+        self.assertIsNone(results[1]['error'])
+
+    @responses.activate
+    def test_project_id_unschedule_flows(self):
+        """
+        Test if unschedule flows method from Azkaban class looks up the project id once when it is not passed
+        """
+
+        responses.add(responses.GET, self.host + "/manager", json={'projectId': self.project_id, 'flows': []})
+        self.add_schedule_callbacks()
+
+        self.azk.unschedule_flows(self.project, ['scheduled_flow', 'other_scheduled_flow'])
+
+        self.assertEqual(len([call for call in responses.calls if '/manager' in call.request.url]), 1)
+        self.assertEqual(self.unscheduled_ids(), ['1', '2'])
+
+    @responses.activate
+    def test_recreated_project_unschedule_flows(self):
+        """
+        Test if unschedule flows method from Azkaban class looks up the project id again, once for every flow, when
+        the cached one belongs to a project that was deleted and created again
+        """
+
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        cache = MetadataCache(os.path.join(cache_dir, 'metadata-cache.json'))
+        cache.set_project_id(self.host, self.project, 122)
+
+        def fetch_schedule(request):
+            if 'projectId=122' in request.url:
+                return (200, {}, '{}')
+            flow = request.url.split('flowId=')[1].split('&')[0]
+            return (200, {}, json.dumps(self.schedules[flow]))
+
+        responses.add(responses.GET, self.host + "/manager", json={'projectId': self.project_id, 'flows': []})
+        responses.add_callback(responses.GET, self.host + "/schedule", callback=fetch_schedule)
+        responses.add_callback(
+            responses.POST, self.host + "/schedule",
+            callback=lambda request: (200, {}, '{"message": "removed", "status": "success"}')
+        )
+
+        results = self.azk.unschedule_flows(
+            self.project, ['scheduled_flow', 'other_scheduled_flow'], max_workers=1, cache=cache
+        )
+
+        self.assertEqual([result['scheduleId'] for result in results], [1, 2])
+        self.assertEqual(len([call for call in responses.calls if '/manager' in call.request.url]), 1)
+        self.assertEqual(self.unscheduled_ids(), ['1', '2'])
+        self.assertEqual(cache.get_project_id(self.host, self.project), self.project_id)
+
+    @responses.activate
+    def test_error_session_expired_unschedule_flows(self):
+        """
+        Test if unschedule flows method from Azkaban class raises SessionError if a request returns error caused by
+        session expired
+        """
+
+        responses.add(responses.GET, self.host + "/schedule", json={'error': 'session'}, status=200)
+
+        with self.assertRaises(SessionError):
+            self.azk.unschedule_flows(self.project, ['scheduled_flow'], project_id=self.project_id)
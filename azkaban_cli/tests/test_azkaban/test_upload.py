@@ -1,9 +1,15 @@
+import io
+import os
+import shutil
+import tempfile
+import zipfile
 from unittest import TestCase
 from unittest.mock import patch, mock_open, ANY
 
 import responses
 
 import azkaban_cli.azkaban
+from azkaban_cli.cache import UploadCache
 from azkaban_cli.exceptions import NotLoggedOnError, UploadError, SessionError
 
 
@@ -200,4 +206,148 @@ class AzkabanUploadTest(TestCase):
         mock_make_archive.return_value = zip_path
 
         with self.assertRaises(SessionError):
-            self.azk.upload(path)
\ No newline at end of file
+            self.azk.upload(path)
+
+    def create_project_dir(self):
+        project_path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, project_path)
+
+        os.mkdir(os.path.join(project_path, 'subdir'))
+        with open(os.path.join(project_path, 'basic.flow'), 'w') as f:
+            f.write('nodes:\n  - name: job\n    type: command\n')
+        with open(os.path.join(project_path, 'subdir', 'script.sh'), 'w') as f:
+            f.write('echo hello\n' * 1000)
+
+        return project_path
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.make_archive')
+    def test_stream_upload(self, mock_make_archive):
+        """
+        Test if upload method from Azkaban class in stream mode sends a valid zip without creating it on disk
+        """
+
+        project_path = self.create_project_dir()
+        bodies = []
+
+        def callback(request):
+            bodies.append(b''.join(request.body))
+            return (200, {}, '{"projectId": "33", "version": "58"}')
+
+        responses.add_callback(responses.POST, self.host + "/manager", callback=callback)
+
+        self.azk.upload(project_path, 'project', stream=True)
+
+        mock_make_archive.assert_not_called()
+        self.assertEqual(len(responses.calls), 1)
+
+        content_type = responses.calls[0].request.headers['Content-Type']
+        boundary = content_type.split('boundary=')[1].encode()
+        parts = bodies[0].split(b'--' + boundary)
+        file_part = [part for part in parts if b'filename="project.zip"' in part][0]
+        zip_content = file_part.split(b'\r\n\r\n', 1)[1][:-2]
+
+        with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            self.assertEqual(sorted(zip_file.namelist()), ['basic.flow', 'subdir/', 'subdir/script.sh'])
+            self.assertEqual(zip_file.read('subdir/script.sh'), b'echo hello\n' * 1000)
+
+    @responses.activate
+    def test_error_directory_not_found_stream_upload(self):
+        """
+        Test if upload method from Azkaban class in stream mode raises UploadError if path is not a directory
+        """
+
+        with self.assertRaises(UploadError):
+            self.azk.upload('/path/that/does/not/exist', 'project', stream=True)
+
+        self.assertEqual(len(responses.calls), 0)
+
+    @responses.activate
+    def test_error_project_doesnt_exist_stream_upload(self):
+        """
+        Test if upload method from Azkaban class in stream mode raises UploadError if request returns error
+        """
+
+        project_path = self.create_project_dir()
+        responses.add(
+            responses.POST, self.host + "/manager",
+            json={"error": "Installation Failed. Project 'no-existing-project' doesn't exist."},
+            status=400
+        )
+
+        with self.assertRaises(UploadError):
+            self.azk.upload(project_path, 'project', stream=True)
+
+    def create_upload_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.upload_cache_path = os.path.join(cache_dir, 'upload-cache.json')
+        return UploadCache(self.upload_cache_path)
+
+    @responses.activate
+    def test_skip_unchanged_upload(self):
+        """
+        Test if upload method from Azkaban class skips the upload when the tree and the project id did not change
+        """
+
+        project_path = self.create_project_dir()
+        cache = self.create_upload_cache()
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '58'}, status=200)
+        responses.add(responses.GET, self.host + "/manager", json={'projectId': 33, 'flows': []}, status=200)
+
+        first = self.azk.upload(project_path, 'project', stream=True, cache=cache)
+        second = self.azk.upload(project_path, 'project', stream=True, cache=UploadCache(self.upload_cache_path))
+
+        self.assertEqual(first, {'projectId': '33', 'version': '58'})
+        self.assertEqual(second, {'projectId': '33', 'version': '58', 'skipped': True})
+        self.assertEqual([call.request.method for call in responses.calls], ['POST', 'GET'])
+
+    @responses.activate
+    def test_changed_tree_upload(self):
+        """
+        Test if upload method from Azkaban class uploads again when a file of the tree changed
+        """
+
+        project_path = self.create_project_dir()
+        cache = self.create_upload_cache()
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '58'}, status=200)
+
+        self.azk.upload(project_path, 'project', stream=True, cache=cache)
+
+        with open(os.path.join(project_path, 'basic.flow'), 'a') as f:
+            f.write('# changed\n')
+
+        self.azk.upload(project_path, 'project', stream=True, cache=cache)
+
+        self.assertEqual([call.request.method for call in responses.calls], ['POST', 'POST'])
+
+    @responses.activate
+    def test_recreated_project_upload(self):
+        """
+        Test if upload method from Azkaban class uploads again when the project id changed on Azkaban
+        """
+
+        project_path = self.create_project_dir()
+        cache = self.create_upload_cache()
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '58'}, status=200)
+        responses.add(responses.GET, self.host + "/manager", json={'projectId': 34, 'flows': []}, status=200)
+
+        self.azk.upload(project_path, 'project', stream=True, cache=cache)
+        self.azk.upload(project_path, 'project', stream=True, cache=cache)
+
+        self.assertEqual([call.request.method for call in responses.calls], ['POST', 'GET', 'POST'])
+
+    @responses.activate
+    def test_force_unchanged_upload(self):
+        """
+        Test if upload method from Azkaban class uploads an unchanged tree when force is True
+        """
+
+        project_path = self.create_project_dir()
+        cache = self.create_upload_cache()
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '58'}, status=200)
+
+        self.azk.upload(project_path, 'project', stream=True, cache=cache)
+        self.azk.upload(project_path, 'project', stream=True, cache=cache, force=True)
+
+        self.assertEqual([call.request.method for call in responses.calls], ['POST', 'POST'])
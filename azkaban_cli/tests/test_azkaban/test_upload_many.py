@@ -0,0 +1,118 @@
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.archive import make_archive
+from azkaban_cli.exceptions import NotLoggedOnError
+
+
+class AzkabanUploadManyTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance, a logged session and some project directories for all upload many tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+        for project in ['project-a', 'project-b', 'project-c']:
+            os.mkdir(os.path.join(self.root, project))
+            with open(os.path.join(self.root, project, 'basic.flow'), 'w') as f:
+                f.write('nodes: []\n')
+
+    @responses.activate
+    def test_upload_many_glob(self):
+        """
+        Test if upload many method from Azkaban class expands glob patterns and uploads every project
+        """
+
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '2'}, status=200)
+
+        results = self.azk.upload_many([os.path.join(self.root, 'project-*')], max_workers=2, processes=0)
+
+        self.assertEqual([result['project'] for result in results], ['project-a', 'project-b', 'project-c'])
+        self.assertEqual([result['version'] for result in results], ['2', '2', '2'])
+        self.assertEqual(len(responses.calls), 3)
+
+    @responses.activate
+    def test_upload_many_process_pool(self):
+        """
+        Test if upload many method from Azkaban class creates the zips in a process pool and removes them
+        """
+
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '2'}, status=200)
+
+        results = self.azk.upload_many([os.path.join(self.root, 'project-a')], processes=1)
+
+        self.assertIsNone(results[0]['error'])
+        self.assertFalse(os.path.exists('project-a.zip'))
+        self.assertIn(b'filename="project-a.zip"', responses.calls[0].request.body)
+
+    @responses.activate
+    def test_upload_many_same_basename(self):
+        """
+        Test if upload many method from Azkaban class creates a separate zip for paths with the same basename
+        """
+
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '2'}, status=200)
+
+        paths = []
+        for parent, flow in [('first', 'first.flow'), ('second', 'second.flow')]:
+            path = os.path.join(self.root, parent, 'project-a')
+            os.makedirs(path)
+            with open(os.path.join(path, flow), 'w') as f:
+                f.write('nodes: []\n')
+            paths.append(path)
+
+        with patch('azkaban_cli.azkaban.make_archive', wraps=make_archive) as mock_make_archive:
+            results = self.azk.upload_many(paths, max_workers=2, processes=0)
+
+        self.assertEqual([result['error'] for result in results], [None, None])
+        zip_names = [call[0][0] for call in mock_make_archive.call_args_list]
+        self.assertEqual([os.path.basename(zip_name) for zip_name in zip_names], ['project-a', 'project-a'])
+        self.assertNotEqual(zip_names[0], zip_names[1])
+        bodies = [call.request.body for call in responses.calls]
+        self.assertEqual(len([body for body in bodies if b'first.flow' in body and b'second.flow' not in body]), 1)
+        self.assertEqual(len([body for body in bodies if b'second.flow' in body and b'first.flow' not in body]), 1)
+
+    @responses.activate
+    def test_upload_many_partial_failure(self):
+        """
+        Test if upload many method from Azkaban class reports the failed projects without stopping the others
+        """
+
+        responses.add(responses.POST, self.host + "/manager", json={'projectId': '33', 'version': '2'}, status=200)
+
+        paths = [os.path.join(self.root, 'project-a'), os.path.join(self.root, 'missing')]
+        results = self.azk.upload_many(paths, stream=True)
+
+        self.assertIsNone(results[0]['error'])
+        self.assertIsNotNone(results[1]['error'])
+        self.assertIsNone(results[1]['version'])
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    def test_error_not_logged_upload_many(self):
+        """
+        Test if upload many method from Azkaban class raises NotLoggedOnError if there is no logged session
+        """
+
+        self.azk.logout()
+
+        with self.assertRaises(NotLoggedOnError):
+            self.azk.upload_many([os.path.join(self.root, 'project-a')])
+
+        self.assertEqual(len(responses.calls), 0)
@@ -0,0 +1,112 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import FetchFlowExecutionUpdatesError, SessionError
+
+
+class AzkabanWatchExecutionTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance and set a logged session for all watch execution tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        self.exec_id = '1234'
+
+    def add_updates_callback(self, updates):
+        """
+        Answers fetchexecflowupdate with the updates, in order, recording the lastUpdateTime sent
+        """
+
+        self.last_update_times = []
+
+        def callback(request):
+            params = parse_qs(urlparse(request.url).query)
+            self.last_update_times.append(params['lastUpdateTime'][0])
+            return (200, {}, json.dumps(updates.pop(0)))
+
+        responses.add_callback(responses.GET, self.host + "/executor", callback=callback)
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    def test_watch_execution(self, mock_sleep):
+        """
+        Test if watch execution method from Azkaban class yields the transitions and carries the updateTime forward
+        """
+
+        self.add_updates_callback([
+            {'status': 'RUNNING', 'updateTime': 10, 'nodes': [
+                {'id': 'job-1', 'status': 'RUNNING', 'updateTime': 10},
+                {'id': 'job-2', 'status': 'READY', 'updateTime': 5},
+            ]},
+            {'status': 'RUNNING', 'updateTime': 10, 'nodes': []},
+            {'status': 'RUNNING', 'updateTime': 30, 'nodes': [
+                {'id': 'job-1', 'status': 'SUCCEEDED', 'updateTime': 20},
+                {'id': 'job-2', 'status': 'RUNNING', 'updateTime': 30},
+            ]},
+            {'status': 'FAILED', 'updateTime': 40, 'nodes': [
+                {'id': 'job-2', 'status': 'FAILED', 'updateTime': 40},
+            ]},
+        ])
+
+        events = list(self.azk.watch_execution(self.exec_id, interval=2))
+
+        self.assertEqual(
+            [(event['job'], event['event']) for event in events],
+            [('job-1', 'started'), (None, 'started'), ('job-1', 'succeeded'), ('job-2', 'started'),
+             ('job-2', 'failed'), (None, 'failed')]
+        )
+        self.assertEqual(self.last_update_times, ['-1', '10', '10', '30'])
+        self.assertEqual(mock_sleep.call_count, 3)
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    def test_watch_finished_execution(self, mock_sleep):
+        """
+        Test if watch execution method from Azkaban class stops after the first poll if the flow is finished
+        """
+
+        self.add_updates_callback([
+            {'status': 'SUCCEEDED', 'updateTime': 10, 'nodes': [{'id': 'job-1', 'status': 'SUCCEEDED'}]},
+        ])
+
+        events = list(self.azk.watch_execution(self.exec_id))
+
+        self.assertEqual([event['status'] for event in events], ['SUCCEEDED', 'SUCCEEDED'])
+        mock_sleep.assert_not_called()
+
+    @responses.activate
+    def test_execution_cannot_be_found_watch_execution(self):
+        """
+        Test if watch execution method from Azkaban class raises FetchFlowExecutionUpdatesError if the execution
+        is not found
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'error': "Cannot find execution '0'"}, status=200)
+
+        with self.assertRaises(FetchFlowExecutionUpdatesError):
+            list(self.azk.watch_execution(self.exec_id))
+
+    @responses.activate
+    def test_error_session_expired_watch_execution(self):
+        """
+        Test if watch execution method from Azkaban class raises SessionError if request returns error caused by
+        session expired
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={"error": "session"}, status=200)
+
+        with self.assertRaises(SessionError):
+            list(self.azk.watch_execution(self.exec_id))
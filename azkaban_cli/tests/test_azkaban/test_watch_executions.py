@@ -0,0 +1,152 @@
+import json
+from unittest import TestCase
+from unittest.mock import patch
+from urllib.parse import urlparse, parse_qs
+
+import requests
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import NotLoggedOnError
+
+
+class AzkabanWatchExecutionsTest(TestCase):
+    def setUp(self):
+        """
+        Creates an Azkaban instance and set a logged session for all watch executions tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.user = 'username'
+        self.session_id = 'aebe406b-d5e6-4056-add6-bf41091e42c6'
+
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+    def add_updates_callback(self, updates):
+        """
+        Answers fetchexecflowupdate with the updates of each execution id, in order
+        """
+
+        self.polled = []
+
+        def callback(request):
+            execution_id = parse_qs(urlparse(request.url).query)['execid'][0]
+            self.polled.append(execution_id)
+            return (200, {}, json.dumps(updates[execution_id].pop(0)))
+
+        responses.add_callback(responses.GET, self.host + "/executor", callback=callback)
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    def test_watch_executions(self, mock_sleep):
+        """
+        Test if watch executions method from Azkaban class merges the transitions of every execution and stops
+        polling the finished ones
+        """
+
+        self.add_updates_callback({
+            '1': [
+                {'status': 'RUNNING', 'updateTime': 10, 'nodes': [{'id': 'job-1', 'status': 'RUNNING'}]},
+                {'status': 'SUCCEEDED', 'updateTime': 20, 'nodes': [{'id': 'job-1', 'status': 'SUCCEEDED'}]},
+            ],
+            '2': [
+                {'status': 'FAILED', 'updateTime': 10, 'nodes': [{'id': 'job-a', 'status': 'FAILED'}]},
+            ],
+        })
+
+        events = list(self.azk.watch_executions(['1', '2'], min_interval=0, max_interval=0))
+
+        self.assertEqual(
+            sorted((event['execid'], event['job'] or '', event['event']) for event in events),
+            [('1', '', 'started'), ('1', '', 'succeeded'), ('1', 'job-1', 'started'), ('1', 'job-1', 'succeeded'),
+             ('2', '', 'failed'), ('2', 'job-a', 'failed')]
+        )
+        self.assertEqual(sorted(self.polled), ['1', '1', '2'])
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    @patch('azkaban_cli.azkaban.time.monotonic')
+    def test_adaptive_interval(self, mock_monotonic, mock_sleep):
+        """
+        Test if watch executions method from Azkaban class doubles the interval of an idle execution
+        """
+
+        clock = [0]
+        mock_monotonic.side_effect = lambda: clock[0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+        mock_sleep.side_effect = sleep
+
+        running = {'status': 'RUNNING', 'updateTime': 10, 'nodes': []}
+        self.add_updates_callback({'1': [running, running, running, dict(running, status='SUCCEEDED')]})
+
+        list(self.azk.watch_executions(['1'], min_interval=1, max_interval=3))
+
+        self.assertEqual([call[0][0] for call in mock_sleep.call_args_list], [1, 2, 3])
+
+    @responses.activate
+    def test_error_execution_cannot_be_found_watch_executions(self):
+        """
+        Test if watch executions method from Azkaban class emits an error event and stops polling an execution that
+        cannot be found
+        """
+
+        responses.add(responses.GET, self.host + "/executor", json={'error': "Cannot find execution '0'"}, status=200)
+
+        events = list(self.azk.watch_executions(['0']))
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]['event'], 'error')
+        self.assertEqual(events[0]['error'], "Cannot find execution '0'")
+        self.assertEqual(len(responses.calls), 1)
+
+    @responses.activate
+    @patch('azkaban_cli.azkaban.time.sleep')
+    @patch('azkaban_cli.azkaban.time.monotonic')
+    def test_error_connection_watch_executions(self, mock_monotonic, mock_sleep):
+        """
+        Test if watch executions method from Azkaban class emits an error event and polls again after max_interval an
+        execution whose updates cannot be fetched because Azkaban cannot be reached
+        """
+
+        clock = [0]
+        mock_monotonic.side_effect = lambda: clock[0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+        mock_sleep.side_effect = sleep
+
+        updates = [
+            requests.exceptions.ConnectionError('Connection refused'),
+            {'status': 'SUCCEEDED', 'updateTime': 20, 'nodes': []},
+        ]
+
+        def callback(request):
+            update = updates.pop(0)
+            if isinstance(update, Exception):
+                raise update
+            return (200, {}, json.dumps(update))
+
+        responses.add_callback(responses.GET, self.host + "/executor", callback=callback)
+
+        self.azk = azkaban_cli.azkaban.Azkaban(max_retries=0)
+        self.azk.set_logged_session(self.host, self.user, self.session_id)
+
+        events = list(self.azk.watch_executions(['1'], min_interval=1, max_interval=5))
+
+        self.assertEqual([event['event'] for event in events], ['error', 'succeeded'])
+        self.assertEqual(events[0]['error'], 'Connection refused')
+        self.assertEqual([call[0][0] for call in mock_sleep.call_args_list], [5])
+
+    def test_error_not_logged_watch_executions(self):
+        """
+        Test if watch executions method from Azkaban class raises NotLoggedOnError if there is no logged session
+        """
+
+        self.azk.logout()
+
+        with self.assertRaises(NotLoggedOnError):
+            list(self.azk.watch_executions(['1']))
@@ -0,0 +1,232 @@
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import TestCase
+
+import responses
+
+from azkaban_cli.azkaban import Azkaban
+from azkaban_cli.metrics import RequestMetrics
+
+
+def request_metrics(**values):
+    metrics = {
+        'method': 'GET', 'host': 'http://azkaban-mock.com', 'endpoint': '/executor', 'action': 'fetchexecflow',
+        'status': 200, 'error': None, 'bytes_out': 0, 'bytes_in': 100, 'retries': 0, 'dns': None, 'connect': None,
+        'tls': None, 'ttfb': 0.002, 'total': 0.003,
+    }
+    metrics.update(values)
+    return metrics
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        self.metrics = RequestMetrics(buckets=(0.01, 0.1, 1.0))
+
+        self.metrics(request_metrics(total=0.005, dns=0.001, connect=0.002))
+        self.metrics(request_metrics(total=0.05, retries=2, bytes_in=300))
+        self.metrics(request_metrics(total=5.0, status=None, error='ConnectionError', bytes_in=None))
+        self.metrics(request_metrics(endpoint='/index', action=None, total=0.5))
+
+    def test_summary(self):
+        """
+        Test if the requests are aggregated by ajax action, or by endpoint when they have none
+        """
+
+        summary = self.metrics.summary()
+
+        self.assertEqual(sorted(summary), ['/index', 'fetchexecflow'])
+
+        action = summary['fetchexecflow']
+        self.assertEqual(action['count'], 3)
+        self.assertAlmostEqual(action['sum'], 5.055)
+        self.assertEqual(action['max'], 5.0)
+        self.assertEqual(action['buckets'], [1, 1, 0])
+        self.assertEqual(action['phases']['dns'], [1, 0.001])
+        self.assertEqual(action['phases']['ttfb'][0], 3)
+        self.assertEqual(action['bytes_in'], 400)
+        self.assertEqual(action['retries'], 2)
+
+    def test_format_timings(self):
+        """
+        Test if the timings have a line per action, slowest first, followed by its histogram
+        """
+
+        lines = self.metrics.format_timings()
+
+        self.assertTrue(lines[0].startswith('fetchexecflow: 3 requests, mean 1.68s, max 5.00s, 2 retries, 0B out, 400B in'))
+        self.assertIn('dns 1.0ms', lines[0])
+        self.assertEqual([line.split('|')[0].strip() for line in lines[1:5]], ['<= 10.0ms', '<= 100.0ms', '<= 1.00s', '> 1.00s'])
+        self.assertTrue(lines[5].startswith('/index: 1 requests'))
+
+    def test_format_timings_without_requests(self):
+        """
+        Test if the timings say no request was made when there are none
+        """
+
+        self.assertEqual(RequestMetrics().format_timings(), ['No requests made'])
+
+    def test_prometheus_text(self):
+        """
+        Test if the metrics are exposed with cumulative histogram buckets, request counts by status and retry stats
+        """
+
+        text = self.metrics.prometheus_text({'requests': 4, 'retries': 2})
+        lines = text.splitlines()
+
+        self.assertIn('# TYPE azkaban_cli_request_duration_seconds histogram', lines)
+        self.assertIn('azkaban_cli_request_duration_seconds_bucket{action="fetchexecflow",le="0.1"} 2', lines)
+        self.assertIn('azkaban_cli_request_duration_seconds_bucket{action="fetchexecflow",le="+Inf"} 3', lines)
+        self.assertIn('azkaban_cli_request_duration_seconds_count{action="fetchexecflow"} 3', lines)
+        self.assertIn(
+            'azkaban_cli_requests_total{action="fetchexecflow",endpoint="/executor",host="http://azkaban-mock.com",'
+            'status="ConnectionError"} 1',
+            lines
+        )
+        self.assertIn('azkaban_cli_request_retries_total{action="fetchexecflow"} 2', lines)
+        self.assertIn('azkaban_cli_retry_policy_retries_total 2', lines)
+        self.assertTrue(text.endswith('\n'))
+
+    def test_prometheus_label_escaping(self):
+        """
+        Test if quotes, backslashes and new lines are escaped in label values
+        """
+
+        metrics = RequestMetrics()
+        metrics(request_metrics(action='a"b\\c\nd'))
+
+        self.assertIn('action="a\\"b\\\\c\\nd"', metrics.prometheus_text())
+
+    def test_write_textfile(self):
+        """
+        Test if the textfile is written readable by others and no temporary file is left behind
+        """
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'azkaban.prom')
+
+        self.metrics.write_textfile(path)
+
+        self.assertEqual(os.listdir(directory), ['azkaban.prom'])
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        with open(path) as metrics_file:
+            self.assertIn('azkaban_cli_last_run_timestamp_seconds', metrics_file.read())
+
+
+class AzkabanRequestHookTest(TestCase):
+    def setUp(self):
+        self.azkaban = Azkaban(retry_backoff_factor=0.0)
+        self.azkaban.set_logged_session('http://azkaban-mock.com', 'user', 'session_id')
+
+        self.calls = []
+        self.azkaban.add_request_hook(self.calls.append)
+
+    @responses.activate
+    def test_hook_receives_request_metrics(self):
+        """
+        Test if the hooks receive the endpoint, ajax action, status, bytes and retries of every request
+        """
+
+        responses.add(responses.GET, 'http://azkaban-mock.com/manager', status=503)
+        responses.add(responses.GET, 'http://azkaban-mock.com/manager', json={'project': 'project', 'projectId': 1, 'flows': []})
+
+        self.azkaban.fetch_flows('project')
+
+        self.assertEqual(len(self.calls), 1)
+        metrics = self.calls[0]
+        self.assertEqual(metrics['host'], 'http://azkaban-mock.com')
+        self.assertEqual(metrics['endpoint'], '/manager')
+        self.assertEqual(metrics['action'], 'fetchprojectflows')
+        self.assertEqual(metrics['status'], 200)
+        self.assertEqual(metrics['retries'], 1)
+        self.assertEqual(metrics['bytes_out'], 0)
+        self.assertEqual(metrics['bytes_in'], len(b'{"project": "project", "projectId": 1, "flows": []}'))
+        self.assertGreaterEqual(metrics['total'], metrics['ttfb'])
+
+    @responses.activate
+    def test_hook_receives_request_errors(self):
+        """
+        Test if the hooks are called with the exception name when the request raises
+        """
+
+        with self.assertRaises(Exception):
+            self.azkaban.cancel('1')
+
+        self.assertEqual(self.calls[0]['status'], None)
+        self.assertEqual(self.calls[0]['error'], 'ConnectionError')
+        self.assertEqual(self.calls[0]['action'], 'cancelFlow')
+
+    @responses.activate
+    def test_failing_hook_does_not_fail_request(self):
+        """
+        Test if a hook raising an exception is logged and the request still returns
+        """
+
+        def failing(metrics):
+            raise ValueError('broken hook')
+
+        self.azkaban.add_request_hook(failing)
+        responses.add(responses.GET, 'http://azkaban-mock.com/executor', json={'status': 'success'})
+
+        with self.assertLogs(level='WARNING'):
+            self.azkaban.cancel('1')
+
+        self.assertEqual(len(self.calls), 1)
+
+    @responses.activate
+    def test_remove_request_hook(self):
+        """
+        Test if a removed hook is not called anymore
+        """
+
+        self.azkaban.remove_request_hook(self.calls.append)
+        responses.add(responses.GET, 'http://azkaban-mock.com/executor', json={'status': 'success'})
+
+        self.azkaban.cancel('1')
+
+        self.assertEqual(self.calls, [])
+
+
+class ConnectionTimingsTest(TestCase):
+    def setUp(self):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                body = b'{"status": "success"}'
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_new_connections_are_timed(self):
+        """
+        Test if the dns and connect timings are set for a new connection and not for a reused one
+        """
+
+        calls = []
+        azkaban = Azkaban()
+        azkaban.add_request_hook(calls.append)
+        azkaban.set_logged_session('http://localhost:%d' % (self.server.server_address[1]), 'user', 'session_id')
+
+        azkaban.cancel('1')
+        azkaban.cancel('2')
+
+        self.assertIsNotNone(calls[0]['dns'])
+        self.assertIsNotNone(calls[0]['connect'])
+        self.assertIsNone(calls[0]['tls'])
+        self.assertIsNone(calls[1]['dns'])
+        self.assertIsNone(calls[1]['connect'])
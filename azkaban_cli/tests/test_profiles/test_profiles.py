@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import responses
+
+from azkaban_cli.exceptions import FetchRunningExecutionsOfAFlowError
+from azkaban_cli.profiles import DEFAULT_PROFILE, SessionStore, query_profiles
+
+
+class SessionStoreTest(TestCase):
+    def setUp(self):
+        store_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, store_dir)
+        self.path = os.path.join(store_dir, 'user-session.json')
+
+        self.session = {'host': 'http://azkaban-mock.com', 'user': 'username', 'session_id': 'session-1'}
+
+    def test_set_session_store(self):
+        """
+        Test if the session store saves the sessions by profile and makes the last one saved the current profile
+        """
+
+        store = SessionStore(self.path)
+        store.set('cluster-1', self.session)
+        store.set('cluster-2', dict(self.session, session_id='session-2'))
+
+        store = SessionStore(self.path)
+        self.assertEqual(store.current, 'cluster-2')
+        self.assertEqual(store.get()['session_id'], 'session-2')
+        self.assertEqual(store.get('cluster-1'), self.session)
+        self.assertEqual(sorted(store.profiles()), ['cluster-1', 'cluster-2'])
+
+    def test_single_session_session_store(self):
+        """
+        Test if the session store reads a file with a single session as the default profile
+        """
+
+        with open(self.path, 'w') as session_file:
+            json.dump(self.session, session_file)
+
+        store = SessionStore(self.path)
+
+        self.assertEqual(store.current, DEFAULT_PROFILE)
+        self.assertEqual(store.profiles(), {DEFAULT_PROFILE: self.session})
+
+    def test_delete_session_store(self):
+        """
+        Test if deleting the current profile makes another one current
+        """
+
+        store = SessionStore(self.path)
+        store.set('cluster-1', self.session)
+        store.set('cluster-2', self.session)
+
+        store.delete('cluster-2')
+
+        store = SessionStore(self.path)
+        self.assertEqual(store.current, 'cluster-1')
+        self.assertIsNone(store.get('cluster-2'))
+
+    def test_empty_session_store(self):
+        """
+        Test if an empty session store has no profiles and the default profile as current
+        """
+
+        store = SessionStore(self.path)
+
+        self.assertEqual(store.profiles(), {})
+        self.assertEqual(store.current, DEFAULT_PROFILE)
+        self.assertIsNone(store.get())
+
+
+class QueryProfilesTest(TestCase):
+    def setUp(self):
+        self.profiles = {
+            'cluster-%d' % (index): {
+                'host': 'http://azkaban-%d.com' % (index), 'user': 'username', 'session_id': 'session-%d' % (index)
+            }
+            for index in (2, 1, 3)
+        }
+
+    @responses.activate
+    @patch.dict(os.environ, {}, clear=True)
+    def test_query_profiles(self):
+        """
+        Test if query profiles runs the query against every cluster and reports the failures of each one
+        """
+
+        responses.add(responses.GET, 'http://azkaban-1.com/executor', json={'execIds': [10, 11]}, status=200)
+        responses.add(responses.GET, 'http://azkaban-2.com/executor', json={'error': 'session'}, status=200)
+        responses.add(responses.GET, 'http://azkaban-3.com/executor', json={'error': 'Flow not found'}, status=200)
+
+        results = query_profiles(
+            self.profiles, lambda azkaban: azkaban.fetch_running_executions_of_a_flow('project', 'flow'),
+            errors=(FetchRunningExecutionsOfAFlowError,)
+        )
+
+        self.assertEqual([result['cluster'] for result in results], ['cluster-1', 'cluster-2', 'cluster-3'])
+        self.assertEqual(results[0]['result'], {'execIds': [10, 11]})
+        self.assertEqual(results[0]['host'], 'http://azkaban-1.com')
+        self.assertIn('--profile cluster-2', results[1]['error'])
+        self.assertEqual(results[2]['error'], 'Flow not found')
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_unexpected_error_query_profiles(self):
+        """
+        Test if query profiles raises exceptions that are not listed in errors
+        """
+
+        def query(azkaban):
+            raise ValueError('unexpected')
+
+        with self.assertRaises(ValueError):
+            query_profiles(self.profiles, query)
+
+    def test_no_profiles_query_profiles(self):
+        """
+        Test if query profiles returns an empty list without profiles
+        """
+
+        self.assertEqual(query_profiles({}, lambda azkaban: None), [])
@@ -0,0 +1,67 @@
+import os
+import pstats
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+import azkaban_cli.azkaban_cli
+from azkaban_cli.profiling import Profiler, summary_path
+
+
+def allocate():
+    return [u'%d' % (index) for index in range(50000)]
+
+
+class ProfilerTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, 'reports', 'azkaban.prof')
+
+    def test_profile_and_summary_written(self):
+        """
+        Test if stop writes a cProfile file and a summary with the top allocation sites and functions
+        """
+
+        profiler = Profiler(self.path, top=3)
+        profiler.start()
+        kept = allocate()
+        allocations = profiler.stop()
+
+        self.assertEqual(len(kept), 50000)
+        self.assertTrue(allocations[0].startswith('Memory traced: '))
+        self.assertEqual(allocations[1], 'Top 3 allocation sites:')
+        self.assertIn(__file__, allocations[2])
+
+        stats = pstats.Stats(self.path)
+        self.assertTrue(any(function[2] == 'allocate' for function in stats.stats))
+
+        self.assertEqual(summary_path(self.path), os.path.join(self.directory, 'reports', 'azkaban.txt'))
+        with open(summary_path(self.path)) as summary_file:
+            summary = summary_file.read()
+        self.assertIn('Top 3 allocation sites:', summary)
+        self.assertIn('Top 3 functions by cumulative time:', summary)
+
+    def test_cli_profile_output(self):
+        """
+        Test if --profile-output profiles the chained commands and logs where the profile was written
+        """
+
+        session_path = os.path.join(self.directory, 'user-session.json')
+
+        with patch.object(azkaban_cli.azkaban_cli, 'SESSION_JSON_PATH', session_path):
+            with self.assertLogs(level='INFO') as logs:
+                result = CliRunner().invoke(
+                    azkaban_cli.azkaban_cli.cli, ['--profile-output', self.path, '--profile-top', '2', 'profiles']
+                )
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(summary_path(self.path)))
+        self.assertIn('INFO:root:Top 2 allocation sites:', logs.output)
+        self.assertIn(
+            'INFO:root:CPU profile written to %s, summary to %s' % (self.path, summary_path(self.path)), logs.output
+        )
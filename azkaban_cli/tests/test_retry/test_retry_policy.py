@@ -0,0 +1,153 @@
+import io
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import ExecuteError
+from azkaban_cli.retry import RetryBudget, RetryPolicy
+
+
+class RetryPolicyTest(TestCase):
+    def setUp(self):
+        self.delays = []
+        self.policy = RetryPolicy(max_retries=3, backoff_factor=1.0, sleep=self.delays.append)
+
+    def response(self, status, headers=None):
+        response = requests.Response()
+        response.status_code = status
+        response.raw = io.BytesIO()
+        response.headers.update(headers or {})
+        return response
+
+    def sender(self, *outcomes):
+        outcomes = list(outcomes)
+
+        def send():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        return send
+
+    def test_retry_overloaded_status(self):
+        """
+        Test if an idempotent request is retried while it gets overloaded statuses
+        """
+
+        send = self.sender(self.response(503), self.response(502), self.response(200))
+
+        response = self.policy.call(send, idempotent=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.delays), 2)
+        self.assertTrue(0 <= self.delays[0] <= 1.0 and 0 <= self.delays[1] <= 2.0)
+        self.assertEqual(self.policy.stats, {'requests': 1, 'retries': 2, 'gave_up': 0, 'budget_exhausted': 0})
+
+    def test_retry_connection_error(self):
+        """
+        Test if an idempotent request is retried when the connection fails and the error is raised after the last retry
+        """
+
+        send = self.sender(*[requests.exceptions.ConnectionError()] * 4)
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.policy.call(send, idempotent=True)
+
+        self.assertEqual(len(self.delays), 3)
+        self.assertEqual(self.policy.stats['gave_up'], 1)
+
+    def test_retry_after(self):
+        """
+        Test if the Retry-After header is used as delay, capped by max_backoff
+        """
+
+        self.policy.max_backoff = 10.0
+        send = self.sender(
+            self.response(429, {'Retry-After': '4'}), self.response(503, {'Retry-After': '120'}), self.response(200)
+        )
+
+        self.policy.call(send, idempotent=True)
+
+        self.assertEqual(self.delays, [4.0, 10.0])
+
+    def test_no_retry_non_idempotent(self):
+        """
+        Test if non idempotent requests are not retried unless the policy allows it
+        """
+
+        self.assertEqual(self.policy.call(self.sender(self.response(503)), idempotent=False).status_code, 503)
+
+        self.policy.retry_non_idempotent = True
+        response = self.policy.call(self.sender(self.response(503), self.response(200)), idempotent=False)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_retry_not_replayable(self):
+        """
+        Test if requests whose body cannot be sent again are never retried
+        """
+
+        self.policy.retry_non_idempotent = True
+
+        response = self.policy.call(self.sender(self.response(503)), idempotent=True, replayable=False)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.delays, [])
+
+    def test_retry_budget(self):
+        """
+        Test if retries stop when the retry budget runs out
+        """
+
+        self.policy.budget = RetryBudget(ratio=0.0, max_tokens=1.0)
+        send = self.sender(self.response(503), self.response(503))
+
+        response = self.policy.call(send, idempotent=True)
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.policy.stats['retries'], 1)
+        self.assertEqual(self.policy.stats['budget_exhausted'], 1)
+
+
+class AzkabanRetryTest(TestCase):
+    @patch.dict(os.environ, {}, clear=True)
+    def setUp(self):
+        """
+        Creates an Azkaban instance without delays between retries and set a logged session
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban(retry_backoff_factor=0)
+        self.host = 'http://azkaban-mock.com'
+        self.azk.set_logged_session(self.host, 'username', 'aebe406b-d5e6-4056-add6-bf41091e42c6')
+
+    @responses.activate
+    def test_retry_read_only_request(self):
+        """
+        Test if a read only request of the Azkaban class is retried on 503
+        """
+
+        responses.add(responses.GET, self.host + "/executor", body='Service Unavailable', status=503)
+        responses.add(responses.GET, self.host + "/executor", json={'id': 'test_id'}, status=200)
+
+        self.assertEqual(self.azk.fetch_flow_execution('1234'), {'id': 'test_id'})
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(self.azk.get_retry_stats()['retries'], 1)
+
+    @responses.activate
+    def test_no_retry_execute_request(self):
+        """
+        Test if the execute request of the Azkaban class is not retried by default
+        """
+
+        responses.add(responses.GET, self.host + "/executor", body='Service Unavailable', status=503)
+        responses.add(responses.GET, self.host + "/executor", json={'message': 'Execution submitted'}, status=200)
+
+        with self.assertRaises(ExecuteError):
+            self.azk.execute('project', 'flow')
+
+        self.assertEqual(len(responses.calls), 1)
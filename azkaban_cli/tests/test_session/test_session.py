@@ -0,0 +1,148 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import SessionConfigError
+from azkaban_cli.session import TimeoutHTTPAdapter, create_session, load_session_config
+
+
+class LoadSessionConfigTest(TestCase):
+    def setUp(self):
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        self.config_path = os.path.join(config_dir, 'config.json')
+
+    def write_config(self, config):
+        with open(self.config_path, 'w') as f:
+            json.dump(config, f)
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_defaults_load_session_config(self):
+        """
+        Test if load session config returns the defaults without config file, environment or arguments
+        """
+
+        config = load_session_config(self.config_path)
+
+        self.assertEqual(config['pool_maxsize'], 10)
+        self.assertEqual(config['connect_timeout'], 10.0)
+        self.assertTrue(config['tcp_keepalive'])
+
+    @patch.dict(os.environ, {'AZKABAN_CLI_POOL_MAXSIZE': '32', 'AZKABAN_CLI_READ_TIMEOUT': '60'}, clear=True)
+    def test_precedence_load_session_config(self):
+        """
+        Test if arguments take precedence over environment variables, which take precedence over the config file
+        """
+
+        self.write_config({'session': {'pool_maxsize': 16, 'pool_connections': 4, 'read_timeout': 30}})
+
+        config = load_session_config(self.config_path, read_timeout=5)
+
+        self.assertEqual(config['pool_connections'], 4)
+        self.assertEqual(config['pool_maxsize'], 32)
+        self.assertEqual(config['read_timeout'], 5.0)
+
+    @patch.dict(os.environ, {'AZKABAN_CLI_READ_TIMEOUT': 'none', 'AZKABAN_CLI_TCP_KEEPALIVE': 'off'}, clear=True)
+    def test_environment_values_load_session_config(self):
+        """
+        Test if load session config converts booleans and disabled timeouts from environment variables
+        """
+
+        config = load_session_config()
+
+        self.assertIsNone(config['read_timeout'])
+        self.assertFalse(config['tcp_keepalive'])
+
+    @patch.dict(os.environ, {'AZKABAN_CLI_RATE_LIMITS': '/executor=5, manager=10'}, clear=True)
+    def test_rate_limits_load_session_config(self):
+        """
+        Test if load session config reads the rate limits by endpoint from the environment and the config file
+        """
+
+        self.assertEqual(load_session_config()['rate_limits'], {'/executor': 5.0, '/manager': 10.0})
+
+        self.write_config({'session': {'rate_limits': {'/schedule': 1}, 'rate_limit': None}})
+
+        with patch.dict(os.environ, {}, clear=True):
+            config = load_session_config(self.config_path)
+
+        self.assertEqual(config['rate_limits'], {'/schedule': 1.0})
+        self.assertIsNone(config['rate_limit'])
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_error_unknown_option_load_session_config(self):
+        """
+        Test if load session config raises SessionConfigError for unknown options
+        """
+
+        self.write_config({'session': {'pool_size': 16}})
+
+        with self.assertRaises(SessionConfigError):
+            load_session_config(self.config_path)
+
+    @patch.dict(os.environ, {'AZKABAN_CLI_POOL_MAXSIZE': 'many'}, clear=True)
+    def test_error_invalid_value_load_session_config(self):
+        """
+        Test if load session config raises SessionConfigError for values that cannot be converted
+        """
+
+        with self.assertRaises(SessionConfigError):
+            load_session_config()
+
+
+class CreateSessionTest(TestCase):
+    @patch.dict(os.environ, {}, clear=True)
+    def test_create_session(self):
+        """
+        Test if create session mounts an adapter with the pool sizes, timeouts and keep-alive of the config
+        """
+
+        session = create_session(load_session_config(pool_connections=3, pool_maxsize=7, read_timeout=42))
+        adapter = session.get_adapter('https://azkaban-mock.com')
+
+        self.assertIsInstance(adapter, TimeoutHTTPAdapter)
+        self.assertEqual(adapter.timeout, (10.0, 42.0))
+        self.assertEqual(adapter.poolmanager.connection_pool_kw['maxsize'], 7)
+        self.assertEqual(len(adapter.poolmanager.pools.keys()), 0)
+        self.assertIn(
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1), adapter.poolmanager.connection_pool_kw['socket_options']
+        )
+        self.assertFalse(session.verify)
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_no_keepalive_create_session(self):
+        """
+        Test if create session keeps the urllib3 socket options when keep-alive is disabled
+        """
+
+        session = create_session(load_session_config(tcp_keepalive=False))
+        adapter = session.get_adapter('https://azkaban-mock.com')
+
+        self.assertNotIn('socket_options', adapter.poolmanager.connection_pool_kw)
+
+    @patch('requests.adapters.HTTPAdapter.send')
+    @patch.dict(os.environ, {}, clear=True)
+    def test_default_timeout_azkaban(self, mock_send):
+        """
+        Test if the Azkaban class sends requests with the configured timeout when the call does not pass one
+        """
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"id": "test_id"}'
+        mock_send.return_value = response
+
+        azk = azkaban_cli.azkaban.Azkaban(connect_timeout=3, read_timeout=4)
+        azk.set_logged_session('http://azkaban-mock.com', 'username', 'session-id')
+
+        azk.fetch_flow_execution('1234')
+
+        self.assertEqual(mock_send.call_args[1]['timeout'], (3.0, 4.0))
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+# Seconds the azkaban console script can take to run --version, without the interpreter startup. Generous, so slow
+# machines do not fail it, and can be overridden with AZKABAN_CLI_STARTUP_BUDGET.
+STARTUP_BUDGET = float(os.getenv("AZKABAN_CLI_STARTUP_BUDGET", "0.5"))
+
+PACKAGE_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+HEAVY_MODULES = ('requests', 'urllib3', 'azkaban_cli.azkaban')
+
+RUN_CLI = """
+import json, sys, time
+start = time.perf_counter()
+try:
+    # Entry point of the azkaban console script, probing the agent socket before running the command
+    from azkaban_cli.agent import main
+    main()
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': [module for module in %r if module in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+class StartupTest(TestCase):
+    def setUp(self):
+        """
+        Creates an empty session directory and a bytecode cache, so the startup is not measured compiling the sources
+        """
+
+        cli_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cli_dir)
+
+        self.env = dict(os.environ, AZKABAN_CLI_PATH=cli_dir, PYTHONPATH=PACKAGE_PATH)
+        self.env.pop('PYTHONDONTWRITEBYTECODE', None)
+        self.env['PYTHONPYCACHEPREFIX'] = os.path.join(cli_dir, 'pycache')
+
+    def run_cli(self, *args):
+        output = subprocess.check_output([sys.executable, '-c', RUN_CLI] + list(args), env=self.env)
+        return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+    def test_import_budget_startup(self):
+        """
+        Test if the azkaban console script, including the agent socket probe, runs --version within the startup budget
+        """
+
+        self.run_cli('--version')
+
+        elapsed = min(self.run_cli('--version')['elapsed'] for _ in range(3))
+
+        self.assertLess(elapsed, STARTUP_BUDGET)
+
+    def test_lazy_imports_startup(self):
+        """
+        Test if commands that do not make requests to Azkaban do not import the network stack
+        """
+
+        for args in (['--version'], ['--help'], ['logout'], ['profiles']):
+            self.assertEqual(self.run_cli(*args)['modules'], [], args)
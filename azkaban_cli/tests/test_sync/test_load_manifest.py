@@ -0,0 +1,121 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from azkaban_cli.exceptions import ManifestError
+from azkaban_cli.sync import load_manifest, load_permissions_manifest
+
+
+class LoadManifestTest(TestCase):
+    def setUp(self):
+        self.manifest_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.manifest_dir)
+
+    def write_manifest(self, name, content):
+        path = os.path.join(self.manifest_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_load_json_manifest(self):
+        """
+        Test if load manifest reads a json list, normalizing the cron and defaulting the concurrent option
+        """
+
+        path = self.write_manifest('schedules.json', json.dumps([
+            {'project': 'project', 'flow': 'flow', 'cron': '0  0 * ? * *'},
+            {'project': 'project', 'flow': 'other_flow', 'cron': '0 30 * ? * *', 'concurrentOption': 'pipeline'},
+        ]))
+
+        self.assertEqual(load_manifest(path), [
+            {'project': 'project', 'flow': 'flow', 'cron': '0 0 * ? * *', 'concurrentOption': 'skip'},
+            {'project': 'project', 'flow': 'other_flow', 'cron': '0 30 * ? * *', 'concurrentOption': 'pipeline'},
+        ])
+
+    def test_load_yaml_manifest(self):
+        """
+        Test if load manifest reads the schedules key of a yaml mapping
+        """
+
+        path = self.write_manifest(
+            'schedules.yaml',
+            'schedules:\n'
+            '  - project: project\n'
+            '    flow: flow\n'
+            '    cron: "0 0 * ? * *"\n'
+            '    concurrentOption: ignore\n'
+        )
+
+        self.assertEqual(load_manifest(path), [
+            {'project': 'project', 'flow': 'flow', 'cron': '0 0 * ? * *', 'concurrentOption': 'ignore'},
+        ])
+
+    def test_error_yaml_not_installed_load_manifest(self):
+        """
+        Test if load manifest raises ManifestError for yaml manifests when PyYAML is not installed
+        """
+
+        path = self.write_manifest('schedules.yml', '[]')
+
+        with patch('azkaban_cli.sync.yaml', None):
+            with self.assertRaises(ManifestError):
+                load_manifest(path)
+
+    def test_error_invalid_entry_load_manifest(self):
+        """
+        Test if load manifest raises ManifestError when an entry has no cron
+        """
+
+        path = self.write_manifest('schedules.json', json.dumps([{'project': 'project', 'flow': 'flow'}]))
+
+        with self.assertRaises(ManifestError):
+            load_manifest(path)
+
+    def test_error_duplicated_entry_load_manifest(self):
+        """
+        Test if load manifest raises ManifestError when a flow is in more than one entry
+        """
+
+        entry = {'project': 'project', 'flow': 'flow', 'cron': '0 0 * ? * *'}
+        path = self.write_manifest('schedules.json', json.dumps([entry, entry]))
+
+        with self.assertRaises(ManifestError):
+            load_manifest(path)
+
+    def test_error_invalid_json_load_manifest(self):
+        """
+        Test if load manifest raises ManifestError when the file is not valid json
+        """
+
+        path = self.write_manifest('schedules.json', '{not json')
+
+        with self.assertRaises(ManifestError):
+            load_manifest(path)
+
+    def test_load_permissions_manifest(self):
+        """
+        Test if load permissions manifest converts the permission lists to permission options
+        """
+
+        path = self.write_manifest('permissions.json', json.dumps({
+            'permissions': {
+                'project': {'team': ['READ', 'execute'], 'old_team': [], 'other_team': None},
+            }
+        }))
+
+        self.assertEqual(load_permissions_manifest(path), {
+            'project': {'team': {'read': True, 'execute': True}, 'old_team': None, 'other_team': None},
+        })
+
+    def test_error_invalid_permission_load_permissions_manifest(self):
+        """
+        Test if load permissions manifest raises ManifestError when a permission is invalid
+        """
+
+        path = self.write_manifest('permissions.json', json.dumps({'project': {'team': ['read', 'deploy']}}))
+
+        with self.assertRaises(ManifestError):
+            load_permissions_manifest(path)
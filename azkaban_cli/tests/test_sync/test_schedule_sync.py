@@ -0,0 +1,153 @@
+import json
+from unittest import TestCase
+
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import FetchFlowsError
+from azkaban_cli.sync import ScheduleSync
+
+
+class ScheduleSyncTest(TestCase):
+    def setUp(self):
+        """
+        Creates a logged Azkaban instance and a fake server state for all schedule sync tests
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban()
+
+        self.host = 'http://azkaban-mock.com'
+        self.azk.set_logged_session(self.host, 'username', 'aebe406b-d5e6-4056-add6-bf41091e42c6')
+
+        self.sync = ScheduleSync(self.azk, max_workers=4)
+
+        # project -> (projectId, flows)
+        self.projects = {
+            'project': (1, ['unchanged', 'changed_cron', 'changed_option', 'unscheduled', 'removed']),
+        }
+        # (projectId, flow) -> schedule
+        self.schedules = {
+            ('1', 'unchanged'): self.schedule(10, '0 0 * ? * *', 'skip'),
+            ('1', 'changed_cron'): self.schedule(11, '0 0 * ? * *', 'skip'),
+            ('1', 'changed_option'): self.schedule(12, '0 0 * ? * *', 'skip'),
+            ('1', 'removed'): self.schedule(13, '0 0 * ? * *', 'pipeline'),
+        }
+
+        self.entries = [
+            {'project': 'project', 'flow': 'unchanged', 'cron': '0 0 * ? * *', 'concurrentOption': 'skip'},
+            {'project': 'project', 'flow': 'changed_cron', 'cron': '0 30 * ? * *', 'concurrentOption': 'skip'},
+            {'project': 'project', 'flow': 'changed_option', 'cron': '0 0 * ? * *', 'concurrentOption': 'ignore'},
+            {'project': 'project', 'flow': 'unscheduled', 'cron': '0 0 * ? * *', 'concurrentOption': 'skip'},
+        ]
+
+    def schedule(self, schedule_id, cron, concurrent_option):
+        return {
+            'schedule': {
+                'scheduleId': schedule_id,
+                'cronExpression': cron,
+                'executionOptions': {'concurrentOption': concurrent_option},
+            }
+        }
+
+    def add_server_callbacks(self):
+        def query(request):
+            return dict(param.split('=', 1) for param in request.url.split('?', 1)[1].split('&'))
+
+        def fetch_flows(request):
+            project = query(request)['project']
+            if project not in self.projects:
+                return (200, {}, json.dumps({'error': "Project %s doesn't exist." % project}))
+            project_id, flows = self.projects[project]
+            return (200, {}, json.dumps({'projectId': project_id, 'flows': [{'flowId': flow} for flow in flows]}))
+
+        def fetch_schedule(request):
+            params = query(request)
+            return (200, {}, json.dumps(self.schedules.get((params['projectId'], params['flowId']), {})))
+
+        def write(request):
+            return (200, {}, json.dumps({'message': 'done', 'status': 'success', 'scheduleId': 20}))
+
+        responses.add_callback(responses.GET, self.host + "/manager", callback=fetch_flows)
+        responses.add_callback(responses.GET, self.host + "/schedule", callback=fetch_schedule)
+        responses.add_callback(responses.POST, self.host + "/schedule", callback=write)
+
+    def write_calls(self):
+        return [call for call in responses.calls if call.request.method == 'POST']
+
+    @responses.activate
+    def test_plan(self):
+        """
+        Test if plan computes only the changes needed to match the manifest
+        """
+
+        self.add_server_callbacks()
+
+        changes = self.sync.plan(self.entries)
+
+        self.assertEqual([(change['action'], change['flow']) for change in changes], [
+            ('update', 'changed_cron'),
+            ('update', 'changed_option'),
+            ('delete', 'removed'),
+            ('create', 'unscheduled'),
+        ])
+        self.assertEqual(changes[2]['scheduleId'], 13)
+        self.assertEqual(changes[0]['previous']['cron'], '0 0 * ? * *')
+        self.assertEqual(self.write_calls(), [])
+
+    @responses.activate
+    def test_apply(self):
+        """
+        Test if apply makes one schedule or unschedule request per change and none for unchanged flows
+        """
+
+        self.add_server_callbacks()
+
+        results = self.sync.apply(self.sync.plan(self.entries))
+
+        self.assertTrue(all(result['error'] is None for result in results))
+        bodies = sorted(call.request.body for call in self.write_calls())
+        self.assertEqual(len(bodies), 4)
+        self.assertTrue(any('action=removeSched' in body and 'scheduleId=13' in body for body in bodies))
+        self.assertFalse(any('flow=unchanged' in body for body in bodies))
+
+    @responses.activate
+    def test_in_sync_apply(self):
+        """
+        Test if apply makes no request when the schedules already match the manifest
+        """
+
+        self.schedules = {('1', 'unchanged'): self.schedule(10, '0 0 * ? * *', 'skip')}
+        self.add_server_callbacks()
+
+        changes = self.sync.plan(self.entries[:1])
+        self.sync.apply(changes)
+
+        self.assertEqual(changes, [])
+        self.assertEqual(self.write_calls(), [])
+
+    @responses.activate
+    def test_error_apply(self):
+        """
+        Test if apply reports the changes that failed without stopping the others
+        """
+
+        self.add_server_callbacks()
+        changes = self.sync.plan(self.entries)
+
+        responses.reset()
+        responses.add(responses.POST, self.host + "/schedule", json={'status': 'error', 'message': 'Invalid cron'})
+
+        results = self.sync.apply(changes)
+
+        self.assertEqual([result['error'] for result in results], ['Invalid cron'] * 4)
+
+    @responses.activate
+    def test_error_project_doesnt_exist_plan(self):
+        """
+        Test if plan raises FetchFlowsError when a project of the manifest does not exist
+        """
+
+        self.add_server_callbacks()
+
+        with self.assertRaises(FetchFlowsError):
+            self.sync.plan([{'project': 'missing', 'flow': 'flow', 'cron': '0 0 * ? * *', 'concurrentOption': 'skip'}])
@@ -0,0 +1,273 @@
+import io
+import os
+from unittest import TestCase
+from unittest.mock import patch
+
+import requests
+import responses
+
+import azkaban_cli.azkaban
+from azkaban_cli.exceptions import CircuitOpenError, FetchFlowExecutionError
+from azkaban_cli.throttle import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Throttle, TokenBucket
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_burst_token_bucket(self):
+        """
+        Test if the token bucket lets a burst through without waiting, then waits for the rate
+        """
+
+        bucket = TokenBucket(2, burst=3, clock=self.clock, sleep=self.clock.sleep)
+
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertEqual(bucket.acquire(), 0.5)
+        self.assertEqual(bucket.acquire(), 0.5)
+        self.assertEqual(self.clock.now, 1.0)
+
+    def test_refill_token_bucket(self):
+        """
+        Test if the token bucket refills at the rate, up to the burst
+        """
+
+        bucket = TokenBucket(1, clock=self.clock, sleep=self.clock.sleep)
+
+        bucket.acquire()
+        self.clock.now += 10
+
+        self.assertEqual(bucket.acquire(), 0.0)
+        self.assertEqual(bucket.acquire(), 1.0)
+
+
+class CircuitBreakerTest(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=self.clock)
+
+    def test_open_circuit_breaker(self):
+        """
+        Test if the circuit opens after consecutive failures and rejects requests until the reset timeout
+        """
+
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+        self.assertEqual(self.breaker.retry_in(), 10)
+
+    def test_success_resets_circuit_breaker(self):
+        """
+        Test if a success resets the count of consecutive failures
+        """
+
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_half_open_circuit_breaker(self):
+        """
+        Test if a single trial request is allowed after the reset timeout, closing the circuit on success
+        """
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now += 10
+
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.allow())
+
+    def test_failed_trial_circuit_breaker(self):
+        """
+        Test if a failed trial request opens the circuit again
+        """
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now += 10
+        self.breaker.allow()
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+
+class ThrottleTest(TestCase):
+    def response(self, status):
+        response = requests.Response()
+        response.status_code = status
+        response.raw = io.BytesIO()
+        return response
+
+    def test_rate_limits_throttle(self):
+        """
+        Test if the throttle keeps a token bucket per host and endpoint, with the rate of the endpoint
+        """
+
+        throttle = Throttle(rate_limit=10, rate_limits={'/executor': 2})
+
+        executor = throttle.bucket('http://azkaban-mock.com', '/executor')
+
+        self.assertEqual(executor.rate, 2)
+        self.assertIs(throttle.bucket('http://azkaban-mock.com', '/executor'), executor)
+        self.assertIsNot(throttle.bucket('http://other-azkaban.com', '/executor'), executor)
+        self.assertEqual(throttle.bucket('http://azkaban-mock.com', '/manager').rate, 10)
+
+    def test_no_rate_limit_throttle(self):
+        """
+        Test if endpoints without a rate limit are not throttled
+        """
+
+        throttle = Throttle(rate_limits={'/executor': 2})
+
+        self.assertIsNone(throttle.bucket('http://azkaban-mock.com', '/manager'))
+
+    def test_fail_fast_throttle(self):
+        """
+        Test if the throttle rejects requests to a host once its circuit is open, without calling send
+        """
+
+        throttle = Throttle(failure_threshold=2)
+        calls = []
+
+        def send():
+            calls.append(1)
+            return self.response(500)
+
+        throttle.call('http://azkaban-mock.com/executor', send)
+        throttle.call('http://azkaban-mock.com/manager', send)
+
+        with self.assertRaises(CircuitOpenError):
+            throttle.call('http://azkaban-mock.com/schedule', send)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(throttle.call('http://other-azkaban.com/executor', lambda: self.response(200)).status_code, 200)
+
+    def test_connection_error_throttle(self):
+        """
+        Test if connection errors count as failures of the host
+        """
+
+        throttle = Throttle(failure_threshold=1)
+
+        def send():
+            raise requests.exceptions.ConnectionError()
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            throttle.call('http://azkaban-mock.com/executor', send)
+
+        self.assertEqual(throttle.breaker('http://azkaban-mock.com').state, OPEN)
+
+    def test_failed_trial_throttle(self):
+        """
+        Test if a trial request raising an exception that is not retried opens the circuit again
+        """
+
+        throttle = Throttle(failure_threshold=1, reset_timeout=0)
+
+        def send():
+            raise requests.exceptions.ChunkedEncodingError()
+
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            throttle.call('http://azkaban-mock.com/executor', send)
+        with self.assertRaises(requests.exceptions.ChunkedEncodingError):
+            throttle.call('http://azkaban-mock.com/executor', send)
+
+        self.assertEqual(throttle.breaker('http://azkaban-mock.com').state, OPEN)
+
+    def test_interrupted_trial_throttle(self):
+        """
+        Test if a trial request interrupted by KeyboardInterrupt lets another trial through without counting a failure
+        """
+
+        throttle = Throttle(failure_threshold=2, reset_timeout=0)
+        breaker = throttle.breaker('http://azkaban-mock.com')
+        breaker.record_failure()
+        breaker.record_failure()
+
+        def interrupt():
+            raise KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            throttle.call('http://azkaban-mock.com/executor', interrupt)
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(throttle.call('http://azkaban-mock.com/executor', lambda: self.response(200)).status_code, 200)
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_interrupt_closed_throttle(self):
+        """
+        Test if a request interrupted by KeyboardInterrupt does not count as a failure of the host
+        """
+
+        throttle = Throttle(failure_threshold=1)
+
+        def interrupt():
+            raise KeyboardInterrupt()
+
+        with self.assertRaises(KeyboardInterrupt):
+            throttle.call('http://azkaban-mock.com/executor', interrupt)
+
+        self.assertEqual(throttle.breaker('http://azkaban-mock.com').state, CLOSED)
+
+    def test_disabled_circuit_breaker_throttle(self):
+        """
+        Test if a failure threshold of 0 disables the circuit breaker
+        """
+
+        throttle = Throttle(failure_threshold=0)
+
+        self.assertIsNone(throttle.breaker('http://azkaban-mock.com'))
+        for _ in range(10):
+            throttle.call('http://azkaban-mock.com/executor', lambda: self.response(500))
+
+
+class AzkabanThrottleTest(TestCase):
+    @patch.dict(os.environ, {}, clear=True)
+    def setUp(self):
+        """
+        Creates an Azkaban instance without retries and a low failure threshold and set a logged session
+        """
+
+        self.azk = azkaban_cli.azkaban.Azkaban(max_retries=0, circuit_failure_threshold=2)
+        self.host = 'http://azkaban-mock.com'
+        self.azk.set_logged_session(self.host, 'username', 'aebe406b-d5e6-4056-add6-bf41091e42c6')
+
+    @responses.activate
+    def test_fail_fast_azkaban(self):
+        """
+        Test if the Azkaban class stops making requests to a host that keeps failing
+        """
+
+        responses.add(responses.GET, self.host + "/executor", body='Internal Server Error', status=500)
+
+        for _ in range(2):
+            with self.assertRaises(FetchFlowExecutionError):
+                self.azk.fetch_flow_execution('1234')
+
+        with self.assertRaises(CircuitOpenError):
+            self.azk.fetch_flow_execution('1234')
+
+        self.assertEqual(len(responses.calls), 2)
@@ -0,0 +1,185 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import TestCase
+
+import responses
+
+from azkaban_cli.azkaban import Azkaban
+from azkaban_cli.exceptions import CancelError
+from azkaban_cli.tracing import SPAN_KIND_CLIENT, STATUS_CODE_ERROR, Tracer
+
+
+def attributes(otlp_span):
+    return {attribute['key']: list(attribute['value'].values())[0] for attribute in otlp_span['attributes']}
+
+
+class TracerTest(TestCase):
+    def setUp(self):
+        self.tracer = Tracer()
+
+    def test_nested_spans(self):
+        """
+        Test if spans opened inside another one are its children in the same trace
+        """
+
+        with self.tracer.span('command', attributes={'azkaban.project': 'project', 'skipped': None}) as root:
+            with self.tracer.span('request', kind=SPAN_KIND_CLIENT) as child:
+                self.assertIs(self.tracer.current_span(), child)
+
+        self.assertIsNone(self.tracer.current_span())
+        self.assertEqual([span.name for span in self.tracer.spans], ['request', 'command'])
+        self.assertEqual(child.trace_id, root.trace_id)
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertIsNone(root.parent_id)
+        self.assertEqual(root.attributes, {'azkaban.project': 'project'})
+        self.assertTrue(root.start <= child.start <= child.end <= root.end)
+
+    def test_root_spans_start_new_traces(self):
+        """
+        Test if a root span starts a new trace even when another span is open
+        """
+
+        with self.tracer.span('first') as first:
+            with self.tracer.span('second', root=True) as second:
+                pass
+
+        self.assertNotEqual(first.trace_id, second.trace_id)
+        self.assertIsNone(second.parent_id)
+
+    def test_worker_thread_spans_are_children_of_the_root(self):
+        """
+        Test if spans opened by a thread without open spans are children of the last root span
+        """
+
+        spans = []
+
+        def worker():
+            with self.tracer.span('request') as span:
+                spans.append(span)
+
+        with self.tracer.span('command') as root:
+            thread = threading.Thread(target=worker)
+            thread.start()
+            thread.join()
+
+        self.assertEqual(spans[0].parent_id, root.span_id)
+        self.assertEqual(spans[0].trace_id, root.trace_id)
+
+    def test_exception_marks_span_as_failed(self):
+        """
+        Test if an exception raised inside a span sets its error status and exception event, and is raised again
+        """
+
+        with self.assertRaises(ValueError):
+            with self.tracer.span('command'):
+                raise ValueError('broken')
+
+        span = self.tracer.spans[0].to_otlp()
+        self.assertEqual(span['status'], {'code': STATUS_CODE_ERROR, 'message': 'broken'})
+        self.assertEqual(span['events'][0]['name'], 'exception')
+        self.assertEqual(attributes(span['events'][0])['exception.type'], 'ValueError')
+
+    def test_export(self):
+        """
+        Test if export appends a line of OTLP/JSON per call and forgets the exported spans
+        """
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, 'traces', 'trace.jsonl')
+
+        for name in ('first', 'second'):
+            with self.tracer.span(name, attributes={'count': 1, 'ratio': 0.5, 'flag': True}):
+                pass
+            self.tracer.export(path)
+        self.tracer.export(path)
+
+        with open(path) as trace_file:
+            lines = [json.loads(line) for line in trace_file]
+
+        self.assertEqual(len(lines), 2)
+        resource_spans = lines[1]['resourceSpans'][0]
+        self.assertIn({'key': 'service.name', 'value': {'stringValue': 'azkaban-cli'}}, resource_spans['resource']['attributes'])
+        span = resource_spans['scopeSpans'][0]['spans'][0]
+        self.assertEqual(span['name'], 'second')
+        self.assertEqual(len(span['traceId']), 32)
+        self.assertEqual(len(span['spanId']), 16)
+        self.assertNotIn('parentSpanId', span)
+        self.assertEqual(
+            span['attributes'],
+            [
+                {'key': 'count', 'value': {'intValue': '1'}},
+                {'key': 'flag', 'value': {'boolValue': True}},
+                {'key': 'ratio', 'value': {'doubleValue': 0.5}},
+            ]
+        )
+        self.assertEqual(self.tracer.spans, [])
+
+
+class AzkabanTracingTest(TestCase):
+    def setUp(self):
+        self.tracer = Tracer()
+        self.azkaban = Azkaban()
+        self.azkaban.set_logged_session('http://azkaban-mock.com', 'user', 'session_id')
+        self.azkaban.set_tracer(self.tracer)
+
+    @responses.activate
+    def test_request_spans(self):
+        """
+        Test if every request function is a child span with the ajax action, project and flow as attributes
+        """
+
+        responses.add(responses.GET, 'http://azkaban-mock.com/manager', json={'project': 'project', 'projectId': 1, 'flows': []})
+        responses.add(responses.GET, 'http://azkaban-mock.com/schedule', json={'schedule': {'scheduleId': 5}})
+
+        with self.tracer.span('unschedule', root=True) as root:
+            self.azkaban.fetch_flows('project')
+            self.azkaban.fetch_schedule('1', 'flow')
+
+        spans = [span.to_otlp() for span in self.tracer.spans]
+        self.assertEqual([span['name'] for span in spans], ['fetch_flows_request', 'fetch_schedule_request', 'unschedule'])
+        self.assertEqual([span.get('parentSpanId') for span in spans[:2]], [root.span_id] * 2)
+        self.assertEqual(spans[0]['kind'], SPAN_KIND_CLIENT)
+        self.assertEqual(attributes(spans[0]), {
+            'azkaban.ajax_action': 'fetchprojectflows',
+            'azkaban.project': 'project',
+            'azkaban.retries': '0',
+            'http.request.method': 'GET',
+            'http.response.status_code': '200',
+            'url.full': 'http://azkaban-mock.com/manager',
+        })
+        self.assertEqual(attributes(spans[1])['azkaban.flow'], 'flow')
+        self.assertEqual(attributes(spans[1])['azkaban.project_id'], '1')
+        self.assertNotIn('session_id', json.dumps(spans))
+
+    @responses.activate
+    def test_request_span_error_status(self):
+        """
+        Test if a request answered with an error status is marked as failed
+        """
+
+        responses.add(responses.GET, 'http://azkaban-mock.com/executor', status=404, body='')
+
+        with self.assertRaises(CancelError):
+            self.azkaban.cancel('10')
+
+        span = self.tracer.spans[0].to_otlp()
+        self.assertEqual(span['name'], 'cancel_request')
+        self.assertEqual(span['status'], {'code': STATUS_CODE_ERROR, 'message': 'HTTP 404'})
+        self.assertEqual(attributes(span)['azkaban.exec_id'], '10')
+
+    @responses.activate
+    def test_no_spans_without_tracer(self):
+        """
+        Test if no span is recorded after the tracer is removed
+        """
+
+        self.azkaban.set_tracer(None)
+        responses.add(responses.GET, 'http://azkaban-mock.com/executor', json={'status': 'success'})
+
+        self.azkaban.cancel('10')
+
+        self.assertEqual(self.tracer.spans, [])
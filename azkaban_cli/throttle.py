@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.throttle
+
+This module provides the client side rate limiting and circuit breaking of the requests made to Azkaban
+"""
+
+from __future__ import absolute_import
+
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:
+    from urlparse import urlsplit
+
+from azkaban_cli.exceptions import CircuitOpenError
+
+CLOSED = u'closed'
+OPEN = u'open'
+HALF_OPEN = u'half_open'
+
+
+class TokenBucket(object):
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Token bucket allowing rate requests per second on average, and bursts of up to burst requests.
+
+        :param float rate: Tokens added per second
+        :param float burst: Maximum number of tokens, optional. Defaults to rate, at least 1.
+        :param clock: Function returning the current time in seconds
+        :param sleep: Function used to wait for a token
+        """
+
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(1.0, self.rate)
+        self.clock = clock
+        self.sleep = sleep
+
+        self.__tokens = self.burst
+        self.__updated = clock()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Takes a token, waiting until one is available. Tokens are reserved in arrival order, so waiting threads do not
+        compete for the same token.
+
+        :return: Seconds waited
+        :rtype: float
+        """
+
+        with self.__lock:
+            now = self.clock()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0.0
+
+        if wait > 0:
+            self.sleep(wait)
+
+        return wait
+
+
+class CircuitBreaker(object):
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        """
+        Circuit breaker that opens after failure_threshold consecutive failures. While open, requests are rejected.
+        After reset_timeout seconds a single trial request is let through (half open): its success closes the circuit,
+        its failure opens it again.
+
+        :param int failure_threshold: Consecutive failures that open the circuit
+        :param float reset_timeout: Seconds the circuit stays open before a trial request
+        :param clock: Function returning the current time in seconds
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+
+        self.__state = CLOSED
+        self.__failures = 0
+        self.__opened_at = None
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self):
+        return self.__state
+
+    def retry_in(self):
+        """Seconds until the open circuit lets a trial request through"""
+
+        with self.__lock:
+            if self.__state != OPEN:
+                return 0.0
+            return max(0.0, self.__opened_at + self.reset_timeout - self.clock())
+
+    def allow(self):
+        """Returns True if a request can be made now"""
+
+        with self.__lock:
+            if self.__state == CLOSED:
+                return True
+
+            if self.__state == OPEN and self.clock() - self.__opened_at >= self.reset_timeout:
+                self.__state = HALF_OPEN
+                return True
+
+            # Open, or half open with the trial request in flight
+            return False
+
+    def record_success(self):
+        with self.__lock:
+            self.__state = CLOSED
+            self.__failures = 0
+
+    def record_failure(self):
+        with self.__lock:
+            self.__failures += 1
+            if self.__state == HALF_OPEN or self.__failures >= self.failure_threshold:
+                self.__state = OPEN
+                self.__opened_at = self.clock()
+
+    def release_trial(self):
+        """
+        Lets the next request be a trial again when the trial request was interrupted without failing, such as by
+        KeyboardInterrupt. Nothing is counted against the host.
+        """
+
+        with self.__lock:
+            if self.__state == HALF_OPEN:
+                # The reset timeout has already elapsed, the next allow starts a new trial
+                self.__state = OPEN
+
+
+class Throttle(object):
+    def __init__(self, rate_limit=None, rate_limits=None, burst=None, failure_threshold=5, reset_timeout=30.0):
+        """
+        Rate limiter per (host, endpoint) and circuit breaker per host, applied to every request made by
+        azkaban_cli.api when set as the throttle attribute of the session.
+
+        :param float rate_limit: Requests per second to each endpoint of a host, optional. None is unlimited.
+        :param dict rate_limits: Requests per second by endpoint path, such as /executor, overriding rate_limit
+        :param float burst: Requests that can be made at once before the rate limit applies, optional
+        :param int failure_threshold: Consecutive failures of a host that open its circuit, 0 disables the breaker
+        :param float reset_timeout: Seconds the circuit of a host stays open before a trial request
+        """
+
+        self.rate_limit = rate_limit
+        self.rate_limits = dict(rate_limits or {})
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.__buckets = {}
+        self.__breakers = {}
+        self.__lock = threading.Lock()
+
+    def bucket(self, host, endpoint):
+        """Returns the token bucket of the endpoint of the host, None when it is not rate limited"""
+
+        rate = self.rate_limits.get(endpoint, self.rate_limit)
+        if not rate:
+            return None
+
+        with self.__lock:
+            if (host, endpoint) not in self.__buckets:
+                self.__buckets[(host, endpoint)] = TokenBucket(rate, self.burst)
+            return self.__buckets[(host, endpoint)]
+
+    def breaker(self, host):
+        """Returns the circuit breaker of the host, None when circuit breaking is disabled"""
+
+        if not self.failure_threshold:
+            return None
+
+        with self.__lock:
+            if host not in self.__breakers:
+                self.__breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.__breakers[host]
+
+    def call(self, url, send):
+        """
+        Calls send once the circuit of the host allows it and the rate limit of the endpoint has a token, recording
+        exceptions, such as connection errors and timeouts, and 5xx or 429 responses as failures of the host.
+
+        :param str url: Url of the request
+        :param send: Function making the request and returning the response
+        :return: The response returned by send
+        :rtype: requests.Response
+        :raises CircuitOpenError: when the circuit of the host is open
+        """
+
+        parts = urlsplit(url)
+        host = u'%s://%s' % (parts.scheme, parts.netloc)
+        endpoint = parts.path or u'/'
+
+        breaker = self.breaker(host)
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(
+                u'Too many failures of %s, requests are blocked for %.1f seconds' % (host, breaker.retry_in())
+            )
+
+        bucket = self.bucket(host, endpoint)
+        if bucket is not None:
+            bucket.acquire()
+
+        try:
+            response = send()
+        except Exception:
+            if breaker is not None:
+                breaker.record_failure()
+            raise
+        except BaseException:
+            # Interrupted, such as by Ctrl-C, which is not a failure of the host. The half open trial must still end,
+            # it would otherwise block the host forever
+            if breaker is not None:
+                breaker.release_trial()
+            raise
+
+        if breaker is not None:
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+        return response
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.tracing
+
+This module provides a minimal tracer recording the time spent in commands and in each request they make to Azkaban,
+exported as OTLP/JSON lines that the OpenTelemetry collector (otlpjsonfile receiver) and Jaeger can import, so no
+collector needs to run while tracing.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from azkaban_cli.__version__ import __version__
+
+SERVICE_NAME = u'azkaban-cli'
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+
+def now_nanoseconds():
+    return int(time.time() * 1e9)
+
+
+def otlp_value(value):
+    """Converts an attribute value to an OTLP AnyValue"""
+
+    if isinstance(value, bool):
+        return {u'boolValue': value}
+    if isinstance(value, int):
+        # int64 values are strings in the json encoding of OTLP
+        return {u'intValue': str(value)}
+    if isinstance(value, float):
+        return {u'doubleValue': value}
+    return {u'stringValue': u'%s' % (value)}
+
+
+def otlp_attributes(attributes):
+    return [{u'key': key, u'value': otlp_value(value)} for key, value in sorted(attributes.items())]
+
+
+class Span(object):
+    def __init__(self, name, trace_id, parent_id=None, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """
+        Operation timed by a Tracer, see Tracer.span
+
+        :param str name: Name of the operation
+        :param str trace_id: 32 hex digits identifying the trace
+        :param str parent_id: Span id of the parent span, None for a root span
+        :param int kind: SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT
+        :param dict attributes: Attributes of the span, optional
+        """
+
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = {}
+        self.events = []
+        self.status_code = STATUS_CODE_UNSET
+        self.status_message = None
+        self.start = now_nanoseconds()
+        self.end = None
+
+        self.set_attributes(attributes or {})
+
+    def set_attributes(self, attributes):
+        """Sets the attributes of the span, None values are skipped"""
+
+        for key, value in attributes.items():
+            if value is not None:
+                self.attributes[key] = value
+
+    def set_error(self, message):
+        self.status_code = STATUS_CODE_ERROR
+        self.status_message = message
+
+    def record_exception(self, exception):
+        """Marks the span as failed by the exception, adding an exception event as OpenTelemetry does"""
+
+        self.events.append({
+            u'timeUnixNano': str(now_nanoseconds()),
+            u'name': u'exception',
+            u'attributes': otlp_attributes({
+                u'exception.type': exception.__class__.__name__,
+                u'exception.message': str(exception),
+            }),
+        })
+        self.set_error(str(exception) or exception.__class__.__name__)
+
+    def finish(self):
+        self.end = now_nanoseconds()
+
+    def to_otlp(self):
+        """Returns the span as an OTLP Span json object"""
+
+        span = {
+            u'traceId': self.trace_id,
+            u'spanId': self.span_id,
+            u'name': self.name,
+            u'kind': self.kind,
+            u'startTimeUnixNano': str(self.start),
+            u'endTimeUnixNano': str(self.end or self.start),
+            u'attributes': otlp_attributes(self.attributes),
+            u'events': self.events,
+            u'status': {u'code': self.status_code},
+        }
+        if self.parent_id:
+            span[u'parentSpanId'] = self.parent_id
+        if self.status_message:
+            span[u'status'][u'message'] = self.status_message
+        return span
+
+
+class Tracer(object):
+    def __init__(self, service_name=SERVICE_NAME, attributes=None):
+        """
+        Tracer collecting finished spans in memory until they are exported.
+
+        Spans opened in a thread are the parents of the spans opened inside them in the same thread. Spans opened by a
+        thread without an open span, such as the workers of upload_many, are children of the last root span opened.
+
+        Set it on an Azkaban instance with Azkaban.set_tracer to get a span for every request.
+
+        :param str service_name: service.name resource attribute
+        :param dict attributes: Other resource attributes, optional
+        """
+
+        self.resource = dict(attributes or {})
+        self.resource[u'service.name'] = service_name
+        self.resource.setdefault(u'service.version', __version__)
+
+        self.__spans = []
+        self.__root = None
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+
+    def __stack(self):
+        """ PRIVATE
+        Returns the open spans of the current thread, innermost last.
+        """
+        if not hasattr(self.__local, u'stack'):
+            self.__local.stack = []
+        return self.__local.stack
+
+    def current_span(self):
+        """Returns the innermost open span of the current thread, None when there is none"""
+
+        stack = self.__stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None, root=False):
+        """
+        Context manager timing the operation run inside it as a span. An exception raised inside marks the span as
+        failed and is raised again.
+
+        :param str name: Name of the operation
+        :param int kind: SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT
+        :param dict attributes: Attributes of the span, optional
+        :param bool root: Start a new trace, even if another span is open
+        :return: The span, to set attributes on it
+        :rtype: Span
+        """
+
+        stack = self.__stack()
+        parent = None if root else (stack[-1] if stack else self.__root)
+
+        if parent is None:
+            span = Span(name, uuid.uuid4().hex, kind=kind, attributes=attributes)
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, kind=kind, attributes=attributes)
+
+        if span.parent_id is None:
+            previous_root, self.__root = self.__root, span
+
+        stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span.record_exception(e)
+            raise
+        finally:
+            stack.pop()
+            span.finish()
+            if span.parent_id is None:
+                self.__root = previous_root
+            with self.__lock:
+                self.__spans.append(span)
+
+    @property
+    def spans(self):
+        """Finished spans, in the order they finished"""
+
+        with self.__lock:
+            return list(self.__spans)
+
+    def to_otlp(self, spans=None):
+        """
+        Returns spans as an OTLP ExportTraceServiceRequest json object
+
+        :param list spans: Spans to convert, optional. The finished spans if not passed.
+        :rtype: dict
+        """
+
+        return {u'resourceSpans': [{
+            u'resource': {u'attributes': otlp_attributes(self.resource)},
+            u'scopeSpans': [{
+                u'scope': {u'name': u'azkaban_cli', u'version': __version__},
+                u'spans': [span.to_otlp() for span in (self.spans if spans is None else spans)],
+            }],
+        }]}
+
+    def export(self, path):
+        """
+        Appends the finished spans to a file, as one OTLP/JSON line, and forgets them. Nothing is written when there
+        are no spans.
+
+        :param str path: Path of the file, its directory is created if needed
+        """
+
+        with self.__lock:
+            spans, self.__spans = self.__spans, []
+        if not spans:
+            return
+
+        directory = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with open(path, 'a') as trace_file:
+            trace_file.write(json.dumps(self.to_otlp(spans), separators=(u',', u':')) + u'\n')
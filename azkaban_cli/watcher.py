@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+"""
+azkaban_cli.watcher
+
+This module provides the tracking of flow execution statuses used to watch executions incrementally
+"""
+
+# Statuses of flows and jobs that will not change anymore
+FINISHED_STATUSES = frozenset([
+    u'SUCCEEDED',
+    u'FAILED',
+    u'KILLED',
+    u'CANCELLED',
+    u'SKIPPED',
+    u'FAILED_SUCCEEDED',
+])
+
+# Event names of the statuses that are not just the status in lower case
+STATUS_EVENTS = {
+    u'RUNNING': u'started',
+}
+
+
+class ExecutionState(object):
+    def __init__(self, execution_id):
+        """
+        Statuses of a flow execution and its jobs, updated from fetchexecflowupdate responses.
+
+        It keeps the largest updateTime seen, to be sent as lastUpdateTime in the next request, so each response only
+        has the nodes that changed since the previous one.
+
+        :param str execution_id: Execution id on Azkaban
+        """
+
+        self.execution_id = execution_id
+        self.last_update_time = -1
+        self.flow_status = None
+        self.job_statuses = {}
+
+    @property
+    def finished(self):
+        return self.flow_status in FINISHED_STATUSES
+
+    def update(self, response_json):
+        """
+        Updates the statuses from a fetchexecflowupdate response and returns the status transitions
+
+        Each transition is a dictionary containing execid, job (None for the flow itself), event, status, previous and
+        time as keys. Jobs seen for the first time in READY status do not generate transitions.
+
+        :param dict response_json: Response of fetch_flow_execution_updates
+        :return: The status transitions, jobs first and the flow last
+        :rtype: list
+        """
+
+        events = []
+
+        def walk(nodes):
+            for node in nodes:
+                jobid = node.get(u'nestedId') or node.get(u'id')
+                self.__track_update_time(node)
+
+                previous = self.job_statuses.get(jobid)
+                status = node.get(u'status')
+                if status != previous and not (previous is None and status == u'READY'):
+                    events.append(self.__event(jobid, status, previous, node))
+                self.job_statuses[jobid] = status
+
+                walk(node.get(u'nodes', []))
+
+        walk(response_json.get(u'nodes', []))
+
+        self.__track_update_time(response_json)
+        status = response_json.get(u'status')
+        if status != self.flow_status:
+            events.append(self.__event(None, status, self.flow_status, response_json))
+            self.flow_status = status
+
+        return events
+
+    def __track_update_time(self, node):
+        update_time = node.get(u'updateTime')
+        if update_time is not None and int(update_time) > int(self.last_update_time):
+            self.last_update_time = int(update_time)
+
+    def __event(self, jobid, status, previous, node):
+        return {
+            u'execid': self.execution_id,
+            u'job': jobid,
+            u'event': STATUS_EVENTS.get(status, (status or u'').lower()),
+            u'status': status,
+            u'previous': previous,
+            u'time': node.get(u'updateTime'),
+        }
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+"""
+benchmarks.fake_azkaban
+
+Local HTTP stand-in for the Azkaban web server, answering the /, /manager, /executor, /schedule and /index requests
+made by azkaban_cli with generated payloads of configurable size, after a configurable latency and with a configurable
+rate of 503 errors.
+"""
+
+import json
+import random
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlsplit
+except ImportError:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlsplit
+
+SESSION_ID = u"fake-session-id"
+
+CRON = u"0 0 * ? * *"
+
+DEFAULT_CONFIG = {
+    # Seconds waited before answering each request, and maximum random seconds added to it
+    u"latency": 0.0,
+    u"jitter": 0.0,
+    # Fraction of the requests answered with 503 Service Unavailable
+    u"error_rate": 0.0,
+    # Projects listed in the index page
+    u"projects": 5000,
+    # Flows of each project, jobs of each flow graph
+    u"flows": 50,
+    u"jobs": 20,
+    # Jobs of the fetchexecflow graph, and jobs in each embedded flow of it
+    u"execution_jobs": 500,
+    u"embedded_flow_jobs": 10,
+    # Characters of each job log
+    u"log_size": 100000,
+    # Executions listed by fetchFlowExecutions, groups returned by getGroupPermissions
+    u"executions": 100,
+    u"groups": 10,
+    u"seed": 42,
+}
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def execution_nodes(count, embedded_flow_jobs, status=u"SUCCEEDED"):
+    """Nodes of a flow execution, with an embedded flow every embedded_flow_jobs jobs"""
+
+    nodes = []
+    for index in range(count):
+        node = {
+            u"id": u"job_%d" % (index),
+            u"nestedId": u"job_%d" % (index),
+            u"type": u"command",
+            u"attempt": 0,
+            u"status": status,
+            u"startTime": 1500000000000 + index,
+            u"endTime": 1500000001000 + index,
+            u"updateTime": 1500000001000 + index,
+            u"in": [u"job_%d" % (index - 1)] if index else [],
+        }
+        if embedded_flow_jobs and index and index % embedded_flow_jobs == 0:
+            node[u"type"] = u"flow"
+            node[u"nodes"] = [
+                dict(child, id=u"job_%d" % (child_index), nestedId=u"job_%d:job_%d" % (index, child_index))
+                for child_index, child in enumerate(execution_nodes(embedded_flow_jobs, 0, status))
+            ]
+        nodes.append(node)
+    return nodes
+
+
+def index_page(projects):
+    """Index page listing the projects as project-info blocks"""
+
+    blocks = []
+    for index in range(projects):
+        blocks.append(
+            u'<div class="project-info">\n'
+            u'  <h4><a href="/manager?project=project_%d">project_%d</a></h4>\n'
+            u'  <p class="project-description">Benchmark project %d</p>\n'
+            u'  <p class="project-last-modified">Last modified on 2019-01-01 00:00:00 by\n  user_%d.</p>\n'
+            u'</div>\n' % (index, index, index, index % 10)
+        )
+    return u'<html><head><title>Azkaban</title></head><body>\n%s</body></html>\n' % (u"".join(blocks))
+
+
+class FakeAzkaban(object):
+    def __init__(self, host=u"127.0.0.1", port=0, **config):
+        """
+        Fake Azkaban server running in a background thread.
+
+        :param str host: Address to listen on
+        :param int port: Port to listen on, 0 picks a free one
+        :param config: Options of DEFAULT_CONFIG
+        """
+
+        unknown = set(config) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(u"Unknown options %s" % (sorted(unknown)))
+
+        self.config = dict(DEFAULT_CONFIG, **config)
+        self.random = random.Random(self.config[u"seed"])
+        self.requests = 0
+        self.bytes_out = 0
+
+        self.__lock = threading.Lock()
+        self.__next_id = 1000
+
+        # Payloads that do not depend on the request are generated once
+        self.__index = index_page(self.config[u"projects"]).encode(u"utf-8")
+        self.__execution = json.dumps({
+            u"execid": 1,
+            u"project": u"project_0",
+            u"projectId": 1,
+            u"flow": u"flow_0",
+            u"flowId": u"flow_0",
+            u"status": u"SUCCEEDED",
+            u"nodes": execution_nodes(self.config[u"execution_jobs"], self.config[u"embedded_flow_jobs"]),
+        }).encode(u"utf-8")
+
+        self.server = ThreadingHTTPServer((host, port), self.__handler_class())
+        self.url = u"http://%s:%d" % (host, self.server.server_address[1])
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def next_id(self):
+        with self.__lock:
+            self.__next_id += 1
+            return self.__next_id
+
+    def count(self, size):
+        with self.__lock:
+            self.requests += 1
+            self.bytes_out += size
+
+    def failing(self):
+        """Returns True if the request should fail, according to the error rate"""
+
+        with self.__lock:
+            return self.random.random() < self.config[u"error_rate"]
+
+    def wait(self):
+        delay = self.config[u"latency"]
+        if self.config[u"jitter"]:
+            with self.__lock:
+                delay += self.random.uniform(0, self.config[u"jitter"])
+        if delay:
+            time.sleep(delay)
+
+    def answer(self, method, path, params):
+        """
+        Returns the status, content type and body answering a request
+
+        :param str method: GET or POST
+        :param str path: Path of the url
+        :param dict params: Query string and form parameters, with a single value each
+        :rtype: tuple
+        """
+
+        action = params.get(u"ajax") or params.get(u"action")
+        config = self.config
+
+        if path == u"/index":
+            return 200, u"text/html", self.__index
+
+        if path == u"/" and action == u"login":
+            payload = {u"session.id": SESSION_ID, u"status": u"success"}
+
+        elif path == u"/manager":
+            project = params.get(u"project", u"project_0")
+            if action == u"fetchprojectflows":
+                payload = {
+                    u"project": project,
+                    u"projectId": 1,
+                    u"flows": [{u"flowId": u"flow_%d" % (index)} for index in range(config[u"flows"])],
+                }
+            elif action == u"fetchflowgraph":
+                payload = {
+                    u"project": project,
+                    u"projectId": 1,
+                    u"flow": params.get(u"flow"),
+                    u"nodes": [
+                        {u"id": u"job_%d" % (index), u"type": u"command", u"in": [u"job_%d" % (index - 1)] if index else []}
+                        for index in range(config[u"jobs"])
+                    ],
+                }
+            elif action == u"fetchFlowExecutions":
+                length = min(int(params.get(u"length", 3)), config[u"executions"])
+                payload = {
+                    u"project": project,
+                    u"projectId": 1,
+                    u"flow": params.get(u"flow"),
+                    u"total": config[u"executions"],
+                    u"from": int(params.get(u"start", 0)),
+                    u"length": length,
+                    u"executions": [
+                        {u"execId": index, u"status": u"SUCCEEDED", u"submitUser": u"user", u"startTime": 1,
+                         u"endTime": 2, u"submitTime": 0, u"projectId": 1, u"flowId": params.get(u"flow")}
+                        for index in range(length)
+                    ],
+                }
+            elif action == u"getGroupPermissions":
+                payload = {u"permissions": [
+                    {u"username": u"group_%d" % (index), u"permission": [u"READ", u"EXECUTE"]}
+                    for index in range(config[u"groups"])
+                ]}
+            elif action == u"upload":
+                payload = {u"projectId": 1, u"version": self.next_id()}
+            elif params.get(u"delete") == u"true":
+                return 200, u"text/html", b""
+            else:
+                # create, addPermission, changePermission and removePermission
+                payload = {u"status": u"success", u"path": u"manager?project=%s" % (project)}
+
+        elif path == u"/executor":
+            if action == u"fetchexecflow":
+                return 200, u"application/json", self.__execution
+            elif action == u"fetchexecflowupdate":
+                payload = {
+                    u"id": u"flow_0",
+                    u"status": u"SUCCEEDED",
+                    u"startTime": 1500000000000,
+                    u"endTime": 1500000002000,
+                    u"updateTime": 1500000002000,
+                    u"nodes": execution_nodes(config[u"jobs"], 0),
+                }
+            elif action == u"fetchExecJobLogs":
+                offset = int(params.get(u"offset", 0))
+                length = max(0, min(int(params.get(u"length", 0)), config[u"log_size"] - offset))
+                payload = {u"data": u"x" * length, u"offset": offset, u"length": length}
+            elif action == u"executeFlow":
+                payload = {
+                    u"execid": self.next_id(), u"project": params.get(u"project"), u"flow": params.get(u"flow"),
+                    u"message": u"Execution submitted",
+                }
+            elif action == u"getRunning":
+                payload = {u"execIds": [1, 2, 3]}
+            else:
+                # cancelFlow and resumeFlow
+                payload = {u"status": u"success", u"message": u"ok"}
+
+        elif path == u"/schedule":
+            if action == u"fetchSchedule":
+                payload = {u"schedule": {
+                    u"scheduleId": int(params.get(u"projectId", 1)) * 1000 + len(params.get(u"flowId", u"")),
+                    u"cronExpression": CRON,
+                    u"executionOptions": {u"concurrentOption": u"skip"},
+                }}
+            elif action == u"slaInfo":
+                payload = {u"settings": [], u"slaEmails": [], u"allJobNames": [u"job_0"]}
+            elif action == u"scheduleCronFlow":
+                payload = {u"status": u"success", u"message": u"scheduled", u"scheduleId": self.next_id()}
+            else:
+                # removeSched
+                payload = {u"status": u"success", u"message": u"flow removed"}
+
+        else:
+            return 404, u"text/plain", b"Not Found"
+
+        return 200, u"application/json", json.dumps(payload).encode(u"utf-8")
+
+    def __handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, so the connection pool of the client is exercised
+            protocol_version = u"HTTP/1.1"
+            # Headers and body are written separately, Nagle would delay each response until the client ack
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def __params(self):
+                parts = urlsplit(self.path)
+                params = parse_qs(parts.query, keep_blank_values=True)
+
+                length = int(self.headers.get(u"Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                if self.headers.get(u"Transfer-Encoding", u"").lower() == u"chunked":
+                    body = self.__read_chunked()
+
+                content_type = self.headers.get(u"Content-Type", u"")
+                if content_type.startswith(u"application/x-www-form-urlencoded"):
+                    params.update(parse_qs(body.decode(u"utf-8"), keep_blank_values=True))
+                elif content_type.startswith(u"multipart/form-data"):
+                    # Only the ajax field of uploads is needed, the zip is read and discarded
+                    params[u"ajax"] = [u"upload"]
+
+                return parts.path, {key: values[0] for key, values in params.items()}
+
+            def __read_chunked(self):
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    if not size:
+                        self.rfile.readline()
+                        return b"".join(chunks)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+
+            def __respond(self):
+                path, params = self.__params()
+                fake.wait()
+
+                if fake.failing():
+                    status, content_type, body = 503, u"text/plain", b"Service Unavailable"
+                else:
+                    status, content_type, body = fake.answer(self.command, path, params)
+
+                fake.count(len(body))
+
+                self.send_response(status)
+                self.send_header(u"Content-Type", content_type)
+                self.send_header(u"Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self.__respond()
+
+            def do_POST(self):
+                self.__respond()
+
+        return Handler
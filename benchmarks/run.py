@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+
+"""
+Benchmarks of the Azkaban class against a local fake Azkaban server.
+
+Every public method of Azkaban, and the bulk and concurrent paths, is called a number of times and timed. The results
+are written as json, to track regressions between releases:
+
+    python benchmarks/run.py --latency 0.005 --output benchmark-results.json
+
+See benchmarks/fake_azkaban.py for the payload options.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+BENCHMARKS_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_PATH))
+sys.path.insert(0, BENCHMARKS_PATH)
+
+from fake_azkaban import DEFAULT_CONFIG, SESSION_ID, FakeAzkaban  # noqa: E402
+
+from azkaban_cli.__version__ import __version__  # noqa: E402
+from azkaban_cli.azkaban import Azkaban  # noqa: E402
+from azkaban_cli.sync import ScheduleSync  # noqa: E402
+
+PROJECT = u"project_0"
+FLOW = u"flow_0"
+EXECUTION_ID = u"1"
+JOB = u"job_1"
+LOG_CHUNK = 50000
+
+
+def make_projects(directory, count, files, file_size):
+    """Creates count project directories with files of file_size bytes, returns their paths"""
+
+    paths = []
+    for index in range(count):
+        path = os.path.join(directory, u"project_%d" % (index))
+        os.makedirs(path)
+        for file_index in range(files):
+            with open(os.path.join(path, u"job_%d.job" % (file_index)), "w") as job_file:
+                job_file.write(u"type=command\ncommand=echo %d\n" % (file_index))
+                job_file.write(u"#" * file_size)
+        paths.append(path)
+    return paths
+
+
+def benchmarks(azkaban, fake, workdir, options):
+    """
+    Returns the benchmarks as (name, function) pairs, each function making one call
+
+    :rtype: list
+    """
+
+    projects = make_projects(os.path.join(workdir, u"projects"), options.bulk, 10, 10 * 1024)
+    flows = [u"flow_%d" % (index) for index in range(fake.config[u"flows"])]
+    log_directory = os.path.join(workdir, u"logs")
+    manifest = [
+        {u"project": PROJECT, u"flow": flow, u"cron": u"0 30 * ? * *", u"concurrentOption": u"skip"} for flow in flows
+    ]
+    permissions = {
+        u"project_%d" % (index): {u"group_%d" % (group): {u"read": True} for group in range(3)}
+        for index in range(options.bulk)
+    }
+
+    def drain(generator):
+        for _ in generator:
+            pass
+
+    return [
+        (u"login", lambda: azkaban.login(fake.url, u"user", u"password")),
+        (u"fetch_flows", lambda: azkaban.fetch_flows(PROJECT)),
+        (u"fetch_project_id", lambda: azkaban.fetch_project_id(PROJECT)),
+        (u"fetch_jobs_from_flow", lambda: azkaban.fetch_jobs_from_flow(PROJECT, FLOW)),
+        (u"fetch_schedule", lambda: azkaban.fetch_schedule(1, FLOW)),
+        (u"fetch_schedule_id", lambda: azkaban.fetch_schedule_id(1, FLOW)),
+        (u"schedule", lambda: azkaban.schedule(PROJECT, FLOW, u"0 0 * ? * *")),
+        (u"unschedule", lambda: azkaban.unschedule(u"1000")),
+        (u"unschedule_flow", lambda: azkaban.unschedule_flow(PROJECT, FLOW)),
+        (u"execute", lambda: azkaban.execute(PROJECT, FLOW)),
+        (u"cancel", lambda: azkaban.cancel(EXECUTION_ID)),
+        (u"create", lambda: azkaban.create(PROJECT, u"description")),
+        (u"delete", lambda: azkaban.delete(PROJECT)),
+        (u"fetch_projects", lambda: azkaban.fetch_projects()),
+        (u"fetch_sla", lambda: azkaban.fetch_sla(u"1000")),
+        (u"add_permission", lambda: azkaban.add_permission(PROJECT, u"group", {u"read": True})),
+        (u"change_permission", lambda: azkaban.change_permission(PROJECT, u"group", {u"read": True})),
+        (u"remove_permission", lambda: azkaban.remove_permission(PROJECT, u"group")),
+        (u"fetch_group_permissions", lambda: azkaban.fetch_group_permissions(PROJECT)),
+        (u"fetch_flow_execution", lambda: azkaban.fetch_flow_execution(EXECUTION_ID)),
+        (u"fetch_flow_execution_updates", lambda: azkaban.fetch_flow_execution_updates(EXECUTION_ID, u"-1")),
+        (u"fetch_executions_of_a_flow", lambda: azkaban.fetch_executions_of_a_flow(PROJECT, FLOW, 0, 100)),
+        (u"fetch_execution_job_log", lambda: azkaban.fetch_execution_job_log(EXECUTION_ID, JOB, 0, LOG_CHUNK)),
+        (u"follow_execution_job_log", lambda: drain(
+            azkaban.follow_execution_job_log(EXECUTION_ID, JOB, 0, LOG_CHUNK, min_interval=0, max_interval=0)
+        )),
+        (u"fetch_running_executions_of_a_flow", lambda: azkaban.fetch_running_executions_of_a_flow(PROJECT, FLOW)),
+        (u"resume_flow_execution", lambda: azkaban.resume_flow_execution(EXECUTION_ID)),
+        (u"watch_execution", lambda: drain(azkaban.watch_execution(EXECUTION_ID, interval=0))),
+        (u"upload", lambda: azkaban.upload(projects[0])),
+        (u"upload_stream", lambda: azkaban.upload(projects[0], stream=True)),
+        # Bulk and concurrent paths
+        (u"upload_many", lambda: azkaban.upload_many(projects, max_workers=options.max_workers)),
+        (u"upload_many_stream", lambda: azkaban.upload_many(projects, max_workers=options.max_workers, stream=True)),
+        (u"unschedule_flows", lambda: azkaban.unschedule_flows(PROJECT, flows, max_workers=options.max_workers)),
+        (u"watch_executions", lambda: drain(azkaban.watch_executions(
+            [str(index) for index in range(options.bulk)], min_interval=0, max_interval=0,
+            max_workers=options.max_workers
+        ))),
+        (u"download_execution_logs", lambda: azkaban.download_execution_logs(
+            EXECUTION_ID, log_directory, chunk_size=LOG_CHUNK, max_workers=options.max_workers
+        )),
+        (u"sync_schedules_plan", lambda: ScheduleSync(azkaban, options.max_workers).plan(manifest)),
+        (u"sync_permissions", lambda: azkaban.sync_permissions(permissions, max_workers=options.max_workers)),
+    ]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def measure(name, function, iterations, fake):
+    """Calls the function iterations times, returns the timings of the calls and the requests they made"""
+
+    timings = []
+    errors = 0
+    requests = fake.requests
+
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            function()
+        except Exception as e:
+            errors += 1
+            logging.debug(u"%s failed: %s" % (name, e))
+        timings.append(time.perf_counter() - start)
+
+    return {
+        u"name": name,
+        u"iterations": iterations,
+        u"errors": errors,
+        u"requests": (fake.requests - requests) / float(iterations),
+        u"mean": sum(timings) / len(timings),
+        u"min": min(timings),
+        u"median": percentile(timings, 0.5),
+        u"p95": percentile(timings, 0.95),
+        u"max": max(timings),
+        u"ops_per_second": len(timings) / sum(timings) if sum(timings) else None,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=u"Benchmarks of azkaban_cli against a local fake Azkaban server")
+    parser.add_argument(u"--iterations", type=int, default=10, help=u"Calls of each benchmark")
+    parser.add_argument(u"--bulk", type=int, default=10, help=u"Projects, executions and groups of the bulk paths")
+    parser.add_argument(u"--max-workers", type=int, default=8, help=u"Concurrency of the bulk paths")
+    parser.add_argument(u"--only", nargs=u"+", metavar=u"NAME", help=u"Run only these benchmarks")
+    parser.add_argument(u"--output", help=u"Json file to write the results to, default is stdout")
+    parser.add_argument(u"--verbose", action=u"store_true", help=u"Log the benchmark progress and failures")
+    for option, default in sorted(DEFAULT_CONFIG.items()):
+        parser.add_argument(
+            u"--" + option.replace(u"_", u"-"), type=type(default), default=default, help=u"Fake server %s" % (option)
+        )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if options.verbose else logging.WARNING, stream=sys.stderr)
+
+    config = {option: getattr(options, option) for option in DEFAULT_CONFIG}
+    workdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+
+    results = []
+    try:
+        # Zips are created in the working directory
+        os.chdir(workdir)
+
+        with FakeAzkaban(**config) as fake:
+            azkaban = Azkaban(config_path=os.path.join(workdir, u"config.json"))
+            azkaban.set_logged_session(fake.url, u"user", SESSION_ID)
+
+            for name, function in benchmarks(azkaban, fake, workdir, options):
+                if options.only and name not in options.only:
+                    continue
+                logging.info(u"Running %s" % (name))
+                results.append(measure(name, function, options.iterations, fake))
+
+            retry_stats = azkaban.get_retry_stats()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        u"version": __version__,
+        u"python": platform.python_version(),
+        u"platform": platform.platform(),
+        u"timestamp": datetime.datetime.utcnow().strftime(u"%Y-%m-%dT%H:%M:%SZ"),
+        u"config": dict(config, iterations=options.iterations, bulk=options.bulk, max_workers=options.max_workers),
+        u"retry_stats": retry_stats,
+        u"results": results,
+    }
+
+    if options.output:
+        with open(options.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write(u"\n")
+
+
+if __name__ == u"__main__":
+    main()
@@ -26,13 +26,16 @@ setup(
     install_requires=[
         'requests<2.30.0',
         'click<8.0',
-        'beautifulsoup4<=4.7.1'
     ],
+    extras_require={
+        'orjson': ['orjson'],
+        'yaml': ['PyYAML'],
+    },
     tests_require = [
         'responses==0.10.5',
     ],
     entry_points='''
         [console_scripts]
-        azkaban=azkaban_cli.azkaban_cli:cli
+        azkaban=azkaban_cli.agent:main
     ''',
 )